@@ -0,0 +1,75 @@
+# admission.py — Per-agent limits, token buckets and queue statistics
+
+from collections import Counter, deque
+import time
+
+# Priority classes: lower runs first when agents compete for capacity
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BATCH = 2
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `burst` banked."""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.burst
+        self.last = time.monotonic()
+
+    def take(self):
+        """Returns (ok, retry_after_seconds)."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+class AgentLimits:
+    def __init__(self, max_concurrency: int = None, max_queue: int = None,
+                 priority: int = PRIORITY_NORMAL, rate: float = None, burst: float = None,
+                 max_wait: float = None):
+        self.max_concurrency = max_concurrency   # None = unlimited
+        self.max_queue = max_queue               # callers allowed to wait; None = unbounded
+        self.priority = priority
+        self.max_wait = max_wait                 # seconds a caller may wait for a slot
+        self.bucket = TokenBucket(rate, burst) if rate else None
+
+class AgentStats:
+    def __init__(self, window: int = 1024):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = Counter()
+        self.queued = 0
+        self.max_queued = 0
+        self.running = 0
+        self.waits = deque(maxlen=window)   # recent queue waits, seconds
+
+    def snapshot(self):
+        waits = sorted(self.waits)
+
+        def pct(p):
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3) if waits else 0.0
+
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": dict(self.rejected),
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queued,
+            "running": self.running,
+            "wait_ms_p50": pct(0.50),
+            "wait_ms_p95": pct(0.95),
+            "wait_ms_max": round(waits[-1] * 1000, 3) if waits else 0.0,
+        }
+
+def busy(name, reason, retry_after=None):
+    """Structured load-shedding error returned instead of blocking."""
+    out = {"error": "busy", "agent": name, "reason": reason}
+    if retry_after is not None:
+        out["retry_after"] = round(retry_after, 3)
+    return out
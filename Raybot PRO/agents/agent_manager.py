@@ -1,16 +1,114 @@
 # agent_manager.py — Manages all Raybot PRO agents
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+import inspect
+import itertools
 import threading
+import time
+
+from agents.admission import AgentLimits, AgentStats, busy, PRIORITY_NORMAL
+from tools import tracing
+
+DEFAULT_WORKERS = 4
+
+class _HeldStream:
+    """Passes a generator through, releasing its admission slot exactly once at the end.
+
+    The generator body runs on whichever thread consumes the stream, not on
+    the agent's pool. Only the slot is held: while a stream is open it counts
+    against max_concurrency, and it is given back when the stream is
+    exhausted, fails, is closed or is garbage collected.
+    """
+
+    def __init__(self, gen, release):
+        self.gen = gen
+        self.release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.gen)
+        except StopIteration:
+            self._done(False)
+            raise
+        except BaseException:
+            self._done(True)
+            raise
+
+    def close(self):
+        self.gen.close()
+        self._done(False)
+
+    def _done(self, failed):
+        if self.release is not None:
+            release, self.release = self.release, None
+            release(failed)
+
+    def __del__(self):
+        self._done(False)
+
+def _done(result):
+    f = Future()
+    f.set_result(result)
+    return f
 
 class AgentManager:
-    def __init__(self):
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_concurrency: int = None):
         self.agents = {}
+        self.pools = {}           # name -> dedicated executor
+        self.process_agents = set()
+        self.limits = {}          # name -> AgentLimits
+        self.agent_stats = {}     # name -> AgentStats
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency  # across all agents; None = unlimited
+        self.shared_pool = None   # created on first submit()
         self.lock = threading.Lock()
-        self.paused = False  # supports pause/resume
+        self.paused = False       # supports pause/resume
+        self._state = threading.Condition(self.lock)
+        self._waiting = Counter() # priority -> calls reserved but not yet admitted
+        self._ready = {}          # name -> deque of tickets (priority, seq, name) waiting in _call
+        self._seq = itertools.count()
+        self.running = 0          # calls currently executing
+        self.jobs = None          # tools.jobs.JobEngine, see attach_jobs()
+
+    def register(self, name: str, func, workers: int = None, processes: bool = False,
+                 max_concurrency: int = None, max_queue: int = None, priority: int = PRIORITY_NORMAL,
+                 rate: float = None, burst: float = None, max_wait: float = None):
+        """Registers an agent.
+
+        workers gives the agent its own pool (threads, or processes when
+        processes=True) so slow agents cannot starve the others. Process
+        agents must be picklable module-level functions.
+
+        max_concurrency / max_queue bound running and waiting calls, rate /
+        burst add a token bucket, and priority decides who gets a free slot
+        first (PRIORITY_INTERACTIVE before PRIORITY_BATCH). Calls over a limit
+        get a busy error immediately instead of piling up.
 
-    def register(self, name: str, func):
+        Streaming agents (generator results) run on the pool only until they
+        return the generator. The pieces are produced on the consumer's
+        thread, so pool isolation does not cover them. An open stream still
+        holds its concurrency slot until it ends or is closed.
+        """
         self.agents[name] = func
+        self.limits[name] = AgentLimits(max_concurrency, max_queue, priority, rate, burst, max_wait)
+        self.agent_stats[name] = AgentStats()
+        old = self.pools.pop(name, None)
+        if old is not None:
+            old.shutdown(wait=False)
+        self.process_agents.discard(name)
+
+        if workers:
+            if processes:
+                self.pools[name] = ProcessPoolExecutor(max_workers=workers)
+                self.process_agents.add(name)
+            else:
+                self.pools[name] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"agent-{name}")
 
     def send_to(self, name: str, task: Dict[str, Any]):
         if name not in self.agents:
@@ -19,10 +117,260 @@ class AgentManager:
         if self.paused:
             return {"error": "Agents are paused"}
 
-        return self.agents[name](task)
+        if name in self.pools and name not in self.process_agents:
+            return self.submit(name, task).result()
+
+        ticket = self._reserve(name)
+        if isinstance(ticket, dict):
+            return ticket
+        return self._call(name, task, ticket)
+
+    def submit(self, name: str, task: Dict[str, Any]) -> Future:
+        """Runs the agent in the background; the future resolves to its result dict."""
+        if name not in self.agents:
+            return _done({"error": f"Agent '{name}' not found"})
+
+        if self.paused:
+            return _done({"error": "Agents are paused"})
+
+        ticket = self._reserve(name)
+        if isinstance(ticket, dict):
+            return _done(ticket)
+
+        # Process agents are driven from a shared-pool thread that waits on the process result
+        pool = self._get_shared_pool() if name in self.process_agents else self._pool_for(name)
+        return pool.submit(self._call, name, task, ticket)
+
+    def fan_out(self, calls: List[Tuple], timeout: float = None) -> List[Dict[str, Any]]:
+        """Runs independent agent calls concurrently and gathers results in order.
+
+        Each call is (name, task) or (name, task, timeout). A call that times
+        out or raises yields {"error": ...} instead of failing the batch.
+        """
+        start = time.monotonic()
+        pending = []
+        for call in calls:
+            name, task = call[0], call[1]
+            limit = call[2] if len(call) > 2 else timeout
+            pending.append((self.submit(name, task), limit))
+
+        results = []
+        for future, limit in pending:
+            remaining = None if limit is None else max(0.0, limit - (time.monotonic() - start))
+            try:
+                results.append(future.result(timeout=remaining))
+            except FutureTimeout:
+                future.cancel()
+                results.append({"error": "timeout"})
+            except Exception as e:
+                results.append({"error": str(e)})
+        return results
+
+    def run_pipeline(self, pipeline, inputs: Dict[str, Any], progress=None, use_cache: bool = True) -> Dict[str, Any]:
+        """Runs an agents.pipeline.Pipeline (or its dict spec); stages go through submit().
+
+        Independent stages run in parallel, stream_from stages read their
+        source while it is still running, and stages already done for the
+        same inputs come from the pipeline cache.
+        """
+        from agents.pipeline import run_pipeline
+        return run_pipeline(self, pipeline, inputs, progress, use_cache)
+
+    def register_pipeline(self, name: str, pipeline, workers: int = 2, **limits):
+        """Exposes a pipeline as an agent: send_to(name, inputs) -> run_pipeline result.
 
-    def pause(self):
-        self.paused = True
+        It gets its own thread pool, so pipelines waiting on their stages
+        never hold the shared pool the stages run on.
+        """
+        self.register(name, lambda task: self.run_pipeline(pipeline, task), workers=workers, **limits)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and rejections per agent."""
+        with self._state:
+            out = {name: st.snapshot() for name, st in self.agent_stats.items()}
+            out["_total"] = {"running": self.running, "waiting": sum(self._waiting.values())}
+            return out
+
+    def _pool_for(self, name):
+        pool = self.pools.get(name)
+        if pool is not None:
+            return pool
+        return self._get_shared_pool()
+
+    def _get_shared_pool(self):
+        with self.lock:
+            if self.shared_pool is None:
+                self.shared_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="agent")
+            return self.shared_pool
+
+    # ---- admission control ----
+    def _can_run(self, name):
+        limit = self.limits[name].max_concurrency
+        if limit is not None and self.agent_stats[name].running >= limit:
+            return False
+        return self.max_concurrency is None or self.running < self.max_concurrency
+
+    def _is_next(self, ticket, name):
+        if self.paused or not self._can_run(name) or self._ready[name][0] != ticket:
+            return False
+        # Head of its agent's queue; it still yields to an earlier head of another agent that can run
+        return not any(q and q[0] < ticket and self._can_run(other) for other, q in self._ready.items())
+
+    def _reserve(self, name):
+        """Admits a call into the agent's queue, or returns a busy error."""
+        limits, st = self.limits[name], self.agent_stats[name]
+        with self._state:
+            st.submitted += 1
+
+            if limits.bucket is not None:
+                ok, retry_after = limits.bucket.take()
+                if not ok:
+                    st.rejected["rate_limited"] += 1
+                    return busy(name, "rate_limited", retry_after)
+
+            # Whether the call would start at once: the agent's own slots and
+            # queue decide; other agents' waiters only count against the
+            # manager-wide cap they compete for
+            runs_now = (limits.max_concurrency is None or st.running < limits.max_concurrency) and st.queued == 0
+            if runs_now and self.max_concurrency is not None:
+                ahead = sum(n for p, n in self._waiting.items() if p <= limits.priority)
+                runs_now = self.running + ahead < self.max_concurrency
+            if not runs_now and limits.max_queue is not None and st.queued >= limits.max_queue:
+                st.rejected["queue_full"] += 1
+                return busy(name, "queue_full")
+
+            ticket = (limits.priority, next(self._seq), name)
+            self._waiting[limits.priority] += 1
+            st.queued += 1
+            st.max_queued = max(st.max_queued, st.queued)
+            return ticket
+
+    def _call(self, name, task, ticket):
+        limits, st = self.limits[name], self.agent_stats[name]
+        queued_at = time.monotonic()
+
+        # Queued work also waits here while the manager is paused. Only calls
+        # already waiting here compete for slots: ranking calls still queued
+        # in an executor could leave every worker waiting for one that
+        # cannot start until a worker frees up.
+        with self._state:
+            ready = self._ready.setdefault(name, deque())
+            ready.append(ticket)
+            admitted = self._state.wait_for(lambda: self._is_next(ticket, name), limits.max_wait)
+            ready.remove(ticket)
+            self._waiting[ticket[0]] -= 1
+            st.queued -= 1
+            if not admitted:
+                st.rejected["queue_timeout"] += 1
+                self._state.notify_all()
+                return busy(name, "queue_timeout")
+            waited = time.monotonic() - queued_at
+            st.waits.append(waited)
+            st.running += 1
+            self.running += 1
+
+        tracing.record(f"agent.{name}.queue", waited)
+        try:
+            with tracing.span(f"agent.{name}"):
+                if name in self.process_agents:
+                    result = self.pools[name].submit(self.agents[name], task).result()
+                else:
+                    result = self.agents[name](task)
+        except BaseException:
+            self._release(name, failed=True)
+            raise
+
+        # Streaming agents return generators; their slot is held until the stream ends
+        if inspect.isgenerator(result):
+            timer = tracing.Timer(f"agent.{name}.stream")
+
+            def release(failed):
+                timer.stop(failed)
+                self._release(name, failed)
+            return _HeldStream(result, release)
+
+        self._release(name, failed=False)
+        return result
+
+    def _release(self, name, failed):
+        st = self.agent_stats[name]
+        with self._state:
+            st.running -= 1
+            self.running -= 1
+            st.completed += not failed
+            st.failed += failed
+            self._state.notify_all()
+
+    def pause(self, wait: bool = False, timeout: float = None) -> bool:
+        """Stops new work. Running calls finish; queued ones hold until resume().
+
+        With wait=True, blocks until running calls are done (or timeout).
+        Returns whether nothing is running any more.
+        """
+        with self._state:
+            self.paused = True
+            if wait:
+                self._state.wait_for(lambda: self.running == 0, timeout)
+            return self.running == 0
 
     def resume(self):
-        self.paused = False
\ No newline at end of file
+        with self._state:
+            self.paused = False
+            self._state.notify_all()
+
+    def attach_jobs(self, engine):
+        """Exposes a tools.jobs.JobEngine through the job agents used by the UI.
+
+        Any registered agent can also run as a job:
+        start_long_task {"kind": "agent", "params": {"agent": "voice", "task": {...}}}
+        The task gets the job's context as "job": voice transcription and file
+        summaries report, checkpoint and honour pause/cancel per chunk or block.
+        """
+        from tools.jobs import register_job
+
+        self.jobs = engine
+        register_job("agent", lambda ctx, params: self.send_to(params["agent"], dict(params.get("task", {}), job=ctx)))
+
+        def start_long_task(task):
+            kind = task.get("kind", "sleep")
+            params = task.get("params", {"seconds": task.get("seconds", 15)})
+            try:
+                job_id = engine.submit(kind, params)
+            except ValueError as e:
+                return {"error": str(e)}
+            return {"job_id": job_id, "state": "queued"}
+
+        def _target(task):
+            if task.get("job_id"):
+                return int(task["job_id"])
+            active = engine.list_jobs(limit=1, active_only=True)
+            return active[0]["id"] if active else None
+
+        def _control(action):
+            def agent(task):
+                job_id = _target(task)
+                if job_id is None:
+                    return {"error": "No active job"}
+                return {"job_id": job_id, "ok": getattr(engine, action)(job_id), "state": engine.state(job_id)}
+            return agent
+
+        def job_status(task):
+            if task.get("job_id"):
+                return {"job": engine.status(int(task["job_id"]))}
+            return {"jobs": engine.list_jobs(limit=int(task.get("limit", 10)))}
+
+        self.register("start_long_task", start_long_task)
+        self.register("pause_long_task", _control("pause"))
+        self.register("resume_long_task", _control("resume"))
+        self.register("cancel_long_task", _control("cancel"))
+        self.register("job_status", job_status)
+        engine.start()
+        return engine
+
+    def shutdown(self, wait: bool = True):
+        self.resume()  # release gated work so pools can drain
+        if self.jobs is not None:
+            self.jobs.stop(timeout=1)
+        for pool in list(self.pools.values()) + [self.shared_pool]:
+            if pool is not None:
+                pool.shutdown(wait=wait)
@@ -1,47 +1,111 @@
 # chat_agent.py — Chatbot logic for Raybot PRO
 
-from tools.db import append_event, get_recent_events
-from tools.summarizer_engine import extractive_summary
+from config import CONTEXT_TOKEN_BUDGET
+from tools.db import append_event
+from tools.context_builder import build_context
+from tools.llm_cache import llm_cache, make_key
+from tools.llm_client import CircuitOpen, wrap_client
+from tools.tracing import span
 
-def chat_agent_factory(openai_client=None):
-    def chat_agent(task):
-        message = task.get("message", "")
-        session_id = task.get("session_id")
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.6
+
+def _offline(message):
+    return f"Raybot PRO (offline): I received: '{message}'"
+
+def chat_agent_factory(openai_client=None, cache=llm_cache):
+    # Retries, deadlines and the circuit breaker live in tools/llm_client.py
+    openai_client = wrap_client(openai_client)
+
+    def _prompts(task, message, session_id):
+        # Recent turns, memory facts and a summary of older turns within the token budget
+        budget = task.get("max_prompt_tokens") or CONTEXT_TOKEN_BUDGET
+        with span("chat.context"):
+            ctx = build_context(session_id, message, budget)
+        return ctx["system"], ctx["user"], ctx["tokens"]["total"]
+
+    def _create(system_prompt, user_prompt, stream=False):
+        # For streams this times the wait for the response headers
+        with span("llm.completion", stream=stream):
+            return openai_client.chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=TEMPERATURE,
+                **({"stream": True} if stream else {}),
+            )
+
+    def _stream(task, message, session_id, system_prompt, user_prompt):
+        """Yields reply text deltas; the full reply is saved once at the end."""
+        use_cache = bool(openai_client) and cache is not None and task.get("cache", True)
+        key = make_key(system_prompt, user_prompt, MODEL, TEMPERATURE) if use_cache else None
+        reply = cache.get(key) if use_cache else None
+
+        if reply is not None:
+            yield reply
+        elif openai_client:
+            parts = []
+            try:
+                for chunk in _create(system_prompt, user_prompt, stream=True):
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                reply = "".join(parts)
+                if use_cache:
+                    cache.put(key, reply)
+            except CircuitOpen:
+                reply = _offline(message)
+                yield reply
+            except Exception as e:
+                error = f"(Raybot PRO: LLM error -> {e})"
+                reply = "".join(parts) + error
+                yield error
+        else:
+            reply = _offline(message)
+            yield reply
 
-        # Fetch recent context
-        context = ""
         if session_id:
-            rows = get_recent_events(session_id, limit=12)
-            context = "\n".join([f"{r[0]}: {r[1]}" for r in rows[-10:]]) if rows else ""
+            append_event(session_id, "assistant", reply)
 
-        small_context = extractive_summary(context, max_sentences=3) if context else ""
+    def chat_agent(task):
+        message = task.get("message", "")
+        session_id = task.get("session_id")
+        system_prompt, user_prompt, prompt_tokens = _prompts(task, message, session_id)
 
-        system_prompt = "You are Raybot PRO, a friendly and helpful AI assistant."
-        user_prompt = (small_context + "\n\nUser: " + message) if small_context else message
+        # Streaming mode: {"stream": True} returns a generator of text deltas
+        if task.get("stream"):
+            return _stream(task, message, session_id, system_prompt, user_prompt)
 
         # Online mode (if OpenAI exists)
         if openai_client:
-            try:
-                response = openai_client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    temperature=0.6,
-                )
-                reply = response.choices[0].message.content
-            except Exception as e:
-                reply = f"(Raybot PRO: LLM error -> {e})"
+            # Per-request opt-out: {"cache": False}
+            use_cache = cache is not None and task.get("cache", True)
+            key = make_key(system_prompt, user_prompt, MODEL, TEMPERATURE) if use_cache else None
+            reply = cache.get(key) if use_cache else None
+
+            if reply is None:
+                try:
+                    response = _create(system_prompt, user_prompt)
+                    reply = response.choices[0].message.content
+                    if use_cache:
+                        cache.put(key, reply)
+                except CircuitOpen:
+                    # Upstream unhealthy: answer offline instead of waiting on it
+                    reply = _offline(message)
+                except Exception as e:
+                    reply = f"(Raybot PRO: LLM error -> {e})"
 
         # Offline mode
         else:
-            reply = f"Raybot PRO (offline): I received: '{message}'"
+            reply = _offline(message)
 
         # Save reply into DB memory
         if session_id:
             append_event(session_id, "assistant", reply)
 
-        return {"reply": reply}
+        return {"reply": reply, "prompt_tokens": prompt_tokens}
 
-    return chat_agent
\ No newline at end of file
+    return chat_agent
@@ -0,0 +1,39 @@
+# eval_agent.py — Quick self-check of the registered agents
+
+import time
+
+SAMPLE_TEXT = (
+    "Raybot PRO is a multi-agent assistant. It can summarize long documents. "
+    "It can also generate quizzes from any text. The voice agent transcribes audio. "
+    "News is available offline from a sample dataset."
+)
+
+CASES = {
+    "summarizer": ({"text": SAMPLE_TEXT, "max_sentences": 2}, lambda r: bool(r.get("summary"))),
+    "quiz": ({"text": SAMPLE_TEXT, "n": 3}, lambda r: isinstance(r.get("quiz"), list) and len(r["quiz"]) > 0),
+    "news": ({"query": "space"}, lambda r: len(r.get("news", [])) > 0),
+    "chat": ({"message": "Hello!"}, lambda r: bool(r.get("reply"))),
+}
+
+def eval_agent_factory(agent_manager):
+    def eval_agent(task):
+        result = {}
+        for name, (case, check) in CASES.items():
+            if name not in agent_manager.agents:
+                continue
+            start = time.perf_counter()
+            try:
+                out = agent_manager.send_to(name, dict(case))
+                ok = check(out) and "error" not in out
+            except Exception as e:
+                out, ok = {"error": str(e)}, False
+            result[name] = {
+                "ok": ok,
+                "ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+            if not ok:
+                result[name]["output"] = str(out)[:200]
+
+        return {"result": result}
+
+    return eval_agent
@@ -1,7 +1,31 @@
-# news_agent.py — AI News from API or offline samples
+# news_agent.py — AI News from the local archive or offline samples
 
 from tools.summarizer_engine import news_fetch
 
 def news_agent(task):
-    query = task.get("query", "")
-    return {"news": news_fetch(query)}
\ No newline at end of file
+    # Imported on first call: the archive code is not needed to import the agent
+    from tools.news_store import news_store
+
+    action = task.get("action", "fetch")
+
+    if action == "fetch":
+        query = task.get("query", "")
+        if not news_store.has_articles():
+            return {"news": news_fetch(query)}
+        # {"limit": 10, "offset": 20} pages through ranked results
+        limit, offset = task.get("limit", 10), task.get("offset", 0)
+        page = news_store.search(query, limit, offset) if query.strip() else news_store.latest(limit, offset)
+        return {"news": page["results"], "offset": page["offset"], "has_more": page["has_more"],
+                "truncated": page["truncated"]}
+
+    # Bulk load JSONL / RSS / Atom files or directories; re-runs only read what is new
+    if action == "ingest":
+        paths = task.get("paths") or ([task["path"]] if task.get("path") else [])
+        if not paths:
+            return {"error": "No paths to ingest"}
+        return {"ingest": news_store.ingest(paths, force=task.get("force", False))}
+
+    if action == "stats":
+        return {"news_store": news_store.stats()}
+
+    return {"error": "Unknown action in news agent"}
@@ -0,0 +1,328 @@
+# pipeline.py — declarative agent pipelines (DAGs) run through AgentManager
+#
+# A pipeline is a list of stages. Each stage calls one registered agent
+# with a task built from a fixed part plus references to the pipeline's
+# inputs ("$path") or to upstream results ("transcript.transcript").
+# Stages start as soon as what they need is there, so independent
+# branches run in parallel. A stage with stream_from gets the upstream
+# stage's stream as a live iterator (task["chunks"] by default) and
+# starts while that stage is still producing. Every stage is keyed on a
+# hash of its agent, task and the keys of its upstream stages (file
+# inputs by content), so re-running a pipeline on the same audio takes
+# finished stages from tools/pipeline_cache.py without running them.
+#
+#     from agents.pipeline import LECTURE
+#     agent_manager.run_pipeline(LECTURE, {"path": "lecture.wav"})
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from tools import tracing
+from tools.pipeline_cache import file_fingerprint, make_key, pipeline_cache
+
+class Stage:
+    def __init__(self, name, agent, task=None, inputs=None, after=(), stream_from=None,
+                 stream_as="chunks", collect="text", cache=True):
+        """One agent call.
+
+        inputs maps task fields to "$input", "stage" or "stage.field"; after
+        lists extra stages to wait for. stream_from names a stage whose
+        stream is passed, while it runs, as task[stream_as]. A stage whose
+        agent streams has its pieces joined into {collect: text}.
+        """
+        self.name = name
+        self.agent = agent
+        self.task = dict(task or {})
+        self.inputs = dict(inputs or {})
+        self.after = tuple(after)
+        self.stream_from = stream_from
+        self.stream_as = stream_as
+        self.collect = collect
+        self.cache = cache
+
+    @property
+    def deps(self):
+        """Stages that must finish before this one starts."""
+        refs = (r.split(".", 1)[0] for r in self.inputs.values() if not r.startswith("$"))
+        return set(refs) | set(self.after)
+
+    def spec(self):
+        return {"name": self.name, "agent": self.agent, "task": self.task, "inputs": self.inputs,
+                "after": list(self.after), "stream_from": self.stream_from, "stream_as": self.stream_as,
+                "collect": self.collect, "cache": self.cache}
+
+class Pipeline:
+    def __init__(self, name, stages):
+        self.name = name
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage '{stage.name}'")
+            self.stages[stage.name] = stage
+
+        for stage in self.stages.values():
+            for dep in stage.deps | {stage.stream_from} - {None}:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+        self.order = self._topological()
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Builds a pipeline from {"name": ..., "stages": [{"name", "agent", ...}, ...]}."""
+        return cls(spec.get("name", "pipeline"), [Stage(**s) for s in spec["stages"]])
+
+    def spec(self):
+        return {"name": self.name, "stages": [self.stages[n].spec() for n in self.order]}
+
+    def upstream(self, name):
+        stage = self.stages[name]
+        return stage.deps | ({stage.stream_from} if stage.stream_from else set())
+
+    def _topological(self):
+        order, state = [], {}
+
+        def visit(name):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Pipeline '{self.name}' has a cycle through '{name}'")
+            state[name] = "visiting"
+            for dep in sorted(self.upstream(name)):
+                visit(dep)
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+class _Tee:
+    """A stage's output: streamed pieces that any number of readers replay from the start."""
+
+    def __init__(self):
+        self.pieces = []
+        self.done = False
+        self.cond = threading.Condition()
+
+    def add(self, piece):
+        with self.cond:
+            self.pieces.append(piece)
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.done = True
+            self.cond.notify_all()
+
+    def reader(self):
+        i = 0
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: i < len(self.pieces) or self.done)
+                batch = self.pieces[i:]
+                finished = self.done
+            i += len(batch)
+            yield from batch
+            if finished and not batch:
+                return
+
+def _resolve(ref, inputs, results):
+    if ref.startswith("$"):
+        return inputs.get(ref[1:])
+    stage, _, field = ref.partition(".")
+    return results[stage].get(field) if field else results[stage]
+
+def _fingerprint(value):
+    if isinstance(value, str) and os.path.isfile(value):
+        return file_fingerprint(value)
+    return value
+
+def stage_keys(pipeline, inputs):
+    """Cache key per stage, computed from inputs and upstream keys only (nothing has to run)."""
+    keys = {}
+    for name in pipeline.order:
+        stage = pipeline.stages[name]
+        used = {r[1:]: _fingerprint(inputs.get(r[1:])) for r in stage.inputs.values() if r.startswith("$")}
+        upstream = {dep: keys[dep] for dep in pipeline.upstream(name)}
+        keys[name] = make_key(stage.agent, stage.task, stage.inputs, stage.stream_from, stage.stream_as,
+                              stage.collect, used, upstream)
+    return keys
+
+class PipelineRun:
+    def __init__(self, manager, pipeline, inputs, progress=None, use_cache=True):
+        self.manager = manager
+        self.pipeline = pipeline
+        self.inputs = dict(inputs or {})
+        self.progress = progress
+        self.use_cache = use_cache
+        self.results = {}
+        self.tees = {}
+        self.cached = []
+        self.started = {}
+        self.timings = {}
+
+    def _emit(self, stage, event, payload=None):
+        if self.progress is not None:
+            try:
+                self.progress(stage, event, payload)
+            except Exception:
+                pass
+
+    def run(self):
+        begin = time.monotonic()
+        keys = stage_keys(self.pipeline, self.inputs)
+        pending = list(self.pipeline.order)
+
+        if self.use_cache:
+            for name in list(pending):
+                if not self.pipeline.stages[name].cache:
+                    continue
+                hit = pipeline_cache.get(keys[name])
+                if hit is not None:
+                    self._finish(name, hit, cached=True)
+                    pending.remove(name)
+
+        running = {}   # Future -> stage name
+        finished = {}  # stage -> result, held until every upstream stage is settled
+        with tracing.span(f"pipeline.{self.pipeline.name}"):
+            while pending or running or finished:
+                for name in list(pending):
+                    if self._ready(name):
+                        pending.remove(name)
+                        running[self._start(name)] = name
+                if not running and not finished:
+                    break
+                if running:
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finished[running.pop(future)] = self._result(future)
+
+                # A stream reader can end just before its source's result is in
+                for name in [n for n in self.pipeline.order if n in finished]:
+                    if any(dep not in self.results for dep in self.pipeline.upstream(name)):
+                        continue
+                    result = finished.pop(name)
+                    failed = self._failed_upstream(name)
+                    if failed and "error" not in result:
+                        result = {"error": f"upstream stage '{failed}' failed"}
+                    self._finish(name, result)
+                    if self.use_cache and self.pipeline.stages[name].cache:
+                        pipeline_cache.put(keys[name], name, result)
+
+        return {"pipeline": self.pipeline.name, "results": self.results, "cached": self.cached,
+                "timings": self.timings, "seconds": round(time.monotonic() - begin, 4)}
+
+    def _ready(self, name):
+        stage = self.pipeline.stages[name]
+        if any(dep not in self.results for dep in stage.deps):
+            return False
+        if stage.stream_from is None:
+            return True
+        # Process agents cannot take a live iterator: they wait for the whole stream
+        if stage.agent in getattr(self.manager, "process_agents", ()):
+            return stage.stream_from in self.results
+        return stage.stream_from in self.tees
+
+    def _failed_upstream(self, name):
+        for dep in sorted(self.pipeline.upstream(name)):
+            if "error" in self.results.get(dep, {}):
+                return dep
+        return None
+
+    def _start(self, name):
+        stage = self.pipeline.stages[name]
+        self.started[name] = time.monotonic()
+        tee = self.tees[name] = _Tee()
+        out = Future()
+
+        failed = self._failed_upstream(name)
+        if failed:
+            out.set_result({"error": f"upstream stage '{failed}' failed"})
+            tee.close()
+            return out
+
+        task = dict(stage.task)
+        for field, ref in stage.inputs.items():
+            value = _resolve(ref, self.inputs, self.results)
+            if value is not None:
+                task[field] = value
+        if stage.stream_from:
+            source = self.tees[stage.stream_from]
+            task[stage.stream_as] = list(source.reader()) if source.done else source.reader()
+
+        self._emit(name, "start")
+        call = self.manager.submit(stage.agent, task)
+        call.add_done_callback(lambda f: self._settle(name, f, tee, out))
+        return out
+
+    def _settle(self, name, call, tee, out):
+        """Agent call finished: a dict is the result, a generator is pumped through the tee."""
+        try:
+            value = call.result()
+        except Exception as e:
+            value = {"error": str(e)}
+
+        if not hasattr(value, "__next__"):
+            collect = self.pipeline.stages[name].collect
+            if isinstance(value, dict) and collect in value and "error" not in value:
+                tee.add(value[collect])
+            tee.close()
+            out.set_result(value)
+            return
+
+        def pump():
+            pieces = []
+            try:
+                for piece in value:
+                    pieces.append(piece)
+                    tee.add(piece)
+                    self._emit(name, "piece", piece)
+                result = {self.pipeline.stages[name].collect: "".join(map(str, pieces))}
+            except Exception as e:
+                result = {"error": str(e)}
+            tee.close()
+            out.set_result(result)
+
+        threading.Thread(target=pump, name=f"pipeline-{name}", daemon=True).start()
+
+    def _result(self, future):
+        try:
+            return future.result()
+        except Exception as e:
+            return {"error": str(e)}
+
+    def _finish(self, name, result, cached=False):
+        if not isinstance(result, dict):
+            result = {"result": result}
+        if cached:
+            self.cached.append(name)
+            tee = self.tees[name] = _Tee()
+            collect = self.pipeline.stages[name].collect
+            if collect in result:
+                tee.add(result[collect])
+            tee.close()
+            self.timings[name] = 0.0
+        else:
+            self.timings[name] = round(time.monotonic() - self.started[name], 4)
+        self.results[name] = result
+        self._emit(name, "cached" if cached else "done", result)
+
+def run_pipeline(manager, pipeline, inputs, progress=None, use_cache=True):
+    """Runs pipeline on inputs through manager.submit.
+
+    Returns {"results": {stage: result}, "cached": [...], "timings": {...}, "seconds"}.
+    progress(stage, event, payload) is called with "start", "piece", "done" and "cached".
+    """
+    if isinstance(pipeline, dict):
+        pipeline = Pipeline.from_spec(pipeline)
+    return PipelineRun(manager, pipeline, inputs, progress, use_cache).run()
+
+# Audio -> transcript, streamed into the summarizer and the quiz in parallel
+LECTURE = Pipeline("lecture", [
+    Stage("transcript", "voice", {"action": "transcribe", "stream": True},
+          inputs={"path": "$path", "model": "$model"}, collect="transcript"),
+    Stage("summary", "summarizer", {"max_sentences": 3}, stream_from="transcript"),
+    Stage("quiz", "quiz", {"n": 5}, stream_from="transcript"),
+])
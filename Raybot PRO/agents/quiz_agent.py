@@ -1,11 +1,37 @@
 # quiz_agent.py — Creates quiz questions from text
 
 from tools.summarizer_engine import heuristic_quiz
+from tools.quiz_batch import generate_quizzes, quiz_corpus, quiz_stream
 
 def quiz_agent(task):
     text = task.get("text", "")
     n = int(task.get("n", 5))
+    seed = task.get("seed")
+
+    # Streaming input: {"chunks": iterable of text pieces}, e.g. a transcript still being produced
+    if task.get("chunks") is not None:
+        return {
+            "quiz": quiz_stream(task["chunks"], n, seed or 0)
+        }
+
+    # Corpus mode: {"path": "course/", "out": "quiz.jsonl"} streams one JSON line per document
+    if task.get("path"):
+        out = task.get("out") or "quiz.jsonl"
+        try:
+            batch = quiz_corpus(task["path"], out, n, seed or 0, processes=task.get("processes"))
+        except FileNotFoundError:
+            return {"error": f"File not found: {task['path']}"}
+        return {
+            "batch": batch
+        }
+
+    # Batch mode: {"texts": [...]} or a list passed as "text"
+    texts = task.get("texts", text if isinstance(text, list) else None)
+    if texts is not None:
+        return {
+            "quizzes": [r["quiz"] for r in generate_quizzes(list(enumerate(texts)), n, seed or 0, processes=task.get("processes"))]
+        }
 
     return {
-        "quiz": heuristic_quiz(text, n)
-    }
\ No newline at end of file
+        "quiz": heuristic_quiz(text, n, seed)
+    }
@@ -0,0 +1,50 @@
+# registry.py — the standard set of Raybot PRO agents on one AgentManager
+#
+# Shared by every front end: the Gradio app (main.py) and each worker of
+# the HTTP API (api/server.py) build their manager here, so agents,
+# pools and limits are the same whichever way a request comes in.
+
+from agents.agent_manager import AgentManager
+from agents.admission import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+
+# Admission limits per agent (per process): calls beyond max_concurrency wait
+# up to max_wait seconds in a queue of max_queue, and anything more is shed
+# with a busy error (HTTP 429 from the API) instead of piling up
+LIMITS = {
+    "chat": dict(max_concurrency=8, max_queue=32, max_wait=30, priority=PRIORITY_INTERACTIVE),
+    "summarizer": dict(max_concurrency=4, max_queue=16, max_wait=60),
+    "quiz": dict(max_concurrency=4, max_queue=16, max_wait=60),
+    "news": dict(max_concurrency=8, max_queue=32, max_wait=30),
+    "voice": dict(max_concurrency=2, max_queue=8, max_wait=300, priority=PRIORITY_BATCH),
+    "eval": dict(max_concurrency=1, max_queue=0, rate=0.2, burst=1),
+    "lecture": dict(max_concurrency=2, max_queue=4, max_wait=600, priority=PRIORITY_BATCH),
+}
+
+def build_agent_manager(openai_client=None, jobs=True, **manager_kwargs):
+    """AgentManager with chat, summarizer, quiz, news, voice, eval, the lecture pipeline and (optionally) jobs."""
+    from agents.chat_agent import chat_agent_factory
+    from agents.eval_agent import eval_agent_factory
+    from agents.news_agent import news_agent
+    from agents.pipeline import LECTURE
+    from agents.quiz_agent import quiz_agent
+    from agents.summarizer_agent import summarizer_agent
+    from agents.voice_agent import voice_agent
+
+    if openai_client is None:
+        from tools.llm_client import build_openai_client
+        openai_client = build_openai_client()
+
+    manager = AgentManager(**manager_kwargs)
+    manager.register("chat", chat_agent_factory(openai_client), **LIMITS["chat"])
+    manager.register("summarizer", summarizer_agent, **LIMITS["summarizer"])
+    manager.register("quiz", quiz_agent, **LIMITS["quiz"])
+    manager.register("news", news_agent, **LIMITS["news"])
+    # Transcription is slow: its own pool keeps it from starving the others
+    manager.register("voice", voice_agent, workers=2, **LIMITS["voice"])
+    manager.register("eval", eval_agent_factory(manager), **LIMITS["eval"])
+    manager.register_pipeline("lecture", LECTURE, **LIMITS["lecture"])
+
+    if jobs:
+        from tools.jobs import JobEngine
+        manager.attach_jobs(JobEngine())
+    return manager
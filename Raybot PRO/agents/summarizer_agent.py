@@ -1,11 +1,42 @@
 # summarizer_agent.py — Summarization functionality
 
-from tools.summarizer_engine import extractive_summary
+from tools.summarizer_engine import extractive_summary, summarize_many
+from tools.stream_summarizer import summarize_stream
 
 def summarizer_agent(task):
     text = task.get("text", "")
     max_sentences = task.get("max_sentences", 3)
 
+    # Streaming mode for large files: {"path": "book.txt"}
+    if task.get("path"):
+        try:
+            summary = summarize_stream(
+                task["path"], max_sentences,
+                processes=task.get("processes"),
+                hierarchical=task.get("hierarchical", False),
+                job=task.get("job"),
+            )
+        except FileNotFoundError:
+            return {"error": f"File not found: {task['path']}"}
+        return {
+            "summary": summary
+        }
+
+    # Streaming input: {"chunks": iterable of text pieces}, summarized as they arrive.
+    # A single string is one piece of text, never a file name.
+    if task.get("chunks") is not None:
+        chunks = task["chunks"]
+        return {
+            "summary": summarize_stream([chunks] if isinstance(chunks, str) else chunks, max_sentences)
+        }
+
+    # Batch mode: {"texts": [...]} or a list passed as "text"
+    texts = task.get("texts", text if isinstance(text, list) else None)
+    if texts is not None:
+        return {
+            "summaries": summarize_many(texts, max_sentences)
+        }
+
     return {
         "summary": extractive_summary(text, max_sentences)
     }
\ No newline at end of file
@@ -1,16 +1,35 @@
 # voice_agent.py — Voice (Speech-to-Text & Text-to-Speech)
 
-from tools.stt_tts import transcribe_audio, tts_save
+from tools.stt_tts import transcribe_audio, transcribe_stream, tts_save
+from tools.whisper_models import registry
+from tools.transcriber import service
+from tools.tts_cache import tts_cache
 
 def voice_agent(task):
     action = task.get("action", "transcribe")
 
     if action == "transcribe":
         file_path = task.get("path")
-        return {"transcript": transcribe_audio(file_path)}
+        # {"stream": True} returns a generator of transcript pieces
+        if task.get("stream"):
+            return transcribe_stream(file_path, task.get("model"), task.get("job"))
+        return {"transcript": transcribe_audio(file_path, task.get("model"), task.get("job"))}
+
+    # Loaded Whisper models: cold-start time, weights and resident memory
+    if action == "models":
+        return {"models": registry.stats()}
+
+    if action == "transcriber":
+        return {"transcriber": service.stats()}
+
+    if action == "warm_up":
+        return {"models": registry.warm_up(task.get("models"))}
 
     if action == "tts":
         text = task.get("text", "")
-        return {"tts_path": tts_save(text)}
+        return {"tts_path": tts_save(text, task.get("voice"))}
+
+    if action == "tts_cache":
+        return {"tts_cache": tts_cache.stats()}
 
     return {"error": "Unknown action in voice agent"}
\ No newline at end of file
@@ -0,0 +1 @@
+# makes api importable
\ No newline at end of file
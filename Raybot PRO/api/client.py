@@ -0,0 +1,174 @@
+# client.py — Python client for the Raybot PRO HTTP API (api/server.py)
+#
+# Mirrors the AgentManager calls and DB helpers the Gradio app uses, so
+# the UI can run against a remote API instead of in-process agents:
+#     client = ApiClient("http://127.0.0.1:8000")
+#     make_app(client, **client.ui_helpers())
+# Streaming agents come back as generators of pieces, as they do locally.
+# A local file in a task's "path" is uploaded first, and TTS audio is
+# downloaded into a local folder, so paths mean the same as in-process.
+# Only requests that are safe to repeat are retried after a dropped
+# connection: a POST (chat turn, job, upload) may already have run, so it
+# goes out on a connection checked to be alive and is never sent twice.
+
+import json
+import os
+import select
+import tempfile
+import threading
+import http.client
+from urllib.parse import quote, urlencode, urlsplit
+
+from config import API_TOKEN
+
+# Methods sent again when the connection drops before the response arrives
+IDEMPOTENT = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+class ApiClient:
+    def __init__(self, base_url, timeout=120, token=API_TOKEN,
+                 audio_dir=os.path.join(tempfile.gettempdir(), "raybot_api_audio")):
+        url = urlsplit(base_url)
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.https = url.scheme == "https"
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+        self.audio_dir = audio_dir
+        self.local = threading.local()   # one keep-alive connection per thread
+        self.paused = False
+        self.agents = {}
+
+    def _conn(self, check=False):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None and check and conn.sock is not None and select.select([conn.sock], [], [], 0)[0]:
+            # An idle keep-alive socket that is readable was closed by the server
+            conn.close()
+            conn = None
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self.local.conn = cls(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def _request(self, method, path, body=None, query=None, raw=None):
+        path = self.prefix + path + (f"?{urlencode(query)}" if query else "")
+        data = json.dumps(body).encode("utf-8") if body is not None else raw
+        headers = {"Content-Type": "application/json" if raw is None else "application/octet-stream"} \
+            if data is not None else {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        idempotent = method in IDEMPOTENT
+        for attempt in range(2):
+            conn = self._conn(check=not idempotent)
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                return conn.getresponse()
+            except (ConnectionRefusedError, http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                # Reconnect once, unless the request may have reached the server and is not safe to repeat
+                conn.close()
+                self.local.conn = None
+                if attempt or not (idempotent or isinstance(e, ConnectionRefusedError)):
+                    raise
+
+    def _json(self, method, path, body=None, query=None):
+        resp = self._request(method, path, body, query)
+        return json.loads(resp.read() or b"{}")
+
+    def _stream(self, resp):
+        try:
+            for line in resp:
+                msg = json.loads(line)
+                if "delta" in msg:
+                    yield msg["delta"]
+                elif "error" in msg:
+                    raise RuntimeError(msg["error"])
+        finally:
+            resp.close()
+
+    # ---- AgentManager-compatible ----
+    def send_to(self, name, task):
+        if task.get("path") and os.path.isfile(task["path"]):
+            task = dict(task)
+            task["upload"] = self.upload(task.pop("path"))
+        resp = self._request("POST", f"/agents/{quote(name)}", task)
+        if resp.getheader("Content-Type", "").startswith("application/x-ndjson"):
+            # The connection is busy until the stream is read; later calls on this thread open a new one
+            self.local.conn = None
+            return self._stream(resp)
+        result = json.loads(resp.read() or b"{}")
+        if result.get("tts_file"):
+            result["tts_path"] = self._fetch_audio(result.pop("tts_file"))
+        return result
+
+    def upload(self, path):
+        """Sends a local file to the server; returns the upload id tasks refer to."""
+        with open(path, "rb") as f:
+            data = f.read()
+        resp = self._request("POST", "/uploads", query={"name": os.path.basename(path)}, raw=data)
+        out = json.loads(resp.read() or b"{}")
+        if "upload" not in out:
+            raise RuntimeError(out.get("error", f"upload failed ({resp.status})"))
+        return out["upload"]
+
+    def _fetch_audio(self, name):
+        # Files are named by content hash, so one already downloaded is current
+        path = os.path.join(self.audio_dir, os.path.basename(name))
+        if not os.path.exists(path):
+            resp = self._request("GET", f"/tts/{quote(name)}")
+            data = resp.read()
+            if resp.status != 200:
+                return None
+            os.makedirs(self.audio_dir, exist_ok=True)
+            tmp = path + ".part"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return path
+
+    def pause(self):
+        """Holds queued work in every API worker (running calls finish)."""
+        self.paused = self._json("POST", "/agents/pause").get("paused", self.paused)
+        return self.paused
+
+    def resume(self):
+        self.paused = self._json("POST", "/agents/resume").get("paused", self.paused)
+
+    def stats(self):
+        return self._json("GET", "/agents").get("stats", {})
+
+    def health(self):
+        return self._json("GET", "/healthz")
+
+    def ready(self):
+        return self._json("GET", "/readyz")
+
+    # ---- sessions and memory, with the signatures make_app() expects ----
+    def create_session(self, name="default"):
+        return self._json("POST", "/sessions", {"name": name})["session_id"]
+
+    def append_event(self, session_id, role, content):
+        self._json("POST", f"/sessions/{int(session_id)}/events", {"role": role, "content": content})
+
+    def get_recent_events(self, session_id, limit=50):
+        events = self._json("GET", f"/sessions/{int(session_id)}/events", query={"limit": limit})["events"]
+        return [(e["role"], e["content"], e["ts"]) for e in events]
+
+    def search_events(self, session_id, query, limit=10):
+        events = self._json("GET", f"/sessions/{int(session_id)}/search", query={"q": query, "limit": limit})["events"]
+        return [(e["role"], e["content"], e["ts"]) for e in events]
+
+    def remember(self, session_id, key, value):
+        self._json("POST", f"/sessions/{int(session_id)}/memory", {"key": key, "value": value})
+
+    def memory_read_many(self, session_id, keys):
+        return self._json("GET", f"/sessions/{int(session_id)}/memory", query={"keys": ",".join(keys)})["memory"]
+
+    def ui_helpers(self):
+        """Keyword arguments for ui.app.make_app."""
+        return {
+            "create_session": self.create_session,
+            "append_event": self.append_event,
+            "get_recent_events": self.get_recent_events,
+            "search_events": self.search_events,
+            "remember": self.remember,
+        }
@@ -0,0 +1,469 @@
+# server.py — headless HTTP/JSON API for Raybot PRO agents, sessions and memory
+#
+# Standard library only. The parent process binds one listening socket,
+# prepares the database schema and forks API_WORKERS worker processes that
+# all accept from it; dead workers are replaced. Each worker builds its own
+# AgentManager (agents/registry.py) and serves requests on threads, so
+# CPU-bound agents scale with the number of processes. All state lives in
+# the shared SQLite database (WAL), and the per-process caches in front of it
+# (chat context, memory) check it for other workers' writes, so any worker
+# can answer any request.
+#
+# Routes (JSON in, JSON out):
+#     GET  /healthz                      process is up
+#     GET  /readyz                       DB reachable, schema current, agents accepting work
+#     GET  /metrics                      latency histograms of this worker (tools/tracing.py)
+#     GET  /agents                       registered agents and their queue stats
+#     POST /agents/<name>                task -> result; streaming agents answer in NDJSON
+#     POST /agents/pause, /agents/resume hold / release queued work in every worker
+#     POST /uploads                      raw file body (?name=talk.mp3) -> {"upload": id}
+#     GET  /tts/<file>                   audio named by a voice agent "tts_file" result
+#     POST /sessions                     {"name"} -> {"session_id"}
+#     GET  /sessions/<id>/events         ?limit=50
+#     POST /sessions/<id>/events         {"role", "content"}
+#     GET  /sessions/<id>/search         ?q=...&limit=10&any=1
+#     GET  /sessions/<id>/memory         ?keys=a,b (or the latest entries)
+#     POST /sessions/<id>/memory         {"key", "value"} or {"items": {key: value}}
+#
+# Agent tasks are checked against api/tasks.py: network clients can only
+# use the listed keys and refer to files through their uploads. With
+# RAYBOT_API_TOKEN set, requests need "Authorization: Bearer <token>"; the
+# server refuses to listen on a non-loopback address without one.
+#
+# Run from the project folder:
+#     python -m api.server --workers 4 --port 8000
+
+import argparse
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import re
+import signal
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import API_HOST, API_PORT, API_WORKERS, API_MAX_BODY, API_TOKEN
+from api.tasks import TaskRejected, check_task, save_upload
+
+class ApiError(Exception):
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.body = {"error": message, **extra}
+
+def _status_for(result):
+    """HTTP status for an agent result: load shedding and pauses are not 200s."""
+    if isinstance(result, dict) and "error" in result:
+        if result["error"] == "busy":
+            return 429
+        if result["error"] == "Agents are paused":
+            return 503
+    return 200
+
+class FileReply:
+    """A route result sent as the raw file instead of JSON."""
+
+    def __init__(self, path, content_type):
+        self.path = path
+        self.content_type = content_type
+
+_TTS_FILE = re.compile(r"[0-9a-f]{64}\.(wav|mp3)$")
+_OPEN_ROUTES = ("/healthz", "/readyz")   # probes answer without a token
+
+class Api:
+    """Request handling independent of the HTTP plumbing; one per worker process.
+
+    control(action) applies "pause" / "resume" to every worker; by default
+    only to this process's manager.
+    """
+
+    def __init__(self, manager, token=API_TOKEN, control=None):
+        from tools import db
+        from tools import memory
+        self.manager = manager
+        self.db = db
+        self.memory = memory
+        self.token = token
+        self.control = control or (lambda action: getattr(manager, action)())
+        self.started = time.time()
+        self.routes = [
+            ("GET", r"/healthz", self.health),
+            ("GET", r"/readyz", self.ready),
+            ("GET", r"/metrics", self.metrics),
+            ("GET", r"/agents", self.list_agents),
+            ("POST", r"/agents/(?P<action>pause|resume)", self.pause_resume),
+            ("POST", r"/agents/(?P<name>[\w-]+)", self.call_agent),
+            ("POST", r"/uploads", self.upload),
+            ("GET", r"/tts/(?P<filename>[\w.]+)", self.tts_file),
+            ("POST", r"/sessions", self.create_session),
+            ("GET", r"/sessions/(?P<sid>\d+)/events", self.get_events),
+            ("POST", r"/sessions/(?P<sid>\d+)/events", self.append_event),
+            ("GET", r"/sessions/(?P<sid>\d+)/search", self.search),
+            ("GET", r"/sessions/(?P<sid>\d+)/memory", self.read_memory),
+            ("POST", r"/sessions/(?P<sid>\d+)/memory", self.write_memory),
+        ]
+        self.routes = [(m, re.compile(p + "$"), fn) for m, p, fn in self.routes]
+
+    def dispatch(self, method, path, query, body, headers=None):
+        """Returns (status, payload); payload is a dict, a FileReply or an iterator of stream pieces."""
+        if self.token and path not in _OPEN_ROUTES:
+            auth = (headers or {}).get("Authorization") or ""
+            if not hmac.compare_digest(auth.encode(), f"Bearer {self.token}".encode()):
+                raise ApiError(401, "Missing or wrong API token")
+        allowed = False
+        for m, pattern, fn in self.routes:
+            match = pattern.match(path)
+            if match:
+                if m == method:
+                    return fn(query=query, body=body, **match.groupdict())
+                allowed = True
+        if allowed:
+            raise ApiError(405, "Method not allowed")
+        raise ApiError(404, f"No route for {path}")
+
+    # ---- health ----
+    def health(self, **_):
+        return 200, {"status": "ok", "pid": os.getpid(), "uptime_s": round(time.time() - self.started, 1)}
+
+    def ready(self, **_):
+        from tools.migrations import SCHEMA_VERSION, schema_version
+        try:
+            conn = self.db.get_conn()
+            conn.execute("SELECT 1").fetchone()
+            version = schema_version(conn)
+        except Exception as e:
+            return 503, {"ready": False, "reason": f"database: {e}"}
+        if version < SCHEMA_VERSION:
+            return 503, {"ready": False, "reason": f"schema {version} < {SCHEMA_VERSION}"}
+        if self.manager.paused:
+            return 503, {"ready": False, "reason": "agents paused"}
+        return 200, {"ready": True, "pid": os.getpid(), "schema": version, "agents": sorted(self.manager.agents)}
+
+    def metrics(self, **_):
+        from tools.tracing import snapshot
+        return 200, {"pid": os.getpid(), **snapshot()}
+
+    # ---- agents ----
+    def list_agents(self, **_):
+        return 200, {"agents": sorted(self.manager.agents), "stats": self.manager.stats()}
+
+    def call_agent(self, name, body, **_):
+        if name not in self.manager.agents:
+            raise ApiError(404, f"Agent '{name}' not found")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Task must be a JSON object")
+        try:
+            task = check_task(name, body)
+        except TaskRejected as e:
+            raise ApiError(400, str(e))
+        result = self.manager.send_to(name, task)
+        if hasattr(result, "__next__"):
+            return 200, result
+        if isinstance(result, dict) and result.get("tts_path"):
+            # Server paths mean nothing to a remote client: name the file to GET from /tts/
+            result = dict(result, tts_file=os.path.basename(result.pop("tts_path")))
+        return _status_for(result), result
+
+    def pause_resume(self, action, **_):
+        self.control(action)
+        return 200, {"paused": action == "pause"}
+
+    def upload(self, body, query, **_):
+        if not isinstance(body, bytes) or not body:
+            raise ApiError(400, "Send the file as the request body")
+        return 201, {"upload": save_upload(body, query.get("name", [""])[0])}
+
+    def tts_file(self, filename, **_):
+        from tools.tts_cache import tts_cache
+        path = os.path.join(tts_cache.directory, filename)
+        if not _TTS_FILE.match(filename) or not os.path.isfile(path):
+            raise ApiError(404, "No such audio file")
+        return 200, FileReply(path, "audio/mpeg" if filename.endswith(".mp3") else "audio/wav")
+
+    # ---- sessions and memory ----
+    def create_session(self, body, **_):
+        name = (body or {}).get("name") or f"api_{int(time.time())}"
+        return 201, {"session_id": self.db.create_session(name)}
+
+    def get_events(self, sid, query, **_):
+        limit = _int(query, "limit", 50)
+        rows = self.db.get_recent_events(int(sid), limit=limit)
+        return 200, {"events": [{"role": r, "content": c, "ts": ts} for r, c, ts in rows]}
+
+    def append_event(self, sid, body, **_):
+        body = body or {}
+        if not body.get("content"):
+            raise ApiError(400, "content is required")
+        self.db.append_event(int(sid), body.get("role", "user"), str(body["content"]))
+        return 201, {"ok": True}
+
+    def search(self, sid, query, **_):
+        q = query.get("q", [""])[0]
+        any_term = query.get("any", ["0"])[0] in ("1", "true")
+        rows = self.db.search_events(int(sid), q, limit=_int(query, "limit", 10), any_term=any_term)
+        return 200, {"events": [{"role": r, "content": c, "ts": ts} for r, c, ts in rows]}
+
+    def read_memory(self, sid, query, **_):
+        keys = [k for k in ",".join(query.get("keys", [])).split(",") if k]
+        if keys:
+            return 200, {"memory": self.memory.memory_read_many(int(sid), keys)}
+        rows = self.db.list_memory(int(sid), limit=_int(query, "limit", 50))
+        return 200, {"memory": dict(rows)}
+
+    def write_memory(self, sid, body, **_):
+        body = body or {}
+        items = body.get("items")
+        if items is None and "key" in body:
+            items = {body["key"]: body.get("value")}
+        if not isinstance(items, dict) or not items:
+            raise ApiError(400, 'Expected {"key", "value"} or {"items": {...}}')
+        self.memory.memory_write_many(int(sid), {str(k): str(v) for k, v in items.items()})
+        return 200, {"ok": True, "written": len(items)}
+
+def _int(query, name, default):
+    try:
+        return max(1, int(query.get(name, [default])[0]))
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive for load balancers and clients
+        server_version = "RaybotAPI"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def _handle(self, method):
+            url = urlsplit(self.path)
+            path = url.path.rstrip("/") or "/"
+            try:
+                body = self._read_body(raw=path == "/uploads") if method == "POST" else None
+                status, payload = api.dispatch(method, path, parse_qs(url.query), body, self.headers)
+            except ApiError as e:
+                status, payload = e.status, e.body
+            except Exception as e:
+                logging.exception(f"API error on {method} {url.path}")
+                status, payload = 500, {"error": str(e)}
+
+            if hasattr(payload, "__next__"):
+                self._stream(payload)
+            elif isinstance(payload, FileReply):
+                self._send_file(payload)
+            else:
+                self._send(status, payload)
+
+        def _read_body(self, raw=False):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > API_MAX_BODY:
+                raise ApiError(413, "Request body too large")
+            if raw:
+                return self.rfile.read(length)
+            if not length:
+                return {}
+            try:
+                return json.loads(self.rfile.read(length))
+            except ValueError:
+                raise ApiError(400, "Body is not valid JSON")
+
+        def _send(self, status, payload):
+            data = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if status == 429 and payload.get("retry_after") is not None:
+                self.send_header("Retry-After", str(max(1, round(payload["retry_after"]))))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_file(self, reply):
+            with open(reply.path, "rb") as f:
+                data = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", reply.content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, pieces):
+            # One JSON object per line, sent as each piece is produced
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for piece in pieces:
+                    self._chunk({"delta": piece})
+                self._chunk({"done": True})
+            except (BrokenPipeError, ConnectionResetError):
+                pieces.close()
+                self.close_connection = True
+                return
+            except Exception as e:
+                self._chunk({"error": str(e)})
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _chunk(self, obj):
+            data = (json.dumps(obj, default=str) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, sock, handler):
+        super().__init__(sock.getsockname()[:2], handler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = sock   # shared with the other workers
+        self.server_address = sock.getsockname()
+
+def listen(host=API_HOST, port=API_PORT, backlog=1024):
+    sock = socket.create_server((host, port), backlog=backlog)
+    # Every worker polls the same socket: whoever loses the race to accept just goes back to polling
+    sock.setblocking(False)
+    return sock
+
+def _share_transcription(workers):
+    """Splits the Whisper process count and memory budget between `workers` API workers."""
+    from tools.transcriber import service
+    from tools.whisper_models import registry
+    service.workers = max(1, service.workers // workers)
+    service.memory_mb = max(1, service.memory_mb // workers)
+    registry.budget //= workers
+
+def serve_worker(sock, manager=None, workers=1, paused=False):
+    """Serves requests on sock in this process until it is terminated.
+
+    workers > 1 means this is one of several forked workers: transcription
+    budgets are split between them and pause / resume go through the parent.
+    """
+    from tools.bootstrap import init
+    init()
+    if workers > 1:
+        _share_transcription(workers)
+    if manager is None:
+        from agents.registry import build_agent_manager
+        manager = build_agent_manager()
+    control = None
+    if workers > 1:
+        # The parent relays SIGUSR1 (pause) / SIGUSR2 (resume) to every worker
+        control = lambda action: os.kill(os.getppid(), signal.SIGUSR1 if action == "pause" else signal.SIGUSR2)
+        for signum, action in ((signal.SIGUSR1, manager.pause), (signal.SIGUSR2, manager.resume)):
+            # Not in the handler itself: the manager's lock may be held by the interrupted code
+            signal.signal(signum, lambda *_, fn=action: threading.Thread(target=fn, daemon=True).start())
+        if paused:
+            manager.pause()
+    server = ApiServer(sock, make_handler(Api(manager, control=control)))
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        manager.shutdown(wait=False)
+
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def serve(host=API_HOST, port=API_PORT, workers=API_WORKERS):
+    """Binds once and runs `workers` pre-forked worker processes, replacing any that die."""
+    if not API_TOKEN and not _is_loopback(host):
+        raise SystemExit(f"Refusing to serve on {host} without RAYBOT_API_TOKEN (or bind to 127.0.0.1)")
+    sock = listen(host, port)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    logging.info(f"Raybot API on http://{host}:{sock.getsockname()[1]} with {workers} worker(s)")
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        serve_worker(sock)
+        return
+
+    # Migrate once here; workers must not inherit an open SQLite connection
+    from tools import db
+    db.init_db()
+    db.close_all()
+
+    children, stopping, paused = set(), [], []
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # Ctrl-C reaches the whole process group; the parent alone decides to stop
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            code = 0
+            try:
+                serve_worker(sock, workers=workers, paused=bool(paused))
+            except SystemExit as e:
+                code = e.code or 0
+            except BaseException:
+                logging.exception("API worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def stop(*_):
+        stopping.append(True)
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def relay(signum, _frame):
+        # A worker asked for pause / resume: remembered for replacements, passed on to all
+        paused[:] = [True] if signum == signal.SIGUSR1 else []
+        for pid in list(children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, relay)
+    signal.signal(signal.SIGUSR2, relay)
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            logging.warning(f"API worker {pid} exited ({status}); starting a new one")
+            time.sleep(0.5)
+            spawn()
+
+def main():
+    ap = argparse.ArgumentParser(description="Raybot PRO HTTP API")
+    ap.add_argument("--host", default=API_HOST)
+    ap.add_argument("--port", type=int, default=API_PORT)
+    ap.add_argument("--workers", type=int, default=API_WORKERS)
+    args = ap.parse_args()
+    serve(args.host, args.port, args.workers)
+
+if __name__ == "__main__":
+    main()
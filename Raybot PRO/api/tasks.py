@@ -0,0 +1,85 @@
+# tasks.py — which agent tasks the HTTP API accepts
+#
+# In-process callers may hand agents server paths, output files, archive
+# paths to ingest and process counts; a network client must not. Every
+# agent reachable over HTTP lists the task keys (and actions) it may be
+# sent, anything else is rejected, and files only come from the API's own
+# upload directory: {"upload": "<id from POST /uploads>"} becomes "path".
+# Agents missing from TASKS are not exposed at all.
+
+import os
+import re
+import time
+import uuid
+
+from config import API_UPLOAD_DIR, API_UPLOAD_MAX_AGE
+
+class TaskRejected(ValueError):
+    pass
+
+_UPLOAD_ID = re.compile(r"[0-9a-f]{32}(\.[a-z0-9]{1,5})?$")
+_EXT = re.compile(r"\.[a-z0-9]{1,5}$")
+
+# agent -> {"keys": allowed task keys, "actions": allowed values of "action", "upload": accepts a file}
+TASKS = {
+    "chat": {"keys": {"message", "session_id", "stream", "cache", "max_prompt_tokens"}},
+    "summarizer": {"keys": {"text", "texts", "max_sentences", "hierarchical"}, "upload": True},
+    "quiz": {"keys": {"text", "texts", "n", "seed"}},
+    "news": {"keys": {"action", "query", "limit", "offset"}, "actions": {"fetch", "stats"}},
+    "voice": {"keys": {"action", "stream", "text", "voice"}, "upload": True,
+              "actions": {"transcribe", "tts", "models", "transcriber", "tts_cache"}},
+    "lecture": {"keys": set(), "upload": True},
+    "eval": {"keys": set()},
+    "start_long_task": {"keys": {"seconds"}},
+    "pause_long_task": {"keys": {"job_id"}},
+    "resume_long_task": {"keys": {"job_id"}},
+    "cancel_long_task": {"keys": {"job_id"}},
+    "job_status": {"keys": {"job_id", "limit"}},
+}
+
+def check_task(name, task, upload_dir=API_UPLOAD_DIR):
+    """Returns the task an agent may run for a network client, or raises TaskRejected."""
+    spec = TASKS.get(name)
+    if spec is None:
+        raise TaskRejected(f"Agent '{name}' is not available over the API")
+
+    allowed = spec["keys"] | ({"upload"} if spec.get("upload") else set())
+    unknown = sorted(set(task) - allowed)
+    if unknown:
+        raise TaskRejected(f"Unsupported task keys for '{name}': {', '.join(unknown)}")
+    if "action" in task and task["action"] not in spec.get("actions", ()):
+        raise TaskRejected(f"Unsupported action for '{name}': {task['action']}")
+
+    task = dict(task)
+    if "upload" in task:
+        task["path"] = upload_path(task.pop("upload"), upload_dir)
+    return task
+
+def upload_path(upload_id, upload_dir=API_UPLOAD_DIR):
+    if not isinstance(upload_id, str) or not _UPLOAD_ID.match(upload_id):
+        raise TaskRejected("upload must be an id returned by POST /uploads")
+    path = os.path.join(upload_dir, upload_id)
+    if not os.path.isfile(path):
+        raise TaskRejected("Unknown or expired upload")
+    return path
+
+def save_upload(data, filename="", upload_dir=API_UPLOAD_DIR, max_age=API_UPLOAD_MAX_AGE):
+    """Stores an uploaded file under a random id (keeping a short extension); returns the id."""
+    os.makedirs(upload_dir, exist_ok=True)
+    _expire(upload_dir, max_age)
+    ext = _EXT.search((filename or "").lower())
+    upload_id = uuid.uuid4().hex + (ext.group() if ext else "")
+    tmp = os.path.join(upload_dir, "." + upload_id)
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, os.path.join(upload_dir, upload_id))
+    return upload_id
+
+def _expire(upload_dir, max_age):
+    cutoff = time.time() - max_age
+    for entry in os.scandir(upload_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass   # removed by another worker meanwhile
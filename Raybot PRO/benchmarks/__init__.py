@@ -0,0 +1 @@
+# makes benchmarks importable
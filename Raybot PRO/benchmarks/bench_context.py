@@ -0,0 +1,66 @@
+# bench_context.py — prompt size spread: fixed-window rule vs token-budgeted builder
+#
+# Replays a session where most messages are short but a few are pasted
+# essays, and reports estimated prompt tokens (p50 / p95 / max) and build
+# time for the previous "3-sentence summary of the window + message" rule
+# and for tools/context_builder at the configured budget.
+# Run from the project folder:
+#     python -m benchmarks.bench_context
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import make_text
+
+TURNS = 200
+ESSAY_RATE = 0.05
+
+def _pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))]
+
+def main():
+    os.environ["RAYBOT_DB"] = os.path.join(tempfile.mkdtemp(prefix="raybot_bench_"), "context.sqlite")
+
+    from config import CONTEXT_TOKEN_BUDGET
+    from tools.db import init_db, create_session, append_event, remember
+    from tools.context_cache import context_cache
+    from tools.context_builder import SYSTEM_PROMPT, build_context, estimate_tokens
+
+    init_db()
+    sid = create_session("bench")
+    for i in range(10):
+        remember(sid, f"fact{i}", make_text(80, seed=i))
+
+    rnd = random.Random(3)
+    old, new, old_t, new_t = [], [], [], []
+    for i in range(TURNS):
+        size = rnd.randint(20000, 60000) if rnd.random() < ESSAY_RATE else rnd.randint(20, 300)
+        message = make_text(size, seed=i)
+        append_event(sid, "user", message)
+
+        start = time.perf_counter()
+        summary = context_cache.summary(sid, max_sentences=3)
+        user = (summary + "\n\nUser: " + message) if summary else message
+        old_t.append(time.perf_counter() - start)
+        old.append(estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(user))
+
+        start = time.perf_counter()
+        ctx = build_context(sid, message)
+        new_t.append(time.perf_counter() - start)
+        new.append(ctx["tokens"]["total"])
+
+        append_event(sid, "assistant", make_text(rnd.randint(100, 800), seed=10000 + i))
+
+    print(f"{TURNS} turns, {ESSAY_RATE:.0%} pasted essays, budget {CONTEXT_TOKEN_BUDGET} tokens (estimated)")
+    for label, sizes, times in (("fixed window rule", old, old_t), ("token-budgeted builder", new, new_t)):
+        print(f"{label:<24} tokens p50 {_pct(sizes, 0.5):6d}  p95 {_pct(sizes, 0.95):6d}  max {max(sizes):6d}   "
+              f"build p50 {_pct(times, 0.5) * 1000:6.2f} ms  p95 {_pct(times, 0.95) * 1000:6.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# bench_db.py — per-call latency of tools/db.py (connect-per-call vs pooled vs write-behind)
+#
+# Run from the project folder:
+#     python -m benchmarks.bench_db
+
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N = 2000
+
+def _timeit(fn, n=N):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1e6  # µs per call
+
+def _legacy_append(path, session_id, content):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO events (session_id, role, content, ts) VALUES (?,?,?,?)",
+        (session_id, "user", content, datetime.utcnow().isoformat())
+    )
+    conn.commit()
+    conn.close()
+
+def _legacy_recent(path, session_id, limit=12):
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        "SELECT role, content, ts FROM events WHERE session_id=? ORDER BY id DESC LIMIT ?",
+        (session_id, limit)
+    ).fetchall()
+    conn.close()
+    return rows[::-1]
+
+def main():
+    tmp = tempfile.mkdtemp(prefix="raybot_bench_")
+    os.environ["RAYBOT_DB"] = os.path.join(tmp, "bench.sqlite")
+
+    from tools import db
+
+    sid = db.create_session("bench")
+    path = db.DB_PATH
+
+    # Legacy path uses its own rollback-journal file so WAL does not help it
+    legacy_path = os.path.join(tmp, "legacy.sqlite")
+    conn = sqlite3.connect(legacy_path)
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, session_id INTEGER, role TEXT, content TEXT, ts TEXT)")
+    conn.commit()
+    conn.close()
+
+    results = {
+        "append_event (legacy)": _timeit(lambda i: _legacy_append(legacy_path, sid, f"msg {i}")),
+        "append_event (pooled)": _timeit(lambda i: db.append_event(sid, "user", f"msg {i}")),
+        "get_recent_events (legacy)": _timeit(lambda i: _legacy_recent(legacy_path, sid)),
+        "get_recent_events (pooled)": _timeit(lambda i: db.get_recent_events(sid, limit=12)),
+    }
+
+    db.enable_write_behind()
+    results["append_event (write-behind)"] = _timeit(lambda i: db.append_event(sid, "user", f"msg {i}"))
+    results["get_recent_events (write-behind)"] = _timeit(lambda i: db.get_recent_events(sid, limit=12))
+    db.disable_write_behind()
+
+    print(f"db: {path}  calls per case: {N}")
+    for name, us in results.items():
+        print(f"{name:<30} {us:10.1f} µs/call")
+
+    db.close_all()
+
+if __name__ == "__main__":
+    main()
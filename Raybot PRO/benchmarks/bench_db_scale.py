@@ -0,0 +1,68 @@
+# bench_db_scale.py — recall / get_recent_events latency as the DB grows
+#
+# Run from the project folder:
+#     python -m benchmarks.bench_db_scale                 # 10k -> 1M rows
+#     python -m benchmarks.bench_db_scale 10000000        # up to 10M rows (slow to build)
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SESSIONS = 1000
+KEYS = 20
+QUERIES = 2000
+
+def _grow(conn, start, stop):
+    """Bulk-loads events and memory rows [start, stop) across SESSIONS sessions."""
+    ts = "2025-01-01T00:00:00"
+    step = 100_000
+    for lo in range(start, stop, step):
+        hi = min(stop, lo + step)
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (session_id, role, content, ts) VALUES (?,?,?,?)",
+                ((i % SESSIONS, "user", f"message number {i}", ts) for i in range(lo, hi))
+            )
+            conn.executemany(
+                "INSERT INTO memory (session_id, key, value, ts) VALUES (?,?,?,?) "
+                "ON CONFLICT (session_id, key) DO UPDATE SET value=excluded.value, ts=excluded.ts",
+                ((i % SESSIONS, f"k{i % KEYS}", str(i), ts) for i in range(lo, hi))
+            )
+
+def _latency(fn):
+    rnd = random.Random(7)
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        fn(rnd.randrange(SESSIONS), rnd.randrange(KEYS))
+    return (time.perf_counter() - start) / QUERIES * 1e6
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    os.environ["RAYBOT_DB"] = os.path.join(tempfile.mkdtemp(prefix="raybot_bench_"), "scale.sqlite")
+
+    from tools import db
+
+    conn = db.get_conn()
+    sizes = []
+    n = 10_000
+    while n <= max_rows:
+        sizes.append(n)
+        n *= 10
+
+    print(f"{'rows':>12} {'recall µs':>12} {'recent(12) µs':>15}")
+    loaded = 0
+    for size in sizes:
+        _grow(conn, loaded, size)
+        loaded = size
+        recall_us = _latency(lambda s, k: db.recall(s, f"k{k}"))
+        recent_us = _latency(lambda s, k: db.get_recent_events(s, limit=12))
+        print(f"{size:>12,} {recall_us:>12.1f} {recent_us:>15.1f}")
+
+    db.close_all()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# bench_llm_cache.py — chat_agent with the LLM response cache vs without
+#
+# Uses benchmarks/stub_llm.StubLLM, which counts calls, so no network is needed.
+# Run from the project folder:
+#     python -m benchmarks.bench_llm_cache
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TURNS = 300
+FAQ = ["What can you do?", "How do I make a quiz?", "Summarize this for me", "Hello!", "What is Raybot PRO?"]
+
+def main():
+    os.environ["RAYBOT_DB"] = os.path.join(tempfile.mkdtemp(prefix="raybot_bench_"), "cache.sqlite")
+
+    from agents.chat_agent import chat_agent_factory
+    from benchmarks.stub_llm import StubLLM
+    from tools.llm_cache import LLMCache
+
+    rnd = random.Random(1)
+    questions = [rnd.choice(FAQ) for _ in range(TURNS)]
+
+    for label, cache in (("no cache", None), ("cached", LLMCache())):
+        client = StubLLM(latency=0.02)
+        agent = chat_agent_factory(client, cache=cache)
+        start = time.perf_counter()
+        for q in questions:
+            agent({"message": q})
+        elapsed = time.perf_counter() - start
+        print(f"{label:<9} upstream calls={client.calls:>4}  {elapsed / TURNS * 1000:7.2f} ms/turn")
+        if cache is not None:
+            print("          ", cache.stats())
+
+    # Restart: a fresh cache object still hits the SQLite tier
+    client = StubLLM()
+    agent = chat_agent_factory(client, cache=LLMCache())
+    agent({"message": FAQ[0]})
+    agent({"message": FAQ[0], "cache": False})
+    print(f"after restart: upstream calls={client.calls} (1 expected: the opted-out request)")
+
+if __name__ == "__main__":
+    main()
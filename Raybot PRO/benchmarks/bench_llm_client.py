@@ -0,0 +1,90 @@
+# bench_llm_client.py — raw OpenAI client vs ResilientLLM under injected faults
+#
+# Points the real `openai` client at benchmarks/fake_openai_server with a
+# share of 503s and slow responses, then reports success rate and latency
+# percentiles for: the bare client, retries, retries + hedging, and a fully
+# down upstream (where the breaker should turn waits into instant offline replies).
+# Run from the project folder:
+#     python -m benchmarks.bench_llm_client
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REQUESTS = 200
+ERROR_RATE = 0.2
+SLOW_RATE = 0.05
+SLOW_LATENCY = 1.0
+TOKENS = 5
+TOKEN_LATENCY = 0.002
+FIRST_TOKEN_LATENCY = 0.01
+
+def _pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))] * 1000 if xs else 0.0
+
+def _run(label, create, n=REQUESTS):
+    ok, times = 0, []
+    for i in range(n):
+        start = time.perf_counter()
+        try:
+            create(model="fake", messages=[{"role": "user", "content": f"q{i}"}], temperature=0)
+            ok += 1
+        except Exception:
+            pass
+        times.append(time.perf_counter() - start)
+    print(f"{label:<28} success {ok / n:6.1%}   p50 {_pct(times, 0.5):7.1f} ms   "
+          f"p99 {_pct(times, 0.99):7.1f} ms   max {max(times) * 1000:7.1f} ms")
+
+def main():
+    try:
+        import httpx
+        from openai import OpenAI
+    except Exception:
+        print("openai SDK not installed; this benchmark needs the real client")
+        return
+
+    os.environ["RAYBOT_DB"] = os.path.join(tempfile.mkdtemp(prefix="raybot_bench_"), "client.sqlite")
+    os.environ["RAYBOT_LLM_CACHE"] = "0"
+
+    from benchmarks import fake_openai_server
+    from tools.llm_client import CircuitBreaker, ResilientLLM
+    from agents.chat_agent import chat_agent_factory
+
+    _, cfg, url = fake_openai_server.start(
+        tokens=TOKENS, token_latency=TOKEN_LATENCY, first_token_latency=FIRST_TOKEN_LATENCY,
+        error_rate=ERROR_RATE, slow_rate=SLOW_RATE, slow_latency=SLOW_LATENCY, seed=7,
+    )
+    raw = OpenAI(base_url=url, api_key="test", max_retries=0, http_client=httpx.Client(limits=httpx.Limits(max_connections=20)))
+    print(f"fake server {url}: {ERROR_RATE:.0%} 503s, {SLOW_RATE:.0%} slow ({SLOW_LATENCY:.1f}s), {REQUESTS} requests each")
+
+    _run("raw client", raw.chat.completions.create)
+
+    retrying = ResilientLLM(raw, retries=3, backoff_base=0.01, backoff_max=0.1, deadline=5)
+    _run("retries + backoff", retrying.create)
+    print(f"  {retrying.stats()}")
+
+    hedged = ResilientLLM(raw, retries=3, backoff_base=0.01, backoff_max=0.1, deadline=5, hedge_after=0.1)
+    _run("retries + hedge @100ms", hedged.create)
+    print(f"  {hedged.stats()}")
+
+    # Upstream fully down: chat turns via chat_agent, breaker opens after 5 failures
+    cfg.down = True
+    client = ResilientLLM(raw, retries=2, backoff_base=0.05, deadline=5,
+                          breaker=CircuitBreaker(failures=5, cooldown=30))
+    chat = chat_agent_factory(client, cache=None)
+    times = []
+    for i in range(50):
+        start = time.perf_counter()
+        reply = chat({"message": f"hello {i}"})["reply"]
+        times.append(time.perf_counter() - start)
+    print(f"{'upstream down (chat_agent)':<28} first 5 turns {sum(times[:5]) / 5 * 1000:7.1f} ms avg   "
+          f"after breaker opens {sum(times[5:]) / len(times[5:]) * 1000:6.2f} ms avg")
+    print(f"  last reply: {reply!r}")
+    print(f"  {client.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench_memory.py — reading ten profile facts per turn: per-key recall vs
+# memory_read_many (one query) vs the warm read-through cache (no query)
+#
+# Run from the project folder:
+#     python -m benchmarks.bench_memory             # 1,000 sessions x 50 keys
+#     python -m benchmarks.bench_memory 10000
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+KEYS = 50
+FACTS = 10
+TURNS = 5_000
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    os.environ["RAYBOT_DB"] = os.path.join(tempfile.mkdtemp(prefix="raybot_bench_"), "memory.sqlite")
+
+    from tools import db
+    from tools.memory import memory_cache, memory_read_many, memory_write_many
+
+    start = time.perf_counter()
+    for s in range(sessions):
+        memory_write_many(s, {f"fact{k}": f"value {s}/{k}" for k in range(KEYS)})
+    print(f"memory_write_many {sessions:,} x {KEYS} keys: {time.perf_counter() - start:.2f} s")
+
+    rnd = random.Random(3)
+    hot = rnd.sample(range(sessions), min(sessions, 50))    # sessions active in this process
+    facts = [f"fact{k}" for k in range(FACTS)]
+    turns = [rnd.choice(hot) for _ in range(TURNS)]
+
+    def per_key(s):
+        return {k: db.recall(s, k) for k in facts}
+
+    def cache_off(s):
+        return db.recall_many(s, facts)
+
+    print(f"{'10 facts per turn':<28} {'µs/turn':>9}")
+    for label, fn in (("recall x10", per_key), ("recall_many (1 query)", cache_off),
+                      ("memory_read_many (cached)", lambda s: memory_read_many(s, facts))):
+        start = time.perf_counter()
+        for s in turns:
+            fn(s)
+        print(f"{label:<28} {(time.perf_counter() - start) / TURNS * 1e6:>9.1f}")
+
+    # Every turn also writes one fact, as a chat agent updating a profile would
+    start = time.perf_counter()
+    for i, s in enumerate(turns):
+        memory_write_many(s, {"last_turn": str(i)})
+        memory_read_many(s, facts + ["last_turn"])
+    print(f"{'write 1 + read 11 (cached)':<28} {(time.perf_counter() - start) / TURNS * 1e6:>9.1f}")
+    print(memory_cache.stats())
+    db.close_all()
+
+if __name__ == "__main__":
+    main()
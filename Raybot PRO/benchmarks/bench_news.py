@@ -0,0 +1,81 @@
+# bench_news.py — news archive ingestion throughput and ranked query latency
+#
+# Writes synthetic JSONL dumps (Zipf-like vocabulary: "w1" is in most
+# articles, "w40000" in a handful), bulk-ingests them into a fresh
+# tools/news_store archive, then reports query latency for rare, common
+# and multi-word queries and deep pages, plus the cost of re-ingesting an
+# unchanged directory and one with an appended file tail.
+# Run from the project folder:
+#     python -m benchmarks.bench_news              # 300k articles
+#     python -m benchmarks.bench_news 2000000      # millions (takes a few minutes)
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PER_FILE = 100_000
+QUERIES = {"rare": "w40000", "mid": "w900", "common": "w1", "two words": "w3 w75",
+           "any of three": "w500 w9000 w30000"}
+REPEAT = 50
+
+def _pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))] * 1000
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    tmp = tempfile.mkdtemp(prefix="raybot_bench_")
+    dump = os.path.join(tmp, "dump")
+    os.makedirs(dump)
+
+    from benchmarks.workloads import articles, write_jsonl
+    from tools.news_store import NewsStore
+
+    start = time.perf_counter()
+    for i, lo in enumerate(range(0, n, PER_FILE)):
+        write_jsonl(os.path.join(dump, f"part{i:04d}.jsonl"), articles(min(PER_FILE, n - lo), seed=i, start=lo))
+    size = sum(os.path.getsize(os.path.join(dump, f)) for f in os.listdir(dump))
+    print(f"generated {n:,} articles ({size / 1e6:.0f} MB JSONL) in {time.perf_counter() - start:.1f}s")
+
+    store = NewsStore(os.path.join(tmp, "news.sqlite"))
+    r = store.ingest([dump])
+    print(f"ingest        {r['seconds']:8.1f} s   {r['added'] / r['seconds']:>9,.0f} articles/s   "
+          f"{size / r['seconds'] / 1e6:6.1f} MB/s   archive {os.path.getsize(store.path) / 1e6:.0f} MB")
+
+    r = store.ingest([dump])
+    print(f"re-ingest (unchanged)        {r['seconds'] * 1000:8.1f} ms  added {r['added']}")
+    write_jsonl(os.path.join(tmp, "tail.jsonl"), articles(1_000, seed=99, start=n))
+    with open(os.path.join(dump, "part0000.jsonl"), "a") as f, open(os.path.join(tmp, "tail.jsonl")) as t:
+        f.write(t.read())
+    r = store.ingest([dump])
+    print(f"re-ingest (+1,000 appended)  {r['seconds'] * 1000:8.1f} ms  added {r['added']}")
+
+    print()
+    print(f"{'query':<28} {'p50 ms':>8} {'p99 ms':>8}  first page")
+    cases = [(f"{k} ({q})", q, 0, k.startswith("any")) for k, q in QUERIES.items()]
+    cases.append(("common, page 10 (w1)", "w1", 90, False))
+    for label, q, offset, any_term in cases:
+        times = []
+        for _ in range(REPEAT):
+            t = time.perf_counter()
+            page = store.search(q, limit=10, offset=offset, any_term=any_term)
+            times.append(time.perf_counter() - t)
+        print(f"{label:<28} {_pct(times, 0.5):>8.2f} {_pct(times, 0.99):>8.2f}  "
+              f"{len(page['results'])} results, has_more={page['has_more']}, truncated={page['truncated']}")
+
+    rnd = random.Random(1)
+    times = []
+    for _ in range(500):
+        q = f"w{rnd.randint(1, 50_000)}"
+        t = time.perf_counter()
+        store.search(q)
+        times.append(time.perf_counter() - t)
+    print(f"{'random single word x500':<28} {_pct(times, 0.5):>8.2f} {_pct(times, 0.99):>8.2f}")
+    store.close()
+
+if __name__ == "__main__":
+    main()
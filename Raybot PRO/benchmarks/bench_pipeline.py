@@ -0,0 +1,74 @@
+# bench_pipeline.py — transcribe → summarize → quiz: hand-chained vs the LECTURE pipeline
+#
+# The voice agent is a stand-in that streams a transcript piece by piece
+# at a fixed pace (like chunked Whisper); summarizer and quiz are the real
+# agents. Compares the sequential sum (each step waits for the previous
+# one) with the pipeline, where both consumers read the transcript while
+# it is produced, and with a re-run answered from the pipeline cache.
+# Run from the project folder:
+#     python -m benchmarks.bench_pipeline              # 40 pieces x 50 ms
+#     python -m benchmarks.bench_pipeline 100 0.1
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PIECE_BYTES = 20_000
+
+def main():
+    pieces = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    tmp = tempfile.mkdtemp(prefix="raybot_bench_")
+    os.environ["RAYBOT_DB"] = os.path.join(tmp, "pipeline.sqlite")
+
+    from benchmarks.corpus import make_text
+    from agents.agent_manager import AgentManager
+    from agents.pipeline import LECTURE
+    from agents.quiz_agent import quiz_agent
+    from agents.summarizer_agent import summarizer_agent
+
+    transcript = [make_text(PIECE_BYTES, seed=i) + " " for i in range(pieces)]
+
+    def fake_voice(task):
+        def stream():
+            for piece in transcript:
+                time.sleep(delay)
+                yield piece
+        return stream() if task.get("stream") else {"transcript": "".join(stream())}
+
+    manager = AgentManager()
+    manager.register("voice", fake_voice)
+    manager.register("summarizer", summarizer_agent)
+    manager.register("quiz", quiz_agent)
+
+    audio = os.path.join(tmp, "lecture.wav")
+    with open(audio, "wb") as f:
+        f.write(os.urandom(1 << 20))
+    print(f"transcript: {pieces} pieces x {PIECE_BYTES // 1000} KB, {delay * 1000:.0f} ms apart")
+
+    steps = {}
+    start = time.perf_counter()
+    text = manager.send_to("voice", {"action": "transcribe", "path": audio})["transcript"]
+    steps["transcribe"] = time.perf_counter() - start
+    t = time.perf_counter()
+    manager.send_to("summarizer", {"text": text, "max_sentences": 3})
+    steps["summarize"] = time.perf_counter() - t
+    t = time.perf_counter()
+    manager.send_to("quiz", {"text": text, "n": 5})
+    steps["quiz"] = time.perf_counter() - t
+    sequential = time.perf_counter() - start
+    print("sequential   " + "  ".join(f"{k} {v:.2f}s" for k, v in steps.items()) + f"  total {sequential:.2f}s")
+
+    r = manager.run_pipeline(LECTURE, {"path": audio})
+    print(f"pipeline     total {r['seconds']:.2f}s  ({sequential / r['seconds']:.2f}x)  stages " +
+          "  ".join(f"{k} {v:.2f}s" for k, v in r["timings"].items()))
+
+    r = manager.run_pipeline(LECTURE, {"path": audio})
+    print(f"re-run       total {r['seconds'] * 1000:.1f} ms  cached {r['cached']}")
+    manager.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# bench_quiz.py — batch quiz generation throughput, documents/s per core
+#
+# Writes a synthetic course corpus (one .txt per document) and runs
+# quiz_corpus over it with 1, 2 and all cores, checking that every run
+# produces byte-identical JSONL.
+# Run from the project folder:
+#     python -m benchmarks.bench_quiz              # 20,000 docs of ~4 KB
+#     python -m benchmarks.bench_quiz 100000 8000
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import make_text
+from tools.quiz_batch import quiz_corpus
+from tools.summarizer_engine import heuristic_quiz
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+def main():
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    doc_bytes = int(sys.argv[2]) if len(sys.argv) > 2 else 4_000
+    tmp = tempfile.mkdtemp(prefix="raybot_bench_")
+    corpus = os.path.join(tmp, "corpus")
+
+    base = [make_text(doc_bytes, seed=i) for i in range(64)]
+    for i in range(n_docs):
+        sub = os.path.join(corpus, f"unit{i // 1000:03d}")
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"doc{i:06d}.txt"), "w") as f:
+            f.write(base[i % len(base)])
+    print(f"corpus: {n_docs:,} documents x ~{doc_bytes:,} bytes")
+
+    start = time.perf_counter()
+    for i in range(min(n_docs, 5_000)):
+        heuristic_quiz(base[i % len(base)], 5)
+    single = min(n_docs, 5_000) / (time.perf_counter() - start)
+    print(f"heuristic_quiz one at a time (in memory): {single:,.0f} docs/s")
+
+    print(f"{'processes':>9} {'docs/s':>9} {'docs/s/core':>12} {'questions':>10}  output")
+    cores = os.cpu_count() or 1
+    for procs in sorted({1, 2, cores}):
+        out = os.path.join(tmp, f"quiz_{procs}.jsonl")
+        r = quiz_corpus(corpus, out, n=5, seed=7, processes=procs)
+        print(f"{procs:>9} {r['docs_per_sec']:>9,.0f} {r['docs_per_sec_per_core']:>12,.0f} "
+              f"{r['questions']:>10,}  {_digest(out)}")
+
+if __name__ == "__main__":
+    main()
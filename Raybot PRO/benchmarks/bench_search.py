@@ -0,0 +1,62 @@
+# bench_search.py — FTS5 search_events vs a LIKE scan on one large session
+#
+# Run from the project folder:
+#     python -m benchmarks.bench_search            # 200k events
+#     python -m benchmarks.bench_search 500000
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUERIES = ["w1 w2", "w3", "w40 w75", "w900", "w20000", "absent"]
+REPEAT = 20
+
+def main():
+    n_events = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    os.environ["RAYBOT_DB"] = os.path.join(tempfile.mkdtemp(prefix="raybot_bench_"), "search.sqlite")
+
+    from tools import db
+
+    sid = db.create_session("bench")
+    other = db.create_session("noise")
+    # Zipf-like vocabulary: w1 is very common, w20000 is rare
+    rnd = random.Random(5)
+    vocab = [f"w{i}" for i in range(1, 50_001)]
+    cum = list(itertools.accumulate(1.0 / i for i in range(1, 50_001)))
+
+    def message():
+        return " ".join(rnd.choices(vocab, cum_weights=cum, k=12))
+
+    conn = db.get_conn()
+    start = time.perf_counter()
+    for lo in range(0, 2 * n_events, 50_000):
+        hi = min(2 * n_events, lo + 50_000)
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (session_id, role, content, ts) VALUES (?,?,?,?)",
+                ((sid if i % 2 else other, "user", message(), "2025-01-01") for i in range(lo, hi))
+            )
+    print(f"loaded {2 * n_events:,} events (FTS kept in sync by triggers) in {time.perf_counter() - start:.1f} s")
+
+    print(f"{'query':<24} {'fts ms':>8} {'like ms':>9}")
+    for q in QUERIES:
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            db.search_events(sid, q, limit=10)
+        fts = (time.perf_counter() - start) / REPEAT * 1000
+
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            db._search_events_like(sid, q, 10, False)
+        like = (time.perf_counter() - start) / REPEAT * 1000
+        print(f"{q:<24} {fts:>8.2f} {like:>9.2f}")
+
+    db.close_all()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bench_startup.py — cold import time and memory per module, against a budget
+#
+# Every module is imported in a fresh interpreter (several times, median
+# kept) inside an empty working directory. Reported: import time, RSS
+# growth over a bare interpreter, and side effects (files created on
+# import, such as the SQLite DB or the log file). Exits with status 1 when
+# a module is over its budget in benchmarks/startup_budget.json or has
+# side effects, so it can gate CI.
+# Run from the project folder:
+#     python -m benchmarks.bench_startup [--runs 5] [module ...]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(ROOT, "benchmarks", "startup_budget.json")
+
+_PROBE = r"""
+import json, os, sys, time
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+base = rss()
+start = time.perf_counter()
+if sys.argv[1] != "-":
+    __import__(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "rss": rss() - base, "files": sorted(os.listdir("."))}))
+"""
+
+def probe(module, runs):
+    times, rss, files = [], [], set()
+    for _ in range(runs):
+        cwd = tempfile.mkdtemp(prefix="raybot_startup_")
+        env = dict(os.environ, PYTHONPATH=ROOT, RAYBOT_DB=os.path.join(cwd, "raybot.sqlite"))
+        out = subprocess.run([sys.executable, "-c", _PROBE, module], cwd=cwd, env=env,
+                             capture_output=True, text=True)
+        if out.returncode:
+            raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "import failed")
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(r["ms"])
+        rss.append(r["rss"])
+        files.update(r["files"])
+    return statistics.median(times), statistics.median(rss) / 2**20, sorted(files)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("modules", nargs="*")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget", default=BUDGET_FILE)
+    args = ap.parse_args()
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+    modules = args.modules or list(budget["modules"])
+    default = budget.get("default", {})
+
+    failures = 0
+    print(f"{'module':<28} {'import ms':>10} {'budget':>8} {'RSS MB':>8} {'budget':>8}  side effects")
+    for module in modules:
+        try:
+            ms, mb, files = probe(module, args.runs)
+        except Exception as e:
+            print(f"{module:<28} FAILED: {e}")
+            failures += 1
+            continue
+        limit = dict(default, **budget["modules"].get(module, {}))
+        over = ms > limit.get("import_ms", float("inf")) or mb > limit.get("rss_mb", float("inf")) or files
+        failures += bool(over)
+        print(f"{module:<28} {ms:>10.1f} {limit.get('import_ms', '-'):>8} {mb:>8.1f} {limit.get('rss_mb', '-'):>8}  "
+              f"{', '.join(files) or '-'}{'   <-- OVER BUDGET' if over else ''}")
+
+    if failures:
+        print(f"{failures} module(s) over budget")
+        sys.exit(1)
+    print("all modules within budget")
+
+if __name__ == "__main__":
+    main()
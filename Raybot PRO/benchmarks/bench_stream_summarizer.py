@@ -0,0 +1,52 @@
+# bench_stream_summarizer.py — peak memory and throughput of summarize_stream
+#
+# Run from the project folder:
+#     python -m benchmarks.bench_stream_summarizer
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import make_text
+from tools.stream_summarizer import summarize_stream
+
+CHUNK = 64_000
+_BASE = [make_text(CHUNK, seed=i) for i in range(16)]
+
+def _chunks(total_bytes):
+    for i in range(total_bytes // CHUNK):
+        yield _BASE[i % len(_BASE)] + " "
+
+def _run(total_bytes, **kw):
+    tracemalloc.start()
+    start = time.perf_counter()
+    summarize_stream(_chunks(total_bytes), **kw)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total_bytes / elapsed / 1e6, peak / 1e6
+
+def main():
+    print(f"{'input MB':>9} {'mode':>14} {'MB/s':>8} {'peak MB':>9}")
+    for mb in (1, 8, 32):
+        for mode, kw in (("serial", {}), ("hierarchical", {"hierarchical": True})):
+            rate, peak = _run(mb * 1_000_000, **kw)
+            print(f"{mb:>9} {mode:>14} {rate:>8.2f} {peak:>9.2f}")
+
+    path = os.path.join(tempfile.mkdtemp(prefix="raybot_bench_"), "big.txt")
+    with open(path, "w") as f:
+        f.writelines(_chunks(32_000_000))
+
+    cores = os.cpu_count() or 1
+    for procs in sorted({1, 2, cores}):
+        start = time.perf_counter()
+        summarize_stream(path, processes=procs)
+        print(f"32 MB file with processes={procs}: {time.perf_counter() - start:.2f} s")
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bench_streaming.py — time-to-first-token, blocking vs streaming chat turns
+#
+# Uses the real `openai` client against benchmarks/fake_openai_server when the
+# SDK is installed, otherwise the in-process StubLLM with the same timings.
+# Run from the project folder:
+#     python -m benchmarks.bench_streaming
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TURNS = 10
+TOKENS = 40
+TOKEN_LATENCY = 0.01
+FIRST_TOKEN_LATENCY = 0.05
+
+def _client():
+    try:
+        from openai import OpenAI
+    except Exception:
+        from benchmarks.stub_llm import StubLLM
+        return "StubLLM", StubLLM(latency=FIRST_TOKEN_LATENCY, tokens=TOKENS, token_latency=TOKEN_LATENCY)
+
+    from benchmarks import fake_openai_server
+    _, _, url = fake_openai_server.start(tokens=TOKENS, token_latency=TOKEN_LATENCY,
+                                         first_token_latency=FIRST_TOKEN_LATENCY)
+    return f"fake server {url}", OpenAI(base_url=url, api_key="test")
+
+def main():
+    os.environ["RAYBOT_DB"] = os.path.join(tempfile.mkdtemp(prefix="raybot_bench_"), "stream.sqlite")
+    os.environ["RAYBOT_LLM_CACHE"] = "0"
+
+    from agents.agent_manager import AgentManager
+    from agents.chat_agent import chat_agent_factory
+    from tools.db import create_session
+
+    label, client = _client()
+    manager = AgentManager()
+    manager.register("chat", chat_agent_factory(client, cache=None))
+    sid = create_session("bench")
+
+    blocking, first, total = [], [], []
+    for i in range(TURNS):
+        start = time.perf_counter()
+        manager.send_to("chat", {"message": f"question {i}", "session_id": sid})
+        blocking.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        stream = manager.send_to("chat", {"message": f"question {i}", "session_id": sid, "stream": True})
+        for n, _ in enumerate(stream):
+            if n == 0:
+                first.append(time.perf_counter() - start)
+        total.append(time.perf_counter() - start)
+
+    ms = lambda xs: statistics.median(xs) * 1000
+    print(f"client: {label}")
+    print(f"blocking reply            median {ms(blocking):8.1f} ms")
+    print(f"streaming first token     median {ms(first):8.1f} ms")
+    print(f"streaming full reply      median {ms(total):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# bench_summarizer.py — extractive_summary throughput, 1 KB to 10 MB
+#
+# Run from the project folder:
+#     python -m benchmarks.bench_summarizer
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import make_text
+from tools import summarizer_engine
+from tools.summarizer_engine import extractive_summary, summarize_many, stopwords
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+def legacy_summary(text, max_sentences=3):
+    """The original dict-based implementation, kept for comparison."""
+    text = (text or "").strip()
+    if not text:
+        return ""
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?]) +", text) if s.strip()]
+    if len(sentences) <= max_sentences:
+        return text
+    words = re.findall(r"\w+", text.lower())
+    freq = {}
+    for w in words:
+        if w not in stopwords:
+            freq[w] = freq.get(w, 0) + 1
+    score_map = {}
+    for s in sentences:
+        score_map[s] = sum(freq.get(w.lower(), 0) for w in re.findall(r"\w+", s))
+    best = sorted(score_map, key=score_map.get, reverse=True)[:max_sentences]
+    return " ".join(best)
+
+def _mb_per_s(fn, text):
+    start = time.perf_counter()
+    fn(text)
+    return len(text) / (time.perf_counter() - start) / 1e6
+
+def main():
+    backend = "numpy" if summarizer_engine._numpy() is not None else "python"
+    print(f"scoring backend: {backend}")
+    print(f"{'size':>10} {'legacy MB/s':>12} {'engine MB/s':>12}")
+    for size in SIZES:
+        text = make_text(size, seed=size)
+        print(f"{size:>10,} {_mb_per_s(legacy_summary, text):>12.2f} {_mb_per_s(extractive_summary, text):>12.2f}")
+
+    docs = [make_text(2_000, seed=i) for i in range(500)]
+    start = time.perf_counter()
+    for d in docs:
+        extractive_summary(d)
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    summarize_many(docs)
+    batch = time.perf_counter() - start
+    print(f"500 x 2 KB docs: one-by-one {single * 1000:.1f} ms, summarize_many {batch * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# bench_tracing.py — instrumentation overhead and per-stage latency report
+#
+# Runs offline chat turns (context building, DB reads/writes, cached LLM
+# stub) through AgentManager.send_to with tracing off, then on, and prints
+# the overhead plus the p50/p99 table that tracing collects. The logged
+# span trees go to a queue-backed file handler, as in production.
+# Run from the project folder:
+#     python -m benchmarks.bench_tracing
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TURNS = 400
+ROUNDS = 5
+
+def main():
+    tmp = tempfile.mkdtemp(prefix="raybot_bench_")
+    os.environ["RAYBOT_DB"] = os.path.join(tmp, "tracing.sqlite")
+    os.environ["RAYBOT_LLM_CACHE"] = "0"
+
+    from agents.agent_manager import AgentManager
+    from agents.chat_agent import chat_agent_factory
+    from benchmarks.stub_llm import StubLLM
+    from tools import tracing
+    from tools.db import create_session, append_event
+    from tools.logging_tools import setup_logging
+
+    setup_logging(os.path.join(tmp, "raybot_pro.log"))
+    manager = AgentManager()
+    manager.register("chat", chat_agent_factory(StubLLM(), cache=None))
+    sid = create_session("bench")
+
+    def run():
+        start = time.perf_counter()
+        for i in range(TURNS):
+            append_event(sid, "user", f"question {i} about rockets and reform")
+            manager.send_to("chat", {"message": f"question {i} about rockets and reform", "session_id": sid})
+        return time.perf_counter() - start
+
+    run()  # warm-up: caches, statement cache, FTS pages
+    off, on = [], []
+    for _ in range(ROUNDS):
+        tracing.configure(enable=False)
+        off.append(run())
+        tracing.configure(enable=True, sample=0.01)
+        on.append(run())
+
+    base, traced = statistics.median(off), statistics.median(on)
+    print(f"{TURNS} chat turns x {ROUNDS} rounds (stub LLM)")
+    print(f"tracing off  {base / TURNS * 1000:7.3f} ms/turn")
+    print(f"tracing on   {traced / TURNS * 1000:7.3f} ms/turn   overhead {(traced / base - 1) * 100:+.2f}%")
+    print()
+    print(f"{'span':<28} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for name, s in tracing.snapshot()["latency"].items():
+        print(f"{name:<28} {s['count']:>7} {s['p50_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['max_ms']:>9.3f} {s['errors']:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# bench_transcribe.py — chunked parallel transcription vs worker count
+#
+# Transcribes one clip with the tiny model on CPU using 1, 2, 4, ... worker
+# processes (up to the core count) and reports wall time, speedup and the
+# time to the first partial transcript. Without a clip argument a synthetic
+# WAV of tones and noise is generated, which is fine for timing.
+# Run from the project folder:
+#     python -m benchmarks.bench_transcribe [clip.wav] [--seconds 240]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def make_clip(path, seconds, rate=16000):
+    import numpy as np
+
+    rnd = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    audio = 0.3 * np.sin(2 * np.pi * (220 + 40 * np.sin(t / 3)) * t) + 0.05 * rnd.standard_normal(len(t))
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((audio.clip(-1, 1) * 32767).astype("<i2").tobytes())
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("clip", nargs="?")
+    ap.add_argument("--seconds", type=float, default=240)
+    ap.add_argument("--model", default="tiny")
+    args = ap.parse_args()
+
+    try:
+        import whisper  # noqa: F401
+    except Exception:
+        print("openai-whisper not installed; nothing to measure")
+        return
+
+    tmp = tempfile.mkdtemp(prefix="raybot_bench_")
+    os.environ["RAYBOT_DB"] = os.path.join(tmp, "transcribe.sqlite")
+    clip = args.clip or os.path.join(tmp, "clip.wav")
+    if not args.clip:
+        make_clip(clip, args.seconds)
+
+    from tools.db import init_db, get_conn
+    from tools.transcriber import TranscriptionService, load_audio
+
+    init_db()
+    seconds = len(load_audio(clip)) / 16000
+    cores = os.cpu_count() or 1
+    counts = sorted({1, *[n for n in (2, 4, 8, 16, 32) if n <= cores], cores})
+    print(f"clip {seconds:.0f}s, model {args.model}, {cores} cores")
+
+    base = None
+    for workers in counts:
+        service = TranscriptionService(workers=workers, model=args.model)
+        # Warm-up run: starts the workers and loads the model in each of them
+        service.transcribe(clip)
+        with get_conn() as conn:
+            conn.execute("DELETE FROM transcripts")
+
+        start = time.perf_counter()
+        first = None
+        for _ in service.stream(clip):
+            if first is None:
+                first = time.perf_counter() - start
+        total = time.perf_counter() - start
+        service.shutdown()
+        with get_conn() as conn:
+            conn.execute("DELETE FROM transcripts")
+
+        base = base or total
+        print(f"workers {workers:>3}   total {total:7.2f}s   first partial {first or 0:6.2f}s   "
+              f"speedup {base / total:5.2f}x   {seconds / total:6.1f}x realtime")
+
+if __name__ == "__main__":
+    main()
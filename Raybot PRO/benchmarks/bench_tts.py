@@ -0,0 +1,54 @@
+# bench_tts.py — TTS audio cache: hit latency, hit rate and disk bound
+#
+# Replays a skewed phrase workload (a few greetings / quiz prompts repeat a
+# lot, most phrases are rare) through TTSCache with the stub engine made as
+# slow as a gTTS round-trip, under a small disk budget.
+# Run from the project folder:
+#     python -m benchmarks.bench_tts
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REQUESTS = 3000
+PHRASES = 500
+SYNTH_LATENCY = 0.05      # stand-in for a network TTS call
+CACHE_BYTES = 4 * 1024 * 1024
+
+def main():
+    from tools.tts_cache import StubEngine, TTSCache
+
+    directory = tempfile.mkdtemp(prefix="raybot_tts_")
+    engine = StubEngine(latency=SYNTH_LATENCY)
+    cache = TTSCache(engine=engine, directory=directory, max_bytes=CACHE_BYTES)
+
+    rnd = random.Random(5)
+    weights = [1 / (i + 1) for i in range(PHRASES)]
+    phrases = [f"Question {i}: what does the {i}th rocket launch tell us?" for i in range(PHRASES)]
+    workload = rnd.choices(phrases, weights=weights, k=REQUESTS)
+
+    hits, misses = [], []
+    for text in workload:
+        before = engine.calls
+        start = time.perf_counter()
+        cache.get(text)
+        (misses if engine.calls > before else hits).append(time.perf_counter() - start)
+
+    disk = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+    hits.sort()
+    stats = cache.stats()
+    print(f"{REQUESTS} requests over {PHRASES} phrases (Zipf), synth {SYNTH_LATENCY * 1000:.0f} ms, "
+          f"budget {CACHE_BYTES / 2**20:.0f} MB")
+    print(f"hit rate {stats['hit_rate']:.1%}   evictions {stats['evictions']}   "
+          f"disk {disk / 2**20:.2f} MB in {len(os.listdir(directory))} files")
+    print(f"hit p50 {hits[len(hits) // 2] * 1e6:7.1f} us   p99 {hits[int(len(hits) * 0.99)] * 1e6:7.1f} us")
+    print(f"miss avg {sum(misses) / len(misses) * 1000:7.1f} ms")
+    shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench_whisper.py — Whisper cold start and resident memory per model size
+#
+# Each model is measured in a fresh process: time to import whisper/torch,
+# time to load the weights, time of a first (warm-up) transcription of one
+# second of silence, and the process RSS afterwards. Use it to pick
+# WHISPER_MODEL and RAYBOT_WHISPER_MEMORY_MB per deployment.
+# Run from the project folder:
+#     python -m benchmarks.bench_whisper tiny base small
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def measure(name):
+    from tools.whisper_models import ModelRegistry, rss_bytes
+
+    base_rss = rss_bytes()
+    start = time.perf_counter()
+    import whisper  # noqa: F401  (torch import cost)
+    import_seconds = time.perf_counter() - start
+
+    registry = ModelRegistry(default=name, memory_mb=1 << 20)
+    report = registry.warm_up([name])[name]
+    report.update(import_seconds=round(import_seconds, 3), base_rss_mb=round(base_rss / 2**20, 1),
+                  rss_mb=round(rss_bytes() / 2**20, 1))
+    return report
+
+def main():
+    if sys.argv[1:2] == ["--one"]:
+        print(json.dumps(measure(sys.argv[2])))
+        return
+
+    try:
+        import whisper  # noqa: F401
+    except Exception:
+        print("openai-whisper not installed; nothing to measure")
+        return
+
+    names = sys.argv[1:] or ["tiny", "base"]
+    print(f"{'model':<10} {'import s':>9} {'load s':>8} {'warm-up s':>10} {'weights MB':>11} {'RSS MB':>8}")
+    for name in names:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_whisper", "--one", name],
+                             capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        try:
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+        except Exception:
+            print(f"{name:<10} failed: {out.stderr.strip()[-200:]}")
+            continue
+        if "error" in r:
+            print(f"{name:<10} {r['error']}")
+            continue
+        print(f"{name:<10} {r['import_seconds']:>9.2f} {r['load_seconds']:>8.2f} {r['warmup_seconds']:>10.2f} "
+              f"{r['weights_mb']:>11.1f} {r['rss_mb']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# corpus.py — deterministic synthetic text for benchmarks
+
+import random
+
+_WORDS = (
+    "agent model rocket launch reform policy digital access science research "
+    "network memory session summary voice quiz news infrastructure satellite "
+    "reasoning device edge government national vehicle system data result "
+    "the and is in to of a it for on with as are was were be by this an"
+).split()
+
+def make_text(n_bytes, seed=0):
+    """Returns roughly n_bytes of sentence-shaped text."""
+    rnd = random.Random(seed)
+    out, size = [], 0
+    while size < n_bytes:
+        words = [rnd.choice(_WORDS) for _ in range(rnd.randint(6, 18))]
+        s = " ".join(words).capitalize() + rnd.choice(".!?")
+        out.append(s)
+        size += len(s) + 1
+    return " ".join(out)
@@ -0,0 +1,143 @@
+# fake_openai_server.py — local stand-in for the OpenAI chat completions API
+#
+# Serves POST /v1/chat/completions in both plain and streaming (SSE) form,
+# so the real `openai` client can be pointed at it:
+#     OpenAI(base_url="http://127.0.0.1:8765/v1", api_key="test")
+#
+# Faults can be injected to exercise tools/llm_client.py: a fraction of
+# requests fail with `error_status` (503, 429, ...), a fraction are slow,
+# and `down=True` fails everything. cfg fields can be changed while running.
+#
+# Run standalone:
+#     python -m benchmarks.fake_openai_server --port 8765 --tokens 40 --token-ms 20
+#     python -m benchmarks.fake_openai_server --error-rate 0.2 --error-status 503 --slow-rate 0.05
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeConfig:
+    def __init__(self, tokens=40, token_latency=0.02, first_token_latency=0.05,
+                 error_rate=0.0, error_status=503, slow_rate=0.0, slow_latency=1.0, down=False, seed=None):
+        self.tokens = tokens
+        self.token_latency = token_latency
+        self.first_token_latency = first_token_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.down = down
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def fault(self):
+        """Returns (status or None, extra delay) for the next request."""
+        with self.lock:
+            self.calls += 1
+            if self.down or self.rng.random() < self.error_rate:
+                self.errors += 1
+                return self.error_status, 0.0
+            return None, self.slow_latency if self.rng.random() < self.slow_rate else 0.0
+
+def _chunk(model, content=None, finish=None):
+    delta = {"content": content} if content is not None else {}
+    return {
+        "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+        "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+
+def make_handler(cfg):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            status, delay = cfg.fault()
+            if status is not None:
+                self._json(status, {"error": {"message": f"injected {status}", "type": "server_error"}},
+                           {"Retry-After": "0"} if status == 429 else None)
+                return
+            model = body.get("model", "fake")
+            words = [f"tok{i} " for i in range(cfg.tokens)]
+
+            time.sleep(cfg.first_token_latency + delay)
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, w in enumerate(words):
+                    if i:
+                        time.sleep(cfg.token_latency)
+                    self._event(_chunk(model, w))
+                self._event(_chunk(model, finish="stop"))
+                self._write(b"data: [DONE]\n\n")
+                self._write(b"")
+                return
+
+            time.sleep(cfg.token_latency * max(0, cfg.tokens - 1))
+            self._json(200, {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(words)},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": cfg.tokens, "total_tokens": cfg.tokens},
+            })
+
+        def _json(self, status, payload, headers=None):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _event(self, payload):
+            self._write(b"data: " + json.dumps(payload).encode() + b"\n\n")
+
+        def _write(self, data):
+            # HTTP/1.1 chunked framing; an empty write ends the body
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+def start(port=0, **kwargs):
+    """Starts the server on a background thread; returns (server, config, base_url)."""
+    cfg = FakeConfig(**kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(cfg))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, cfg, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--tokens", type=int, default=40)
+    ap.add_argument("--token-ms", type=float, default=20)
+    ap.add_argument("--first-token-ms", type=float, default=50)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--error-status", type=int, default=503)
+    ap.add_argument("--slow-rate", type=float, default=0.0)
+    ap.add_argument("--slow-ms", type=float, default=1000)
+    args = ap.parse_args()
+    server, _, url = start(args.port, tokens=args.tokens, token_latency=args.token_ms / 1000,
+                           first_token_latency=args.first_token_ms / 1000,
+                           error_rate=args.error_rate, error_status=args.error_status,
+                           slow_rate=args.slow_rate, slow_latency=args.slow_ms / 1000)
+    print(f"fake OpenAI API on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
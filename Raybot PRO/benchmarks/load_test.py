@@ -0,0 +1,197 @@
+# load_test.py — throughput and latency of the HTTP API (api/server.py) per worker count
+#
+# For each worker count a fresh server is started on a temp DB (offline
+# LLM), then client processes, each with several keep-alive threads, send
+# a request mix for a fixed time:
+#     summarize   POST /agents/summarizer on ~20 KB of text (CPU-bound)
+#     quiz        POST /agents/quiz on the same text
+#     memory      GET  /sessions/<id>/memory?keys=... (10 keys)
+#     event       POST /sessions/<id>/events
+#     chat        POST /agents/chat (offline reply, context from the DB)
+# Reported: requests/s, p50/p99 latency and errors. Throughput of the
+# CPU-bound mix should grow with workers up to the number of cores.
+# Run from the project folder:
+#     python -m benchmarks.load_test                         # workers 1, 2, cores
+#     python -m benchmarks.load_test --workers 1 4 8 --seconds 20 --clients 4 --threads 8
+#     python -m benchmarks.load_test --url http://host:8000  # an already running server
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MIXES = {
+    "default": {"summarize": 4, "quiz": 2, "memory": 2, "event": 1, "chat": 1},
+    "cpu": {"summarize": 1},
+    "db": {"memory": 3, "event": 1},
+}
+SESSIONS = 20
+KEYS = [f"fact{i}" for i in range(10)]
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _request(conn, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    conn.request(method, path, body=data, headers={"Content-Type": "application/json"} if data else {})
+    resp = conn.getresponse()
+    resp.read()
+    return resp.status
+
+def _seed(host, port):
+    """Creates sessions with memory facts and a few events; returns their ids."""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    ids = []
+    for s in range(SESSIONS):
+        conn.request("POST", "/sessions", body=json.dumps({"name": f"load{s}"}))
+        sid = json.loads(conn.getresponse().read())["session_id"]
+        _request(conn, "POST", f"/sessions/{sid}/memory", {"items": {k: f"value {s} {k}" for k in KEYS}})
+        for i in range(5):
+            _request(conn, "POST", f"/sessions/{sid}/events", {"role": "user", "content": f"message {i} about rockets"})
+        ids.append(sid)
+    conn.close()
+    return ids
+
+def _client(host, port, threads, seconds, mix, sessions, text, seed, out):
+    """One client process: `threads` keep-alive connections hammering the mix."""
+    kinds = [k for k, w in mix.items() for _ in range(w)]
+    lock = threading.Lock()
+    lat, errors = {}, {}
+    deadline = time.monotonic() + seconds
+
+    def run(i):
+        rnd = random.Random(seed * 1000 + i)
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+        mine = {}
+        bad = 0
+        while time.monotonic() < deadline:
+            kind = rnd.choice(kinds)
+            sid = rnd.choice(sessions)
+            if kind == "summarize":
+                call = ("POST", "/agents/summarizer", {"text": text, "max_sentences": 3})
+            elif kind == "quiz":
+                call = ("POST", "/agents/quiz", {"text": text, "n": 5, "seed": 1})
+            elif kind == "memory":
+                call = ("GET", f"/sessions/{sid}/memory?keys={','.join(KEYS)}", None)
+            elif kind == "event":
+                call = ("POST", f"/sessions/{sid}/events", {"role": "user", "content": "load test message"})
+            else:
+                call = ("POST", "/agents/chat", {"message": "hello there", "session_id": sid})
+            start = time.perf_counter()
+            try:
+                status = _request(conn, *call)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=60)
+                status = 0
+            if status >= 400 or status == 0:
+                bad += 1
+            else:
+                mine.setdefault(kind, []).append(time.perf_counter() - start)
+        with lock:
+            for k, v in mine.items():
+                lat.setdefault(k, []).extend(v)
+            errors[i] = bad
+
+    ts = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    out.put((lat, sum(errors.values())))
+
+def _pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))] * 1000 if xs else 0.0
+
+def run_load(host, port, clients, threads, seconds, mix, text):
+    sessions = _seed(host, port)
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_client, args=(host, port, threads, seconds, mix, sessions, text, c, queue))
+             for c in range(clients)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    lat, errors = {}, 0
+    for _ in procs:
+        part, bad = queue.get()
+        errors += bad
+        for k, v in part.items():
+            lat.setdefault(k, []).extend(v)
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+    every = [x for v in lat.values() for x in v]
+    return {"rps": len(every) / elapsed, "p50_ms": _pct(every, 0.5), "p99_ms": _pct(every, 0.99),
+            "errors": errors, "per_kind": {k: (len(v) / elapsed, _pct(v, 0.5), _pct(v, 0.99)) for k, v in lat.items()}}
+
+def _start_server(workers, port, tmp):
+    env = dict(os.environ, RAYBOT_DB=os.path.join(tmp, f"api_{workers}.sqlite"),
+               RAYBOT_NEWS_DB=os.path.join(tmp, "news.sqlite"), RAYBOT_OFFLINE="1")
+    proc = subprocess.Popen([sys.executable, "-m", "api.server", "--workers", str(workers), "--port", str(port)],
+                            cwd=tmp, env=dict(env, PYTHONPATH=ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/readyz")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return proc
+        except OSError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not become ready")
+
+def _report(label, r):
+    print(f"{label:<10} {r['rps']:>9.1f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>7}   " +
+          "  ".join(f"{k} {v[0]:.0f}/s" for k, v in sorted(r["per_kind"].items())))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="*", default=sorted({1, 2, os.cpu_count() or 1}))
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--clients", type=int, default=2)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--mix", choices=sorted(MIXES), default="default")
+    ap.add_argument("--url", help="load an already running server instead of starting one per worker count")
+    args = ap.parse_args()
+
+    from benchmarks.corpus import make_text
+    text = make_text(20_000, seed=1)
+    mix = MIXES[args.mix]
+    print(f"mix {args.mix} {mix}, {args.clients} client processes x {args.threads} threads, {args.seconds:.0f}s each")
+    print(f"{'workers':<10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+    if args.url:
+        from urllib.parse import urlsplit
+        url = urlsplit(args.url)
+        _report("remote", run_load(url.hostname, url.port or 80, args.clients, args.threads, args.seconds, mix, text))
+        return
+
+    tmp = tempfile.mkdtemp(prefix="raybot_bench_")
+    for workers in args.workers:
+        port = _free_port()
+        proc = _start_server(workers, port, tmp)
+        try:
+            _report(str(workers), run_load("127.0.0.1", port, args.clients, args.threads, args.seconds, mix, text))
+        finally:
+            proc.terminate()
+            proc.wait(10)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# stub_llm.py — offline stand-in for the OpenAI client used by benchmarks
+#
+# Mirrors the slice of the SDK that chat_agent uses:
+#     client.chat.completions.create(model=..., messages=[...], temperature=..., stream=...)
+
+import time
+from types import SimpleNamespace
+
+class StubLLM:
+    def __init__(self, latency=0.0, reply="stub reply", tokens=1, token_latency=0.0):
+        self.latency = latency
+        self.reply = reply
+        self.tokens = tokens              # chunks per streamed reply
+        self.token_latency = token_latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, temperature=None, stream=False, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        text = f"{self.reply} #{self.calls}: {messages[-1]['content'][-40:]}"
+        if stream:
+            return self._stream(text)
+        if self.token_latency:
+            time.sleep(self.token_latency * self.tokens)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+    def _stream(self, text):
+        step = max(1, -(-len(text) // self.tokens))
+        for i in range(0, len(text), step):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            delta = SimpleNamespace(content=text[i:i + step])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
@@ -0,0 +1,302 @@
+# suite.py — reproducible benchmark suite with a stored baseline and regression gates
+#
+# Cases (synthetic, seeded data; offline StubLLM; fresh temp DB):
+#     summarizer  extractive_summary MB/s per corpus size, summarize_many docs/s
+#     db          append/recent/recall/search latency on a pre-loaded DB
+#     agents      concurrent send_to throughput and latency through AgentManager
+#     chat        end-to-end chat turn latency (event write + context + LLM stub)
+#
+# Every run of a case is a fresh interpreter with its own temp DB. Each
+# metric is the median over --repeat runs and is written to a JSON
+# results file. With a baseline (benchmarks/baseline.json by default) every
+# metric is compared against it; a change beyond its threshold in the bad
+# direction is a regression and the exit status is 1, so it can gate CI.
+# Thresholds live in the baseline file ("default" plus per-metric-prefix
+# overrides) and --threshold overrides the default. Baselines are machine
+# specific: regenerate with --save-baseline on the machine that runs the gate.
+# Run from the project folder:
+#     python -m benchmarks.suite                       # quick scale, compare to baseline
+#     python -m benchmarks.suite --scale full --repeat 5 --out results.json
+#     python -m benchmarks.suite --save-baseline       # record a new baseline
+#     python -m benchmarks.suite summarizer chat       # selected cases only
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "baseline.json")
+RESULTS_FILE = os.path.join(ROOT, "benchmarks", "results.json")
+DEFAULT_THRESHOLD = 0.25
+
+SCALES = {
+    "quick": {"sizes": ["10k", "100k", "1m"], "docs": 200, "sessions": 200, "events": 250,
+              "queries": 1_000, "calls": 400, "clients": 8, "turns": 200},
+    "full": {"sizes": ["10k", "100k", "1m", "10m"], "docs": 1_000, "sessions": 1_000, "events": 1_000,
+             "queries": 5_000, "calls": 2_000, "clients": 16, "turns": 1_000},
+}
+
+CASES = {}
+
+def case(name):
+    """Registers fn(scale, seed) -> {metric: (value, unit, better)} where better is "higher" or "lower"."""
+    def wrap(fn):
+        CASES[name] = fn
+        return fn
+    return wrap
+
+def _pct(samples, p):
+    xs = sorted(samples)
+    return xs[min(len(xs) - 1, int(p * len(xs)))]
+
+def _latency(prefix, samples, unit="us"):
+    k = 1e6 if unit == "us" else 1e3
+    return {
+        f"{prefix}.p50_{unit}": (_pct(samples, 0.50) * k, unit, "lower"),
+        f"{prefix}.p99_{unit}": (_pct(samples, 0.99) * k, unit, "lower"),
+    }
+
+def _timed(fn, args):
+    out = []
+    for a in args:
+        start = time.perf_counter()
+        fn(*a)
+        out.append(time.perf_counter() - start)
+    return out
+
+# ---- cases ----
+@case("summarizer")
+def bench_summarizer(scale, seed):
+    from benchmarks.workloads import corpus, documents
+    from tools.summarizer_engine import extractive_summary, summarize_many
+
+    out = {}
+    for name, text in corpus(scale["sizes"], seed).items():
+        runs = max(1, 1_000_000 // len(text))
+        start = time.perf_counter()
+        for _ in range(runs):
+            extractive_summary(text)
+        out[f"summarizer.extractive.{name}.mb_s"] = (len(text) * runs / (time.perf_counter() - start) / 1e6,
+                                                     "MB/s", "higher")
+    docs = documents(scale["docs"], seed=seed)
+    start = time.perf_counter()
+    summarize_many(docs)
+    out["summarizer.summarize_many.docs_s"] = (len(docs) / (time.perf_counter() - start), "docs/s", "higher")
+    return out
+
+@case("db")
+def bench_db(scale, seed):
+    import random
+    from benchmarks.workloads import load_sessions
+    from tools import db
+
+    ids = load_sessions(db.get_conn(), scale["sessions"], scale["events"], seed=seed)
+    rnd = random.Random(seed)
+    picks = [(rnd.choice(ids), f"k{rnd.randrange(20)}") for _ in range(scale["queries"])]
+
+    out = {"db.rows": (scale["sessions"] * scale["events"], "rows", "info")}
+    out.update(_latency("db.append_event", _timed(
+        lambda sid, k: db.append_event(sid, "user", f"bench message {k}"), picks)))
+    out.update(_latency("db.get_recent_events", _timed(lambda sid, k: db.get_recent_events(sid, limit=12), picks)))
+    out.update(_latency("db.recall", _timed(db.recall, picks)))
+    out.update(_latency("db.search_events", _timed(
+        lambda sid, k: db.search_events(sid, "rockets reform", limit=5), picks[:max(1, len(picks) // 5)])))
+    return out
+
+@case("agents")
+def bench_agents(scale, seed):
+    from agents.agent_manager import AgentManager
+    from benchmarks.workloads import documents
+    from tools.summarizer_engine import extractive_summary
+
+    docs = documents(64, size=1_000, seed=seed)
+
+    def worker(task):
+        time.sleep(0.002)  # stands in for I/O (LLM, network, disk)
+        return {"summary": extractive_summary(docs[task["i"] % len(docs)])}
+
+    manager = AgentManager(max_workers=scale["clients"])
+    manager.register("work", worker)
+    calls, clients = scale["calls"], scale["clients"]
+    lat = [[] for _ in range(clients)]
+
+    def client(c):
+        for i in range(c, calls, clients):
+            start = time.perf_counter()
+            manager.send_to("work", {"i": i})
+            lat[c].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    manager.shutdown()
+
+    out = {"agents.send_to.calls_s": (calls / elapsed, "calls/s", "higher")}
+    out.update(_latency("agents.send_to", [x for xs in lat for x in xs], unit="ms"))
+    return out
+
+@case("chat")
+def bench_chat(scale, seed):
+    from agents.agent_manager import AgentManager
+    from agents.chat_agent import chat_agent_factory
+    from benchmarks.stub_llm import StubLLM
+    from benchmarks.workloads import messages
+    from tools.db import append_event, create_session
+
+    manager = AgentManager()
+    manager.register("chat", chat_agent_factory(StubLLM(), cache=None))
+    sid = create_session("bench-chat")
+
+    def turn(text):
+        append_event(sid, "user", text)
+        manager.send_to("chat", {"message": text, "session_id": sid})
+
+    msgs = messages(scale["turns"], seed=seed)
+    for text in msgs[:20]:  # warm-up: statement cache, FTS pages
+        turn(text)
+    out = _latency("chat.turn", _timed(turn, [(m,) for m in msgs]), unit="ms")
+    manager.shutdown()
+    return out
+
+# ---- running and comparing ----
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+def machine():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count()}
+
+def run_case(name, scale_name, seed):
+    """Runs one case in a fresh interpreter with its own temp DB, so runs do not share state."""
+    tmp = tempfile.mkdtemp(prefix="raybot_suite_")
+    env = dict(os.environ, RAYBOT_DB=os.path.join(tmp, "suite.sqlite"), RAYBOT_LLM_CACHE="0",
+               RAYBOT_TRACE_SAMPLE="0", PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, "-m", "benchmarks.suite", "--child", name,
+                          "--scale", scale_name, "--seed", str(seed)],
+                         cwd=tmp, env=env, capture_output=True, text=True)
+    shutil.rmtree(tmp, ignore_errors=True)
+    if out.returncode:
+        raise RuntimeError(f"case {name} failed:\n{out.stderr.strip()}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def run(names, scale_name="quick", repeat=3, seed=1234):
+    """Runs every case `repeat` times; returns the results document (medians per metric)."""
+    metrics = {}
+    for name in names:
+        runs = []
+        for r in range(repeat):
+            start = time.perf_counter()
+            runs.append(run_case(name, scale_name, seed + r))
+            print(f"  {name} run {r + 1}/{repeat} {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        for key, (_, unit, better) in runs[0].items():
+            values = [res[key][0] for res in runs if key in res]
+            metrics[key] = {"value": round(statistics.median(values), 3), "unit": unit, "better": better,
+                            "runs": [round(v, 3) for v in values]}
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": _git_rev(), "scale": scale_name,
+            "repeat": repeat, "seed": seed, "machine": machine(), "metrics": metrics}
+
+def threshold_for(key, thresholds, default):
+    """Longest matching metric-name prefix in thresholds wins."""
+    best = None
+    for prefix in thresholds:
+        if prefix != "default" and key.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return thresholds[best] if best else thresholds.get("default", default)
+
+def compare(results, baseline, default=None):
+    """Returns rows (key, old, new, change, limit, status) for metrics present in both."""
+    thresholds = dict(baseline.get("thresholds", {}))
+    if default is not None:
+        thresholds["default"] = default
+    rows = []
+    for key, m in results["metrics"].items():
+        old = baseline.get("metrics", {}).get(key)
+        if old is None or m["better"] not in ("higher", "lower") or not old["value"]:
+            rows.append((key, old["value"] if old else None, m["value"], None, None, "new" if old is None else "-"))
+            continue
+        change = m["value"] / old["value"] - 1
+        limit = threshold_for(key, thresholds, DEFAULT_THRESHOLD)
+        worse = -change if m["better"] == "higher" else change
+        status = "REGRESSION" if worse > limit else "improved" if worse < -limit else "ok"
+        rows.append((key, old["value"], m["value"], change, limit, status))
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cases", nargs="*", help=f"subset of {', '.join(CASES)}")
+    ap.add_argument("--scale", choices=list(SCALES), default="quick")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--out", default=RESULTS_FILE)
+    ap.add_argument("--baseline", default=BASELINE_FILE)
+    ap.add_argument("--threshold", type=float, help="default allowed slowdown, e.g. 0.2 = 20%%")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(CASES[args.child](SCALES[args.scale], args.seed)))
+        return
+
+    unknown = [c for c in args.cases if c not in CASES]
+    if unknown:
+        ap.error(f"unknown case(s): {', '.join(unknown)}")
+    results = run(args.cases or list(CASES), args.scale, args.repeat, args.seed)
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results: {args.out}")
+
+    if args.save_baseline:
+        thresholds = {"default": DEFAULT_THRESHOLD}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                thresholds = json.load(f).get("thresholds", thresholds)
+        with open(args.baseline, "w") as f:
+            json.dump(dict(results, thresholds=thresholds), f, indent=2)
+        print(f"baseline saved: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("no baseline; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("scale") != results["scale"]:
+        print(f"baseline is for scale {baseline.get('scale')!r}; nothing compared")
+        return
+    if baseline.get("machine") != results["machine"]:
+        print("warning: baseline was recorded on a different machine/Python; expect noise")
+
+    rows = compare(results, baseline, args.threshold)
+    print(f"{'metric':<40} {'baseline':>11} {'current':>11} {'change':>8} {'limit':>6}  status")
+    for key, old, new, change, limit, status in rows:
+        print(f"{key:<40} {old if old is not None else '-':>11} {new:>11} "
+              f"{f'{change * 100:+.1f}%' if change is not None else '-':>8} "
+              f"{f'{limit * 100:.0f}%' if limit is not None else '-':>6}  {status}")
+    regressions = [r for r in rows if r[5] == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) against baseline {baseline.get('commit')}")
+        sys.exit(1)
+    print("no regressions")
+
+if __name__ == "__main__":
+    main()
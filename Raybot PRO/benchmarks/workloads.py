@@ -0,0 +1,93 @@
+# workloads.py — deterministic synthetic sessions, events and chat traffic for benchmarks
+#
+# Everything is driven by a seed, so two runs of the suite load the same
+# rows and send the same messages. Text comes from benchmarks/corpus.py.
+
+import random
+
+from benchmarks.corpus import make_text
+
+# Named corpus sizes (bytes) used by the summarizer cases
+CORPUS_SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+ROLES = ("user", "assistant")
+TOPICS = ("rockets", "reform", "satellites", "edge devices", "national data", "voice models", "quiz scores")
+
+def corpus(sizes, seed=0):
+    """{name: text} for the given CORPUS_SIZES names."""
+    return {name: make_text(CORPUS_SIZES[name], seed=seed + i) for i, name in enumerate(sizes)}
+
+def documents(n, size=2_000, seed=0):
+    """n independent documents of about `size` bytes each."""
+    return [make_text(size, seed=seed * 100_003 + i) for i in range(n)]
+
+def message(rnd):
+    """One chat message: mostly short questions, occasionally a pasted paragraph."""
+    topic = rnd.choice(TOPICS)
+    if rnd.random() < 0.05:
+        return f"Summarize this about {topic}: " + make_text(rnd.randint(500, 3_000), seed=rnd.randrange(1 << 30))
+    return f"What is new about {topic}? question {rnd.randrange(10_000)}"
+
+def messages(n, seed=0):
+    rnd = random.Random(seed)
+    return [message(rnd) for _ in range(n)]
+
+def load_sessions(conn, sessions, events_per_session, memory_keys=20, seed=0, batch=50_000):
+    """Bulk-inserts sessions, their events and memory rows; returns the session ids.
+
+    Goes straight to SQL in large transactions (and through the FTS
+    triggers) so millions of rows load in seconds rather than minutes.
+    """
+    rnd = random.Random(seed)
+    ts = "2025-01-01T00:00:00"
+    with conn:
+        first = conn.execute("SELECT COALESCE(MAX(id), 0) FROM sessions").fetchone()[0] + 1
+        conn.executemany("INSERT INTO sessions (id, name, created_at) VALUES (?,?,?)",
+                         ((first + i, f"synthetic-{i}", ts) for i in range(sessions)))
+    ids = list(range(first, first + sessions))
+
+    def rows(kind):
+        for n in range(sessions * events_per_session):
+            sid = ids[n % sessions]
+            if kind == "events":
+                yield sid, ROLES[n % 2], f"message {n} about {rnd.choice(TOPICS)}", ts
+            else:
+                yield sid, f"k{n % memory_keys}", f"value {n}", ts
+
+    for kind, sql in (
+        ("events", "INSERT INTO events (session_id, role, content, ts) VALUES (?,?,?,?)"),
+        ("memory", "INSERT INTO memory (session_id, key, value, ts) VALUES (?,?,?,?) "
+                   "ON CONFLICT (session_id, key) DO UPDATE SET value=excluded.value, ts=excluded.ts"),
+    ):
+        it = rows(kind)
+        while True:
+            chunk = [r for _, r in zip(range(batch), it)]
+            if not chunk:
+                break
+            with conn:
+                conn.executemany(sql, chunk)
+    return ids
+
+# Zipf-like vocabulary for news articles: a few very common words, a long tail of rare ones
+VOCAB = 50_000
+
+def articles(n, seed=0, start=0, words=40):
+    """Yields n article dicts (ids start..start+n) whose words follow a Zipf-like distribution."""
+    rnd = random.Random(seed)
+    vocab = [f"w{i}" for i in range(1, VOCAB + 1)]
+    cum, total = [], 0.0
+    for i in range(1, VOCAB + 1):
+        total += 1.0 / i
+        cum.append(total)
+    for i in range(start, start + n):
+        title = rnd.choices(vocab, cum_weights=cum, k=6)
+        body = rnd.choices(vocab, cum_weights=cum, k=words)
+        yield {"id": f"a{i}", "title": " ".join(title).capitalize(), "body": " ".join(body) + ".",
+               "url": f"https://news.example/{i}", "source": TOPICS[i % len(TOPICS)],
+               "published": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}"}
+
+def write_jsonl(path, records):
+    import json
+    with open(path, "w") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
@@ -11,9 +11,119 @@ DB_PATH = os.environ.get("RAYBOT_DB", "raybot_v2.sqlite")
 # Whisper model name (tiny, base, small, medium, large)
 WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "tiny")
 
+# Whisper models are loaded on first use (tools/whisper_models.py); several
+# sizes may stay resident within this budget. Warm-up loads the default at startup.
+WHISPER_MEMORY_MB = int(os.environ.get("RAYBOT_WHISPER_MEMORY_MB", "2048"))
+WHISPER_DEVICE = os.environ.get("RAYBOT_WHISPER_DEVICE", "")          # "" = whisper's choice, or cpu / cuda
+WHISPER_WARMUP = os.environ.get("RAYBOT_WHISPER_WARMUP", "0") in ("1", "true", "True")
+
+# Transcription service (tools/transcriber.py): long audio is cut into
+# overlapping chunks transcribed in parallel worker processes (0 = in-process);
+# a pool never holds more copies of a model than fit in RAYBOT_WHISPER_MEMORY_MB
+TRANSCRIBE_WORKERS = int(os.environ.get("RAYBOT_TRANSCRIBE_WORKERS", str(os.cpu_count() or 1)))
+TRANSCRIBE_CHUNK_SECONDS = float(os.environ.get("RAYBOT_TRANSCRIBE_CHUNK", "30"))
+TRANSCRIBE_OVERLAP_SECONDS = float(os.environ.get("RAYBOT_TRANSCRIBE_OVERLAP", "1.5"))
+
 # Force offline mode (FOR KAGGLE)
 # Set:   RAYBOT_OFFLINE=1   to disable all external LLM calls
 OFFLINE_ONLY = os.environ.get("RAYBOT_OFFLINE", "0") in ("1", "true", "True")
 
 # App title
-APP_TITLE = "Raybot PRO — Multi-Agent Demo"
\ No newline at end of file
+APP_TITLE = "Raybot PRO — Multi-Agent Demo"
+
+# Write-behind event journal (append_event returns before the row hits disk)
+# Set:   RAYBOT_WRITE_BEHIND=1   to batch event inserts on a background writer
+EVENT_WRITE_BEHIND = os.environ.get("RAYBOT_WRITE_BEHIND", "0") in ("1", "true", "True")
+EVENT_BATCH_SIZE = int(os.environ.get("RAYBOT_EVENT_BATCH", "64"))
+EVENT_FLUSH_INTERVAL = float(os.environ.get("RAYBOT_EVENT_FLUSH_MS", "50")) / 1000.0
+# Queued events before append_event flushes the queue itself instead of waiting on the writer
+EVENT_MAX_PENDING = int(os.environ.get("RAYBOT_EVENT_MAX_PENDING", "10000"))
+
+# Keep previous memory values in memory_history when a key is overwritten
+MEMORY_HISTORY = os.environ.get("RAYBOT_MEMORY_HISTORY", "1") in ("1", "true", "True")
+
+# Read-through cache for tools/memory.py, keyed on (session_id, key)
+# Set:   RAYBOT_MEMORY_CACHE=0   to always read SQLite
+MEMORY_CACHE_ENABLED = os.environ.get("RAYBOT_MEMORY_CACHE", "1") in ("1", "true", "True")
+MEMORY_CACHE_ENTRIES = int(os.environ.get("RAYBOT_MEMORY_CACHE_ENTRIES", "4096"))
+MEMORY_CACHE_TTL = float(os.environ.get("RAYBOT_MEMORY_CACHE_TTL", "300"))
+
+# Per-session rolling chat context kept in memory (LRU)
+CONTEXT_WINDOW = int(os.environ.get("RAYBOT_CONTEXT_WINDOW", "10"))
+CONTEXT_CACHE_SESSIONS = int(os.environ.get("RAYBOT_CONTEXT_SESSIONS", "256"))
+CONTEXT_CACHE_BYTES = int(os.environ.get("RAYBOT_CONTEXT_BYTES", str(8 * 1024 * 1024)))
+
+# Older turns pulled into chat context by full-text search (0 disables)
+CHAT_RECALL_HITS = int(os.environ.get("RAYBOT_CHAT_RECALL", "2"))
+
+# Chat prompt token budget (tools/context_builder.py), system prompt included
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("RAYBOT_CONTEXT_TOKENS", "1500"))
+CONTEXT_MESSAGE_SHARE = float(os.environ.get("RAYBOT_CONTEXT_MESSAGE_SHARE", "0.5"))  # max share for the user's message
+CONTEXT_MEMORY_FACTS = int(os.environ.get("RAYBOT_CONTEXT_FACTS", "20"))
+
+# Full-text search ranks (bm25) only the newest N matches of a query
+SEARCH_CANDIDATES = int(os.environ.get("RAYBOT_SEARCH_CANDIDATES", "200"))
+
+# Background jobs (tools/jobs.py)
+JOB_WORKERS = int(os.environ.get("RAYBOT_JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = float(os.environ.get("RAYBOT_JOB_POLL", "0.5"))
+JOB_STALE_SECONDS = float(os.environ.get("RAYBOT_JOB_STALE", "30"))
+
+# LLM response cache (tools/llm_cache.py)
+# Set:   RAYBOT_LLM_CACHE=0   to always call the model
+LLM_CACHE_ENABLED = os.environ.get("RAYBOT_LLM_CACHE", "1") in ("1", "true", "True")
+LLM_CACHE_ENTRIES = int(os.environ.get("RAYBOT_LLM_CACHE_ENTRIES", "1024"))
+LLM_CACHE_TTL = float(os.environ.get("RAYBOT_LLM_CACHE_TTL", str(24 * 3600)))
+LLM_CACHE_BYTES = int(os.environ.get("RAYBOT_LLM_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Pipeline stage memoization (tools/pipeline_cache.py)
+# Set:   RAYBOT_PIPELINE_CACHE=0   to re-run every stage
+PIPELINE_CACHE_ENABLED = os.environ.get("RAYBOT_PIPELINE_CACHE", "1") in ("1", "true", "True")
+PIPELINE_CACHE_TTL = float(os.environ.get("RAYBOT_PIPELINE_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Resilient LLM client (tools/llm_client.py)
+LLM_DEADLINE = float(os.environ.get("RAYBOT_LLM_DEADLINE", "30"))          # seconds per request, retries included
+LLM_CONNECT_TIMEOUT = float(os.environ.get("RAYBOT_LLM_CONNECT_TIMEOUT", "5"))
+LLM_MAX_CONNECTIONS = int(os.environ.get("RAYBOT_LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_RETRIES = int(os.environ.get("RAYBOT_LLM_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.environ.get("RAYBOT_LLM_BACKOFF", "0.25"))
+LLM_BACKOFF_MAX = float(os.environ.get("RAYBOT_LLM_BACKOFF_MAX", "4"))
+LLM_HEDGE_AFTER = float(os.environ.get("RAYBOT_LLM_HEDGE_AFTER", "0"))     # 0 disables hedged requests
+LLM_BREAKER_FAILURES = int(os.environ.get("RAYBOT_LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN = float(os.environ.get("RAYBOT_LLM_BREAKER_COOLDOWN", "30"))
+
+# Text-to-speech (tools/tts_cache.py). Engine: auto (gtts, else pyttsx3), gtts, pyttsx3 or stub
+TTS_ENGINE = os.environ.get("RAYBOT_TTS_ENGINE", "auto")
+TTS_VOICE = os.environ.get("RAYBOT_TTS_VOICE", "en")
+TTS_CACHE_DIR = os.environ.get("RAYBOT_TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_BYTES = int(os.environ.get("RAYBOT_TTS_CACHE_BYTES", str(256 * 1024 * 1024)))
+TTS_CACHE_MAX_AGE = float(os.environ.get("RAYBOT_TTS_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+# Tracing and metrics (tools/tracing.py). Latency histograms are always kept
+# while tracing is on; TRACE_SAMPLE is the share of requests whose span tree is logged.
+TRACE_ENABLED = os.environ.get("RAYBOT_TRACE", "1") in ("1", "true", "True")
+TRACE_SAMPLE = float(os.environ.get("RAYBOT_TRACE_SAMPLE", "0.01"))
+METRICS_FILE = os.environ.get("RAYBOT_METRICS_FILE", "")               # JSON export path, "" = off
+METRICS_PORT = int(os.environ.get("RAYBOT_METRICS_PORT", "0"))          # local /metrics endpoint, 0 = off
+METRICS_INTERVAL = float(os.environ.get("RAYBOT_METRICS_INTERVAL", "10"))
+
+# Local news archive (tools/news_store.py), a separate SQLite file.
+# Search ranks at most NEWS_SEARCH_CANDIDATES newest matches by BM25 (results say
+# truncated when a query matched more); 0 = all, slower for very common words.
+NEWS_DB = os.environ.get("RAYBOT_NEWS_DB", "raybot_news.sqlite")
+NEWS_BATCH = int(os.environ.get("RAYBOT_NEWS_BATCH", "5000"))
+NEWS_SEARCH_CANDIDATES = int(os.environ.get("RAYBOT_NEWS_CANDIDATES", "5000"))
+
+# Headless HTTP API (api/server.py): pre-forked worker processes sharing
+# one listening socket and the SQLite (WAL) database
+API_HOST = os.environ.get("RAYBOT_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("RAYBOT_API_PORT", "8000"))
+API_WORKERS = int(os.environ.get("RAYBOT_API_WORKERS", str(os.cpu_count() or 1)))
+API_MAX_BODY = int(os.environ.get("RAYBOT_API_MAX_BODY", str(16 * 1024 * 1024)))
+# Bearer token for every route but /healthz; required when API_HOST is not a loopback address
+API_TOKEN = os.environ.get("RAYBOT_API_TOKEN", "")
+# Files sent to POST /uploads (audio for the voice agent and lecture pipeline), kept for a day
+API_UPLOAD_DIR = os.environ.get("RAYBOT_API_UPLOAD_DIR", "api_uploads")
+API_UPLOAD_MAX_AGE = float(os.environ.get("RAYBOT_API_UPLOAD_MAX_AGE", str(24 * 3600)))
+# Set RAYBOT_API_URL to make the Gradio app a client of a running API
+API_URL = os.environ.get("RAYBOT_API_URL", "")
@@ -1,13 +1,31 @@
 # main.py — Entry point for Raybot PRO
 
 from ui.app import make_app
-from config import APP_TITLE
+from config import APP_TITLE, API_URL
+from tools.bootstrap import init
 
 def main():
     print(f"🚀 Starting {APP_TITLE}")
-    
-    # Build Gradio app
-    app = make_app()
+
+    if API_URL:
+        # The UI is just another client of a running API (python -m api.server)
+        from api.client import ApiClient
+        client = ApiClient(API_URL)
+        app = make_app(client, **client.ui_helpers())
+    else:
+        # Logging, DB schema, write-behind journal and (optionally) Whisper warm-up
+        init()
+
+        from agents.registry import build_agent_manager
+        from tools import db
+        app = make_app(
+            build_agent_manager(),
+            create_session=db.create_session,
+            append_event=db.append_event,
+            get_recent_events=db.get_recent_events,
+            search_events=db.search_events,
+            remember=db.remember,
+        )
 
     # Launch server
     # In Colab use share=True
@@ -18,4 +36,4 @@ def main():
     )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
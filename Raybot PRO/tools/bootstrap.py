@@ -0,0 +1,51 @@
+# bootstrap.py — explicit startup for Raybot PRO processes
+#
+# Importing tools/agents/ui modules has no side effects: the schema is
+# created on the first DB call, logging is left alone, and Whisper, torch,
+# Gradio and NumPy are imported when first needed. Servers call init() to
+# do that work up front instead of on the first request; workers and CLI
+# tools can skip it and pay only for what they use.
+
+import logging
+
+from config import EVENT_WRITE_BEHIND, WHISPER_WARMUP, METRICS_FILE, METRICS_PORT
+
+_done = set()
+
+def init(db=True, logs=True, write_behind=EVENT_WRITE_BEHIND, warm_up=WHISPER_WARMUP,
+         metrics_file=METRICS_FILE, metrics_port=METRICS_PORT):
+    """Runs the selected startup steps once per process; returns the steps done so far."""
+    if logs and "logs" not in _done:
+        from tools.logging_tools import setup_logging
+        setup_logging()
+        _done.add("logs")
+
+    if db and "db" not in _done:
+        from tools.db import init_db
+        init_db()
+        _done.add("db")
+
+    if write_behind and "write_behind" not in _done:
+        from tools.db import enable_write_behind
+        enable_write_behind()
+        _done.add("write_behind")
+
+    # Whisper loads in the background so the first transcription is fast
+    if warm_up and "warm_up" not in _done:
+        from tools.whisper_models import registry
+        registry.warm_up_async()
+        _done.add("warm_up")
+
+    # Latency metrics: periodic JSON file and/or a local /metrics endpoint
+    if metrics_file and "metrics_file" not in _done:
+        from tools.tracing import start_exporter
+        start_exporter(metrics_file)
+        _done.add("metrics_file")
+
+    if metrics_port and "metrics_port" not in _done:
+        from tools.tracing import serve_metrics
+        serve_metrics(metrics_port)
+        _done.add("metrics_port")
+
+    logging.debug(f"Raybot PRO init: {sorted(_done)}")
+    return set(_done)
@@ -0,0 +1,208 @@
+# context_builder.py — token-budgeted prompt assembly for chat_agent
+#
+# Every part of the prompt is measured with a fast local token estimate and
+# filled greedily, most important first: the user's message, recent turns
+# (newest first), remembered memory facts, then a summary of older turns.
+# Whatever does not fit is cut at a token boundary, so the same inputs always
+# give the same prompt and the estimate never exceeds the budget.
+
+import re
+import threading
+from collections import deque
+
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_MESSAGE_SHARE, CONTEXT_MEMORY_FACTS, CHAT_RECALL_HITS
+from tools.db import list_memory, search_events, search_memory
+from tools.context_cache import context_cache
+from tools.summarizer_engine import extractive_summary, stopwords
+
+SYSTEM_PROMPT = "You are Raybot PRO, a friendly and helpful AI assistant."
+
+# Share of the context budget (after system prompt and message) per section;
+# the older-turn summary gets whatever is left
+RECENT_SHARE = 0.6
+FACTS_SHARE = 0.2
+
+# Distinct message words used to look up older turns and facts
+QUERY_TERMS = 16
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+_WORD = re.compile(r"\w+")
+_MARK = " …"
+
+def _cost(piece):
+    # BPE vocabularies keep common English words whole and split long or
+    # non-Latin ones; this errs on the high side, which is the safe side
+    if not piece.isascii():
+        return len(piece)
+    return (len(piece) + 5) // 6
+
+def estimate_tokens(text):
+    """Fast token estimate (no tokenizer download); additive over whitespace-joined parts."""
+    return sum(_cost(m.group()) for m in _PIECE.finditer(text or ""))
+
+def truncate_tokens(text, budget):
+    """Longest prefix of text that fits in budget tokens, marked with an ellipsis."""
+    if estimate_tokens(text) <= budget:
+        return text
+    room = budget - estimate_tokens(_MARK)
+    used, end = 0, 0
+    for m in _PIECE.finditer(text):
+        c = _cost(m.group())
+        if used + c > room:
+            break
+        used += c
+        end = m.end()
+    return text[:end].rstrip() + _MARK if end else ""
+
+def _fill(lines, budget, header):
+    """Greedily takes lines in the given order while they fit -> (kept, used, skipped)."""
+    used = estimate_tokens(header)
+    kept, skipped = [], []
+    for line in lines:
+        c = estimate_tokens(line)
+        if not skipped and used + c <= budget:
+            kept.append(line)
+            used += c
+        elif not kept and not skipped and budget - used > 8:
+            # The first line alone is too long: keep its beginning rather than nothing
+            kept.append(truncate_tokens(line, budget - used))
+            used += estimate_tokens(kept[-1])
+        else:
+            skipped.append(line)
+    return (kept, used, skipped) if kept else ([], 0, skipped)
+
+def assemble(message, recent=(), facts=(), older=(), budget=CONTEXT_TOKEN_BUDGET, system_prompt=SYSTEM_PROMPT,
+             summarize_recent=None):
+    """Builds (system, user) prompts from plain lists; recent/older are oldest first.
+
+    summarize_recent(n), if given, returns a summary of the n oldest recent
+    lines (build_context answers it from the session's context cache).
+
+    Returns {"system", "user", "tokens": {...per section, "total"}, "truncated": [...]}.
+    """
+    tokens = {"system": estimate_tokens(system_prompt)}
+    truncated = []
+    left = max(0, budget - tokens["system"])
+
+    text = truncate_tokens(message, int(left * CONTEXT_MESSAGE_SHARE))
+    if text != message:
+        truncated.append("message")
+    tokens["message"] = estimate_tokens("User: " + text)
+    left = max(0, left - tokens["message"])
+    context = left
+
+    sections = []
+    kept, tokens["recent"], overflow = _fill(list(reversed(recent)), int(context * RECENT_SHARE), "Recent conversation:")
+    if kept:
+        sections.append("Recent conversation:\n" + "\n".join(reversed(kept)))
+    left -= tokens["recent"]
+
+    kept, tokens["memory"], dropped = _fill([f"- {k}: {v}" for k, v in facts], int(context * FACTS_SHARE), "Known facts:")
+    if kept:
+        sections.insert(0, "Known facts:\n" + "\n".join(kept))
+    if dropped:
+        truncated.append("memory")
+    left -= tokens["memory"]
+
+    # Turns that fell out of the recent section join the older hits in the summary
+    tokens["summary"] = 0
+    if (older or overflow) and left > 8:
+        if overflow and summarize_recent is not None:
+            source = list(older) + [summarize_recent(len(overflow))]
+        else:
+            source = list(older) + list(reversed(overflow))
+        summary = source[0] if len(source) == 1 else extractive_summary("\n".join(source), max_sentences=3)
+        header = "Earlier in this conversation:"
+        summary = truncate_tokens(summary, left - estimate_tokens(header))
+        if summary:
+            sections.insert(len(sections) - bool(tokens["recent"]), header + "\n" + summary)
+            tokens["summary"] = estimate_tokens(header + " " + summary)
+    if overflow:
+        truncated.append("recent")
+
+    user = ("\n\n".join(sections) + "\n\nUser: " + text) if sections else text
+    if not sections:
+        tokens["message"] = estimate_tokens(text)
+    tokens["total"] = sum(tokens.values())
+    return {"system": system_prompt, "user": user, "tokens": tokens, "truncated": truncated}
+
+def _query(message):
+    # A pasted essay must not turn into a thousand-term full-text query
+    terms = dict.fromkeys(w for w in _WORD.findall(message.lower()) if w not in stopwords)
+    return " ".join(list(terms)[:QUERY_TERMS])
+
+def recall_older(session_id, message, window_lines, limit=CHAT_RECALL_HITS):
+    """Older turns matching the message that are outside the recent window."""
+    query = _query(message)
+    if not query or limit <= 0:
+        return []
+
+    window = set(window_lines)
+    lines = []
+    for role, content, _ts in search_events(session_id, query, limit=limit + 10, any_term=True):
+        line = f"{role}: {content}"
+        if content == message or line in window:
+            continue
+        lines.append(line[:300])
+        if len(lines) >= limit:
+            break
+    return lines
+
+def build_context(session_id, message, budget=CONTEXT_TOKEN_BUDGET, system_prompt=SYSTEM_PROMPT):
+    """Gathers recent turns, memory facts and older hits for a session, then assemble()s them."""
+    if not session_id:
+        ctx = assemble(message, budget=budget, system_prompt=system_prompt)
+        prompt_stats.record(ctx["tokens"]["total"])
+        return ctx
+
+    with context_cache.lock:
+        session = context_cache.get(session_id)
+        recent = session.lines()
+    # The UI logs the user's turn before calling the agent; it is the message itself
+    if recent and recent[-1] == f"user: {message}":
+        recent.pop()
+
+    facts, seen = [], set()
+    for k, v in search_memory(session_id, _query(message), limit=CONTEXT_MEMORY_FACTS, any_term=True) \
+            + list_memory(session_id, limit=CONTEXT_MEMORY_FACTS):
+        if k not in seen:
+            seen.add(k)
+            facts.append((k, v))
+
+    def summarize_recent(n):
+        # The oldest turns are scored incrementally by the cache; fall back if they moved since
+        with context_cache.lock:
+            if session.lines(n) == recent[:n]:
+                return session.summary(3, n)
+        return extractive_summary("\n".join(recent[:n]), max_sentences=3)
+
+    older = recall_older(session_id, message, recent)
+    ctx = assemble(message, recent, facts[:CONTEXT_MEMORY_FACTS], older, budget, system_prompt, summarize_recent)
+    prompt_stats.record(ctx["tokens"]["total"])
+    return ctx
+
+class PromptStats:
+    """Recent prompt sizes (estimated tokens) for p50/p95 reporting."""
+
+    def __init__(self, window=1024):
+        self.sizes = deque(maxlen=window)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def record(self, tokens):
+        with self.lock:
+            self.sizes.append(tokens)
+            self.count += 1
+
+    def snapshot(self):
+        with self.lock:
+            sizes = sorted(self.sizes)
+            count = self.count
+
+        def pct(p):
+            return sizes[min(len(sizes) - 1, int(p * len(sizes)))] if sizes else 0
+
+        return {"prompts": count, "tokens_p50": pct(0.50), "tokens_p95": pct(0.95),
+                "tokens_max": sizes[-1] if sizes else 0, "budget": CONTEXT_TOKEN_BUDGET}
+
+prompt_stats = PromptStats()
@@ -0,0 +1,216 @@
+# context_cache.py — incremental per-session chat context (LRU)
+#
+# Keeps the last CONTEXT_WINDOW events of each active session in memory,
+# together with word frequencies and per-sentence scores. append_event
+# feeds new events in, so a chat turn only scores the sentences that
+# arrived since the previous turn instead of the whole window. Appends made
+# by other processes (API workers) never reach the listener, so get()
+# compares the newest timestamps in the DB with the window and reloads the
+# session when one is unknown.
+
+import heapq
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict, deque
+from itertools import islice
+
+from config import CONTEXT_WINDOW, CONTEXT_CACHE_SESSIONS, CONTEXT_CACHE_BYTES
+from tools.db import add_event_listener, get_conn, get_recent_events
+from tools.summarizer_engine import stopwords
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?]) +")
+_WORD = re.compile(r"\w+")
+
+# Newest events of a session compared against the cached window on every get()
+REVALIDATE_ROWS = 8
+
+def recent_stamps(session_id, limit=REVALIDATE_ROWS):
+    """ts of the newest committed events of a session."""
+    rows = get_conn().execute(
+        "SELECT ts FROM events WHERE session_id=? ORDER BY id DESC LIMIT ?", (session_id, limit)
+    ).fetchall()
+    return [ts for ts, in rows]
+
+class SessionContext:
+    """Rolling window of events with incrementally maintained sentence scores."""
+
+    def __init__(self, window=CONTEXT_WINDOW):
+        self.window = window
+        self.events = deque()                 # (line, [sentence ids])
+        self.stamps = deque()                 # ts of each event in events (None if unknown)
+        self.seen = Counter()                 # ts -> events in the window with it
+        self.sentences = {}                   # sid -> (text, term counts)
+        self.scores = {}                      # sid -> score under current freq
+        self.freq = Counter()
+        self.postings = defaultdict(dict)     # word -> {sid: count}
+        self.next_sid = 0
+        self.size = 0                         # approx bytes held
+        self._summaries = {}
+
+    def add(self, role, content, ts=None):
+        line = f"{role}: {content}"
+        sids = []
+
+        for s in _SENT_SPLIT.split(line):
+            s = s.strip()
+            if not s:
+                continue
+            terms = Counter(w for w in _WORD.findall(s.lower()) if w not in stopwords)
+            sid = self.next_sid
+            self.next_sid += 1
+            self._shift(terms, +1)
+            self.sentences[sid] = (s, terms)
+            self.scores[sid] = sum(self.freq[w] * c for w, c in terms.items())
+            for w, c in terms.items():
+                self.postings[w][sid] = c
+            sids.append(sid)
+
+        self.events.append((line, sids))
+        self.stamps.append(ts)
+        self.seen[ts] += 1
+        self.size += len(line)
+        self._summaries.clear()
+
+        while len(self.events) > self.window:
+            self._evict()
+
+    def _evict(self):
+        line, sids = self.events.popleft()
+        ts = self.stamps.popleft()
+        self.seen[ts] -= 1
+        if not self.seen[ts]:
+            del self.seen[ts]
+        self.size -= len(line)
+        for sid in sids:
+            _, terms = self.sentences.pop(sid)
+            for w in terms:
+                del self.postings[w][sid]
+                if not self.postings[w]:
+                    del self.postings[w]
+            self.scores.pop(sid)
+            self._shift(terms, -1)
+
+    def _shift(self, terms, sign):
+        # freq[w] changes by sign*c, so every sentence containing w moves by its count * that delta
+        for w, c in terms.items():
+            delta = sign * c
+            self.freq[w] += delta
+            if not self.freq[w]:
+                del self.freq[w]
+            for sid, tf in self.postings.get(w, {}).items():
+                self.scores[sid] += tf * delta
+
+    def text(self):
+        return "\n".join(line for line, _ in self.events)
+
+    def lines(self, n=None):
+        return [line for line, _ in islice(self.events, n)]
+
+    def summary(self, max_sentences=3, n=None):
+        """Same contract as extractive_summary(self.text(), max_sentences).
+
+        With n, only sentences of the n oldest events are picked (still
+        scored against the whole window); chat prompts use this for turns
+        that no longer fit in full.
+        """
+        key = (max_sentences, n)
+        if key in self._summaries:
+            return self._summaries[key]
+
+        sids = self.scores if n is None else [sid for _, ids in islice(self.events, n) for sid in ids]
+        if len(sids) <= max_sentences:
+            out = "\n".join(self.lines(n))
+        else:
+            best = heapq.nsmallest(max_sentences, sids, key=lambda sid: (-self.scores[sid], sid))
+            out = " ".join(self.sentences[sid][0] for sid in sorted(best))
+
+        self._summaries[key] = out
+        return out
+
+class ContextCache:
+    """LRU of SessionContext objects bounded by session count and bytes."""
+
+    def __init__(self, max_sessions=CONTEXT_CACHE_SESSIONS, max_bytes=CONTEXT_CACHE_BYTES,
+                 window=CONTEXT_WINDOW, loader=get_recent_events, stamps=recent_stamps):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.window = window
+        self.loader = loader
+        self.stamps = stamps
+        self.contexts = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def get(self, session_id):
+        with self.lock:
+            ctx = self.contexts.get(session_id)
+            if ctx is not None:
+                # Another process may have appended: any newest ts we never saw means reload
+                if all(ts in ctx.seen for ts in self.stamps(session_id)):
+                    self.contexts.move_to_end(session_id)
+                    self.hits += 1
+                    return ctx
+                self.reloads += 1
+                self.contexts.pop(session_id)
+                self.bytes -= ctx.size
+            else:
+                self.misses += 1
+
+            # Rebuild from the DB. An append committed before this read but
+            # notified after it is already loaded; on_event skips it by its ts
+            # instead of adding it a second time.
+            ctx = SessionContext(self.window)
+            for role, content, ts in self.loader(session_id, limit=self.window):
+                ctx.add(role, content, ts)
+            self.contexts[session_id] = ctx
+            self.bytes += ctx.size
+            self._trim()
+            return ctx
+
+    def on_event(self, session_id, role, content, ts=None):
+        with self.lock:
+            ctx = self.contexts.get(session_id)
+            if ctx is None:
+                return  # not cached — the next get() loads it from the DB
+            if ts is not None and ts in ctx.seen:
+                return  # already read from the DB by get()
+            before = ctx.size
+            ctx.add(role, content, ts)
+            self.bytes += ctx.size - before
+            self.contexts.move_to_end(session_id)
+            self._trim()
+
+    def summary(self, session_id, max_sentences=3):
+        with self.lock:
+            return self.get(session_id).summary(max_sentences)
+
+    def invalidate(self, session_id=None):
+        with self.lock:
+            if session_id is None:
+                self.contexts.clear()
+                self.bytes = 0
+            else:
+                ctx = self.contexts.pop(session_id, None)
+                if ctx is not None:
+                    self.bytes -= ctx.size
+
+    def _trim(self):
+        while self.contexts and (len(self.contexts) > self.max_sessions or self.bytes > self.max_bytes):
+            _, ctx = self.contexts.popitem(last=False)
+            self.bytes -= ctx.size
+
+    def stats(self):
+        with self.lock:
+            return {
+                "sessions": len(self.contexts),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+            }
+
+context_cache = ContextCache()
+add_event_listener(context_cache.on_event)
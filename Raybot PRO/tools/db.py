@@ -1,105 +1,445 @@
+import atexit
+import logging
+import re
 import sqlite3
+import threading
+import weakref
 from datetime import datetime
-from config import DB_PATH
+from config import (
+    DB_PATH, EVENT_WRITE_BEHIND, EVENT_BATCH_SIZE, EVENT_FLUSH_INTERVAL, EVENT_MAX_PENDING,
+    MEMORY_HISTORY, SEARCH_CANDIDATES,
+)
+from tools.migrations import migrate
+from tools.tracing import traced
+
+# Connection tuning — applied once per connection
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",       # ~16 MB page cache
+    "PRAGMA mmap_size=268435456",     # 256 MB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Prepared statements kept per connection
+STATEMENT_CACHE_SIZE = 128
+
+_local = threading.local()
+_conns = {}      # id(conn) -> conn, for close_all(); dead threads drop theirs
+_conns_lock = threading.Lock()
+_generation = 0
+
+def _connect():
+    conn = sqlite3.connect(
+        DB_PATH,
+        check_same_thread=False,  # only ever used by its owner thread; closed by close_all()
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def get_conn():
+    """Returns this thread's reusable connection; the first call in a process also runs init_db()."""
+    conn = _thread_conn()
+    if not _ready:
+        init_db()
+    return conn
+
+def _thread_conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "generation", None) != _generation:
+        conn = _connect()
+        _local.conn = conn
+        _local.generation = _generation
+        with _conns_lock:
+            _conns[id(conn)] = conn
+        # Short-lived threads (e.g. API request handlers) would otherwise leave
+        # their connection and its file descriptors open until close_all()
+        weakref.finalize(threading.current_thread(), _release, conn)
+    return conn
+
+def _release(conn):
+    with _conns_lock:
+        if _conns.get(id(conn)) is not conn:
+            return   # already closed by close_all()
+        del _conns[id(conn)]
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+def close_all():
+    """Closes every pooled connection (shutdown / tests)."""
+    global _generation
+    with _conns_lock:
+        _generation += 1
+        for conn in _conns.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _conns.clear()
+
+_has_fts = False
+_ready = False
+_init_lock = threading.Lock()
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS sessions (
-            id INTEGER PRIMARY KEY,
-            name TEXT,
-            created_at TEXT
-        )
-    """)
-
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY,
-            session_id INTEGER,
-            role TEXT,
-            content TEXT,
-            ts TEXT
-        )
-    """)
-
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS memory (
-            id INTEGER PRIMARY KEY,
-            session_id INTEGER,
-            key TEXT,
-            value TEXT,
-            ts TEXT
-        )
-    """)
+    """Creates or upgrades the schema in place (see tools/migrations.py).
+
+    Runs by itself on first use; call it (or tools.bootstrap.init()) to pay the cost at startup.
+    """
+    global _has_fts, _ready
+    with _init_lock:
+        conn = _thread_conn()
+        version = migrate(conn)
+        _has_fts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='events_fts'"
+        ).fetchone() is not None
+        _ready = True
+    return version
+
+def _fts():
+    if not _ready:
+        init_db()
+    return _has_fts
 
-    conn.commit()
-    conn.close()
+class EventJournal:
+    """Write-behind queue for events, flushed in batched transactions.
 
-init_db()
+    A background writer commits once `batch_size` events are queued or
+    `flush_interval` seconds have passed, whichever comes first. Queued
+    events stay visible to get_recent_events until they are committed.
+    Once `max_pending` events are queued (the writer is failing or falling
+    behind), put() flushes the queue on the caller's thread, so errors reach
+    the caller instead of the queue growing without bound.
+    """
 
+    MAX_BACKOFF = 5.0
+
+    def __init__(self, batch_size=EVENT_BATCH_SIZE, flush_interval=EVENT_FLUSH_INTERVAL,
+                 max_pending=EVENT_MAX_PENDING):
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, int(max_pending))
+        self.failures = 0   # consecutive failed background flushes
+        self.pending = []
+        self.cond = threading.Condition()
+        self.commit_lock = threading.RLock()  # held while a batch moves from pending to disk
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="raybot-event-journal", daemon=True)
+        self.thread.start()
+
+    def put(self, session_id, role, content, ts):
+        with self.cond:
+            self.pending.append((session_id, role, content, ts))
+            if len(self.pending) >= self.batch_size:
+                self.cond.notify()
+            # Also write through once closed: no writer is left to pick the event up
+            full = self.stopped or len(self.pending) >= self.max_pending
+        if full:
+            self.flush()
+
+    def pending_for(self, session_id):
+        with self.cond:
+            return [(r, c, ts) for sid, r, c, ts in self.pending if sid == session_id]
+
+    def flush(self, durable=False):
+        """Writes everything queued so far; returns the number of events written."""
+        with self.commit_lock:
+            with self.cond:
+                batch = list(self.pending)
+            if batch:
+                conn = get_conn()
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO events (session_id, role, content, ts) VALUES (?,?,?,?)",
+                        batch
+                    )
+                with self.cond:
+                    del self.pending[:len(batch)]
+            if durable:
+                get_conn().execute("PRAGMA wal_checkpoint(FULL)")
+            return len(batch)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                if self.failures:
+                    # Back off while the DB keeps failing; put() takes over once the queue is full
+                    self.cond.wait(min(self.MAX_BACKOFF, self.flush_interval * 2 ** self.failures))
+                elif not self.stopped and len(self.pending) < self.batch_size:
+                    self.cond.wait(self.flush_interval)
+                stopped = self.stopped
+            try:
+                self.flush()
+                if self.failures:
+                    logging.info(f"Event journal flushed after {self.failures} failed attempts")
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1  # keep events queued; the next round (or close()) retries
+                if self.failures & (self.failures - 1) == 0:   # 1, 2, 4, 8, ... failures
+                    logging.error(f"Event journal flush failed {self.failures} times "
+                                  f"({len(self.pending)} events queued): {e}")
+            if stopped:
+                return
+
+    def close(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+        self.thread.join()
+        self.flush(durable=True)
+
+_journal = None
+_auto_write_behind = EVENT_WRITE_BEHIND   # RAYBOT_WRITE_BEHIND: started by the first append_event
+_journal_lock = threading.Lock()
+_event_listeners = []
+
+def add_event_listener(fn):
+    """Registers fn(session_id, role, content, ts), called after every append_event."""
+    if fn not in _event_listeners:
+        _event_listeners.append(fn)
+
+def _notify(session_id, role, content, ts):
+    for fn in _event_listeners:
+        try:
+            fn(session_id, role, content, ts)
+        except Exception:
+            pass
+
+def enable_write_behind(batch_size=EVENT_BATCH_SIZE, flush_interval=EVENT_FLUSH_INTERVAL):
+    """Switches append_event to the write-behind journal."""
+    global _journal, _auto_write_behind
+    with _journal_lock:
+        _auto_write_behind = False
+        if _journal is None:
+            _journal = EventJournal(batch_size, flush_interval)
+    return _journal
+
+def disable_write_behind():
+    """Drains the journal to disk and returns to synchronous appends."""
+    global _journal, _auto_write_behind
+    _auto_write_behind = False
+    journal, _journal = _journal, None
+    if journal is not None:
+        journal.close()
+
+def flush(durable=False):
+    """Forces queued events to disk. No-op without write-behind."""
+    journal = _journal
+    if journal is None:
+        return 0
+    return journal.flush(durable=durable)
+
+atexit.register(disable_write_behind)
+
+@traced("db.create_session")
 def create_session(name="default"):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    conn = get_conn()
     ts = datetime.utcnow().isoformat()
 
-    c.execute("INSERT INTO sessions (name, created_at) VALUES (?,?)", (name, ts))
+    with conn:
+        c = conn.execute("INSERT INTO sessions (name, created_at) VALUES (?,?)", (name, ts))
 
-    sid = c.lastrowid
-    conn.commit()
-    conn.close()
-    return sid
+    return c.lastrowid
 
+@traced("db.append_event")
 def append_event(session_id, role, content):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
     ts = datetime.utcnow().isoformat()
 
-    c.execute(
-        "INSERT INTO events (session_id, role, content, ts) VALUES (?,?,?,?)",
-        (session_id, role, content, ts)
-    )
+    if _auto_write_behind:
+        enable_write_behind()
 
-    conn.commit()
-    conn.close()
+    journal = _journal   # read once: disable_write_behind() may clear it concurrently
+    if journal is not None:
+        journal.put(session_id, role, content, ts)
+    else:
+        conn = get_conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO events (session_id, role, content, ts) VALUES (?,?,?,?)",
+                (session_id, role, content, ts)
+            )
 
+    _notify(session_id, role, content, ts)
+
+@traced("db.get_recent_events")
 def get_recent_events(session_id, limit=50):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    journal = _journal
+    if journal is None:
+        return _select_recent(session_id, limit)
+
+    # Hold the commit lock so a batch is never counted twice (or missed)
+    with journal.commit_lock:
+        rows = _select_recent(session_id, limit)
+        pending = journal.pending_for(session_id)
 
-    c.execute(
+    return (rows + pending)[-limit:] if pending else rows
+
+def _select_recent(session_id, limit):
+    rows = get_conn().execute(
         "SELECT role, content, ts FROM events WHERE session_id=? ORDER BY id DESC LIMIT ?",
         (session_id, limit)
-    )
+    ).fetchall()
 
-    rows = c.fetchall()
-    conn.close()
     return rows[::-1]
 
-def remember(session_id, key, value):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+_memory_listeners = []
+
+def add_memory_listener(fn):
+    """Registers fn(session_id, keys, version, changed), called after every committed memory write.
+
+    version is memory_version as of that commit; changed is how many bumps the write made.
+    """
+    if fn not in _memory_listeners:
+        _memory_listeners.append(fn)
+
+def memory_version(conn=None):
+    """Counter bumped by every change to the memory table (any process)."""
+    r = (conn or get_conn()).execute("SELECT version FROM memory_version WHERE id=1").fetchone()
+    return r[0] if r else 0
+
+@traced("db.remember")
+def remember(session_id, key, value, keep_history=MEMORY_HISTORY):
+    """Stores the latest value for key; the previous one goes to memory_history if asked."""
+    remember_many(session_id, [(key, value)], keep_history)
+
+@traced("db.remember_many")
+def remember_many(session_id, items, keep_history=MEMORY_HISTORY):
+    """Stores several (key, value) pairs (or a dict) in one transaction."""
+    items = list(items.items() if isinstance(items, dict) else items)
+    if not items:
+        return
+    conn = get_conn()
     ts = datetime.utcnow().isoformat()
 
-    c.execute(
-        "INSERT INTO memory (session_id, key, value, ts) VALUES (?,?,?,?)",
-        (session_id, key, value, ts)
-    )
+    with conn:
+        if keep_history:
+            conn.executemany(
+                "INSERT INTO memory_history (session_id, key, value, ts) "
+                "SELECT session_id, key, value, ts FROM memory WHERE session_id=? AND key=?",
+                ((session_id, k) for k, _ in items)
+            )
 
-    conn.commit()
-    conn.close()
+        conn.executemany(
+            "INSERT INTO memory (session_id, key, value, ts) VALUES (?,?,?,?) "
+            "ON CONFLICT (session_id, key) DO UPDATE SET value=excluded.value, ts=excluded.ts",
+            ((session_id, k, v, ts) for k, v in items)
+        )
+        version = memory_version(conn) if _memory_listeners else 0
 
-def recall(session_id, key):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    keys = [k for k, _ in items]
+    for fn in _memory_listeners:
+        try:
+            fn(session_id, keys, version, len(items))
+        except Exception:
+            pass
 
-    c.execute(
-        "SELECT value FROM memory WHERE session_id=? AND key=? ORDER BY id DESC LIMIT 1",
+@traced("db.recall")
+def recall(session_id, key):
+    r = get_conn().execute(
+        "SELECT value FROM memory WHERE session_id=? AND key=?",
         (session_id, key)
-    )
+    ).fetchone()
+
+    return r[0] if r else None
+
+# Keys per IN (...) list; stays under SQLite's default host-parameter limit
+RECALL_CHUNK = 500
+
+@traced("db.recall_many")
+def recall_many(session_id, keys, conn=None):
+    """Values for several keys of a session in one query -> {key: value}; missing keys are absent."""
+    keys = list(dict.fromkeys(keys))
+    conn = conn or get_conn()
+    out = {}
+    for lo in range(0, len(keys), RECALL_CHUNK):
+        chunk = keys[lo:lo + RECALL_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        out.update(conn.execute(
+            f"SELECT key, value FROM memory WHERE session_id=? AND key IN ({marks})",
+            (session_id, *chunk)
+        ).fetchall())
+    return out
+
+@traced("db.list_memory")
+def list_memory(session_id, limit=50):
+    """Most recently written memory entries -> [(key, value)]."""
+    return get_conn().execute(
+        "SELECT key, value FROM memory WHERE session_id=? ORDER BY ts DESC, id DESC LIMIT ?",
+        (session_id, limit)
+    ).fetchall()
+
+
+_TERM = re.compile(r"\w+")
+
+def _match_expr(session_id, query, any_term):
+    terms = [f'"{t}"' for t in _TERM.findall(query or "")]
+    if not terms:
+        return None
+    joined = (" OR " if any_term else " AND ").join(terms)
+    return f'session_id : "{int(session_id)}" AND ({joined})'
+
+@traced("db.search_events")
+def search_events(session_id, query, limit=10, any_term=False):
+    """Full-text search over a session's events, best match first.
+
+    Returns (role, content, ts) rows like get_recent_events. any_term=True
+    matches events containing any query word instead of all of them.
+    Events still queued by the write-behind journal are not searchable yet.
+    """
+    if not _fts():
+        return _search_events_like(session_id, query, limit, any_term)
+
+    expr = _match_expr(session_id, query, any_term)
+    if expr is None:
+        return []
+
+    # bm25 is only computed for the newest SEARCH_CANDIDATES matches, which keeps
+    # very common terms cheap on sessions with hundreds of thousands of events
+    return get_conn().execute(
+        "SELECT e.role, e.content, e.ts FROM ("
+        "    SELECT rowid, bm25(events_fts) AS score FROM events_fts"
+        "    WHERE events_fts MATCH ? ORDER BY rowid DESC LIMIT ?"
+        ") AS hits JOIN events e ON e.id = hits.rowid "
+        "ORDER BY hits.score LIMIT ?",
+        (expr, SEARCH_CANDIDATES, limit)
+    ).fetchall()
+
+def _search_events_like(session_id, query, limit, any_term):
+    terms = _TERM.findall(query or "")
+    if not terms:
+        return []
+
+    joiner = " OR " if any_term else " AND "
+    where = joiner.join(["content LIKE ?"] * len(terms))
+    return get_conn().execute(
+        f"SELECT role, content, ts FROM events WHERE session_id=? AND ({where}) ORDER BY id DESC LIMIT ?",
+        (session_id, *[f"%{t}%" for t in terms], limit)
+    ).fetchall()
+
+@traced("db.search_memory")
+def search_memory(session_id, query, limit=10, any_term=False):
+    """Full-text search over a session's memory keys and values -> [(key, value)]."""
+    terms = _TERM.findall(query or "")
+    if not terms:
+        return []
 
-    r = c.fetchone()
-    conn.close()
+    if not _fts():
+        joiner = " OR " if any_term else " AND "
+        where = joiner.join(["(key LIKE ? OR value LIKE ?)"] * len(terms))
+        params = [p for t in terms for p in (f"%{t}%", f"%{t}%")]
+        return get_conn().execute(
+            f"SELECT key, value FROM memory WHERE session_id=? AND ({where}) LIMIT ?",
+            (session_id, *params, limit)
+        ).fetchall()
 
-    return r[0] if r else None
\ No newline at end of file
+    return get_conn().execute(
+        "SELECT m.key, m.value FROM memory_fts "
+        "JOIN memory m ON m.id = memory_fts.rowid "
+        "WHERE memory_fts MATCH ? ORDER BY bm25(memory_fts) LIMIT ?",
+        (_match_expr(session_id, query, any_term), limit)
+    ).fetchall()
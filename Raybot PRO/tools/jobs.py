@@ -0,0 +1,323 @@
+# jobs.py — persistent background jobs (start / pause / resume / cancel)
+#
+# Jobs live in the `jobs` table of the main SQLite DB, so progress can be
+# polled from any thread or process and interrupted work is picked up again
+# after a restart. Handlers are plain functions `fn(ctx, params)` that call
+# ctx.report(...) now and then; report() persists progress and a checkpoint
+# and is where pause and cancel requests take effect (cooperatively).
+
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+from config import JOB_WORKERS, JOB_POLL_INTERVAL, JOB_STALE_SECONDS
+from tools.db import get_conn
+
+ACTIVE_STATES = ("queued", "running", "paused")
+CHECKPOINT_SECONDS = 2.0      # large checkpoints are rewritten at most this often
+
+_handlers = {}
+
+def register_job(kind, fn):
+    """Registers handler fn(ctx, params) -> result for jobs of this kind."""
+    _handlers[kind] = fn
+
+class JobCancelled(Exception):
+    pass
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+def _dumps(obj):
+    return None if obj is None else json.dumps(obj)
+
+def _loads(text):
+    return None if text is None else json.loads(text)
+
+class JobContext:
+    """Handed to a running job: progress reporting plus pause/cancel checks."""
+
+    def __init__(self, engine, job_id, checkpoint):
+        self.engine = engine
+        self.job_id = job_id
+        self.checkpoint = checkpoint or {}
+        self._saved = time.monotonic()
+
+    def report(self, progress, message="", checkpoint=None):
+        """Saves progress (0..1) and an optional checkpoint, then honours pause/cancel."""
+        conn = get_conn()
+        with conn:
+            if checkpoint is None:
+                conn.execute(
+                    "UPDATE jobs SET progress=?, message=?, heartbeat=?, updated_at=? WHERE id=?",
+                    (float(progress), message, time.time(), _now(), self.job_id)
+                )
+            else:
+                self.checkpoint = checkpoint
+                conn.execute(
+                    "UPDATE jobs SET progress=?, message=?, checkpoint=?, heartbeat=?, updated_at=? WHERE id=?",
+                    (float(progress), message, _dumps(checkpoint), time.time(), _now(), self.job_id)
+                )
+        self.check()
+
+    def due(self, last=False):
+        """True when a large checkpoint should be written now: every CHECKPOINT_SECONDS and on the last step."""
+        now = time.monotonic()
+        if last or now - self._saved >= CHECKPOINT_SECONDS:
+            self._saved = now
+            return True
+        return False
+
+    def check(self):
+        """Raises JobCancelled if cancelled; blocks while paused."""
+        while True:
+            state = self.engine.state(self.job_id)
+            if state == "cancelled":
+                raise JobCancelled()
+            if state != "paused":
+                return
+            self.engine.heartbeat(self.job_id)
+            self.engine.stopped.wait(self.engine.poll_interval)
+
+class JobEngine:
+    """Worker threads that claim queued jobs from the DB and run them."""
+
+    def __init__(self, workers=JOB_WORKERS, poll_interval=JOB_POLL_INTERVAL, stale_after=JOB_STALE_SECONDS):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.threads = []
+
+    # ---- lifecycle ----
+    def start(self):
+        if self.threads:
+            return self
+        self.recover()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"raybot-job-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+        t = threading.Thread(target=self._maintain, name="raybot-job-heartbeat", daemon=True)
+        t.start()
+        self.threads.append(t)
+        return self
+
+    def stop(self, timeout=None):
+        """Stops taking new jobs; running jobs are left to be recovered later."""
+        self.stopped.set()
+        self.wake.set()
+        for t in self.threads:
+            t.join(timeout)
+        self.threads = []
+
+    # ---- public API ----
+    def submit(self, kind, params=None):
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        conn = get_conn()
+        with conn:
+            c = conn.execute(
+                "INSERT INTO jobs (kind, params, state, created_at, updated_at) VALUES (?,?,?,?,?)",
+                (kind, _dumps(params or {}), "queued", _now(), _now())
+            )
+        self._poke()
+        return c.lastrowid
+
+    def pause(self, job_id):
+        return self._transition(job_id, "paused", ("queued", "running"))
+
+    def resume(self, job_id):
+        conn = get_conn()
+        with conn:
+            c = conn.execute(
+                "UPDATE jobs SET state = CASE WHEN worker IS NULL THEN 'queued' ELSE 'running' END, "
+                "updated_at=? WHERE id=? AND state='paused'",
+                (_now(), job_id)
+            )
+        self._poke()
+        return c.rowcount > 0
+
+    def cancel(self, job_id):
+        return self._transition(job_id, "cancelled", ACTIVE_STATES)
+
+    def state(self, job_id):
+        r = get_conn().execute("SELECT state FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return r[0] if r else None
+
+    def status(self, job_id):
+        r = get_conn().execute(
+            "SELECT id, kind, state, progress, message, result, error, created_at, updated_at "
+            "FROM jobs WHERE id=?", (job_id,)
+        ).fetchone()
+        if r is None:
+            return None
+        return {
+            "id": r[0], "kind": r[1], "state": r[2], "progress": r[3], "message": r[4],
+            "result": _loads(r[5]), "error": r[6], "created_at": r[7], "updated_at": r[8],
+        }
+
+    def list_jobs(self, limit=20, active_only=False):
+        where = "WHERE state IN ('queued','running','paused') " if active_only else ""
+        ids = get_conn().execute(f"SELECT id FROM jobs {where}ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self.status(i) for (i,) in ids]
+
+    def heartbeat(self, job_id):
+        conn = get_conn()
+        with conn:
+            conn.execute("UPDATE jobs SET heartbeat=? WHERE id=?", (time.time(), job_id))
+
+    def recover(self):
+        """Requeues running jobs whose worker died (restart, crash)."""
+        cutoff = time.time() - self.stale_after
+        conn = get_conn()
+        rows = conn.execute(
+            "SELECT id, worker, heartbeat FROM jobs WHERE state IN ('running','paused') AND worker IS NOT NULL"
+        ).fetchall()
+
+        dead = [job_id for job_id, worker, beat in rows
+                if worker != self.owner and ((beat or 0) < cutoff or not _owner_alive(worker))]
+        with conn:
+            for job_id in dead:
+                conn.execute(
+                    "UPDATE jobs SET state = CASE WHEN state='running' THEN 'queued' ELSE state END, "
+                    "worker=NULL, updated_at=? WHERE id=?",
+                    (_now(), job_id)
+                )
+        if dead:
+            self._poke()
+        return dead
+
+    # ---- internals ----
+    def _poke(self):
+        self.wake.set()
+
+    def _transition(self, job_id, new_state, from_states):
+        marks = ",".join("?" * len(from_states))
+        conn = get_conn()
+        with conn:
+            c = conn.execute(
+                f"UPDATE jobs SET state=?, updated_at=? WHERE id=? AND state IN ({marks})",
+                (new_state, _now(), job_id, *from_states)
+            )
+        self._poke()
+        return c.rowcount > 0
+
+    def _claim(self):
+        # Only claim kinds this process can run (e.g. "agent" needs attach_jobs)
+        kinds = list(_handlers)
+        marks = ",".join("?" * len(kinds))
+        conn = get_conn()
+        with conn:
+            row = conn.execute(
+                "UPDATE jobs SET state='running', worker=?, heartbeat=?, updated_at=? "
+                f"WHERE id = (SELECT id FROM jobs WHERE state='queued' AND kind IN ({marks}) ORDER BY id LIMIT 1) "
+                "AND state='queued' RETURNING id, kind, params, checkpoint",
+                (self.owner, time.time(), _now(), *kinds)
+            ).fetchone()
+        return row
+
+    def _work(self):
+        while not self.stopped.is_set():
+            try:
+                row = self._claim()
+            except Exception:
+                row = None
+            if row is None:
+                self.wake.wait(self.poll_interval)
+                self.wake.clear()
+                continue
+            self._run(*row)
+
+    def _run(self, job_id, kind, params, checkpoint):
+        ctx = JobContext(self, job_id, _loads(checkpoint))
+        try:
+            result = _handlers[kind](ctx, _loads(params) or {})
+            final = ("done", _dumps(result), None, 1.0)
+        except JobCancelled:
+            final = ("cancelled", None, None, None)
+        except Exception as e:
+            final = ("failed", None, str(e), None)
+
+        state, result, error, progress = final
+        conn = get_conn()
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET state=?, result=?, error=?, progress=COALESCE(?, progress), "
+                "worker=NULL, updated_at=? WHERE id=? AND state!='cancelled'",
+                (state, result, error, progress, _now(), job_id)
+            )
+            conn.execute("UPDATE jobs SET worker=NULL WHERE id=?", (job_id,))
+
+    def _maintain(self):
+        interval = max(0.5, self.stale_after / 3)
+        while not self.stopped.wait(interval):
+            try:
+                conn = get_conn()
+                with conn:
+                    conn.execute(
+                        "UPDATE jobs SET heartbeat=? WHERE worker=? AND state IN ('running','paused')",
+                        (time.time(), self.owner)
+                    )
+                self.recover()
+            except Exception:
+                pass
+
+def _owner_alive(owner):
+    """True unless the owner is a process on this host that no longer exists."""
+    try:
+        host, pid, _ = owner.split(":")
+        if host != socket.gethostname():
+            return True
+        os.kill(int(pid), 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except Exception:
+        return True
+
+# ---- built-in job kinds ----
+def _sleep_job(ctx, params):
+    """Demo job: counts to `seconds`, checkpointing every second."""
+    seconds = int(params.get("seconds", 15))
+    done = ctx.checkpoint.get("elapsed", 0)
+    while done < seconds:
+        time.sleep(1)
+        done += 1
+        ctx.report(done / seconds, f"{done}/{seconds}s", {"elapsed": done})
+    return {"slept": seconds}
+
+def _summarize_job(ctx, params):
+    """Bulk summarization: {"texts": [...]} resumes per text; {"path": ...} streams a file, resuming per block."""
+    max_sentences = params.get("max_sentences", 3)
+
+    if params.get("path"):
+        from tools.stream_summarizer import summarize_stream
+        if not ctx.checkpoint:
+            ctx.report(0.0, "summarizing file")
+        return {"summary": summarize_stream(params["path"], max_sentences, processes=params.get("processes"), job=ctx)}
+
+    from tools.summarizer_engine import extractive_summary
+    texts = params.get("texts", [])
+    summaries = ctx.checkpoint.get("summaries", [])
+    for i in range(len(summaries), len(texts)):
+        summaries.append(extractive_summary(texts[i], max_sentences))
+        # The checkpoint holds every summary so far: write it every few seconds, not per text
+        due = ctx.due(last=i + 1 == len(texts))
+        ctx.report((i + 1) / max(1, len(texts)), f"{i + 1}/{len(texts)}", {"summaries": summaries} if due else None)
+    return {"summaries": summaries}
+
+def _news_ingest_job(ctx, params):
+    """Archive ingestion: {"paths": [...]}; files already read are skipped on resume."""
+    from tools.news_store import news_store
+    report = lambda done, total, added: ctx.report(done / max(1, total), f"{done}/{total} files, {added} new")
+    return news_store.ingest(params.get("paths", []), force=params.get("force", False), progress=report)
+
+register_job("sleep", _sleep_job)
+register_job("summarize", _summarize_job)
+register_job("news_ingest", _news_ingest_job)
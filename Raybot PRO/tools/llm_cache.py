@@ -0,0 +1,135 @@
+# llm_cache.py — two-tier cache for LLM completions
+#
+# Keyed on a hash of the normalized (system prompt, user prompt, model,
+# temperature). An in-process LRU answers repeats instantly; the SQLite
+# tier survives restarts and is shared by every worker on the same DB.
+# Entries expire after a TTL and the table is trimmed by total size.
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config import LLM_CACHE_ENABLED, LLM_CACHE_ENTRIES, LLM_CACHE_TTL, LLM_CACHE_BYTES
+from tools.db import get_conn
+
+_SPACE = re.compile(r"\s+")
+
+# Size-based eviction runs every N writes
+EVICT_EVERY = 64
+
+def make_key(system_prompt, user_prompt, model, temperature):
+    payload = json.dumps([
+        _SPACE.sub(" ", system_prompt or "").strip(),
+        _SPACE.sub(" ", user_prompt or "").strip(),
+        model,
+        round(float(temperature), 3),
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    def __init__(self, max_entries=LLM_CACHE_ENTRIES, ttl=LLM_CACHE_TTL, max_bytes=LLM_CACHE_BYTES,
+                 enabled=LLM_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.memory = OrderedDict()   # key -> (response, created)
+        self.lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+        self._writes = 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.time()
+
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if now - entry[1] < self.ttl:
+                    self.memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return entry[0]
+                del self.memory[key]
+
+        conn = get_conn()
+        row = conn.execute(
+            "SELECT response, created FROM llm_cache WHERE key=? AND created > ?",
+            (key, now - self.ttl)
+        ).fetchone()
+
+        with self.lock:
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["db_hits"] += 1
+            self._remember(key, row[0], row[1])
+
+        with conn:
+            conn.execute("UPDATE llm_cache SET last_used=? WHERE key=?", (now, key))
+        return row[0]
+
+    def put(self, key, response):
+        if not self.enabled or response is None:
+            return
+        now = time.time()
+
+        with self.lock:
+            self._remember(key, response, now)
+            self.counters["puts"] += 1
+            self._writes += 1
+            evict = self._writes % EVICT_EVERY == 0
+
+        conn = get_conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, size, created, last_used) VALUES (?,?,?,?,?)",
+                (key, response, len(response.encode("utf-8")), now, now)
+            )
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drops expired rows, then least-recently-used rows over max_bytes."""
+        conn = get_conn()
+        with conn:
+            removed = conn.execute("DELETE FROM llm_cache WHERE created <= ?", (time.time() - self.ttl,)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            if total > self.max_bytes:
+                # Walk oldest-first until enough bytes are freed
+                excess, cutoff = total - self.max_bytes, None
+                for last_used, size in conn.execute("SELECT last_used, size FROM llm_cache ORDER BY last_used"):
+                    excess -= size
+                    cutoff = last_used
+                    if excess <= 0:
+                        break
+                removed += conn.execute("DELETE FROM llm_cache WHERE last_used <= ?", (cutoff,)).rowcount
+        with self.lock:
+            self.counters["evictions"] += removed
+        return removed
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+        conn = get_conn()
+        with conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        with self.lock:
+            out = dict(self.counters)
+            out["memory_entries"] = len(self.memory)
+        lookups = out["memory_hits"] + out["db_hits"] + out["misses"]
+        out["hit_rate"] = round((out["memory_hits"] + out["db_hits"]) / lookups, 4) if lookups else 0.0
+        return out
+
+    def _remember(self, key, response, created):
+        self.memory[key] = (response, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+llm_cache = LLMCache()
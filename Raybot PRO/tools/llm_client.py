@@ -0,0 +1,266 @@
+# llm_client.py — shared, fault-tolerant wrapper around the OpenAI client
+#
+# Adds what the bare SDK call in chat_agent lacked: a pooled keep-alive
+# HTTP transport, a deadline per request (retries included), exponential
+# backoff with full jitter on 429/5xx/connection errors, optional hedged
+# requests for tail latency, and a circuit breaker. While the breaker is
+# open, calls fail fast with CircuitOpen and chat_agent answers offline.
+# A streamed completion reports to the breaker once it has been read: a
+# connection dropped mid-stream counts as a failure like a refused request.
+
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from types import SimpleNamespace
+
+from config import (
+    OPENAI_API_KEY, OFFLINE_ONLY,
+    LLM_DEADLINE, LLM_CONNECT_TIMEOUT, LLM_MAX_CONNECTIONS,
+    LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, LLM_HEDGE_AFTER,
+    LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN,
+)
+
+class CircuitOpen(Exception):
+    """Upstream marked unhealthy; callers should degrade instead of waiting."""
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half-open probe after cooldown."""
+
+    def __init__(self, failures=LLM_BREAKER_FAILURES, cooldown=LLM_BREAKER_COOLDOWN):
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "half_open" and not self.probing:
+                self.probing = True  # exactly one trial request
+                return True
+            return False
+
+    def record(self, ok):
+        with self.lock:
+            self.probing = False
+            if ok:
+                self.failures = 0
+                self.state = "closed"
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+def _status(e):
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status
+
+def _retryable(e):
+    status = _status(e)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(e).__name__ in ("APIConnectionError", "APITimeoutError") or isinstance(e, (TimeoutError, ConnectionError))
+
+def _retry_after(e):
+    try:
+        return float(e.response.headers.get("retry-after"))
+    except Exception:
+        return None
+
+class _WatchedStream:
+    """Passes a streamed completion through, reporting its outcome exactly once.
+
+    The outcome is known when the stream is exhausted, fails, is closed or
+    is garbage collected; an error raised while reading is passed on.
+    """
+
+    def __init__(self, stream, report):
+        self.stream = stream
+        self.report = report
+        self.it = iter(stream)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.it)
+        except StopIteration:
+            self._done(None)
+            raise
+        except Exception as e:
+            self._done(e)
+            raise
+
+    def __getattr__(self, name):
+        # The SDK stream's own attributes (response, ...) stay reachable
+        return getattr(self.stream, name)
+
+    def close(self):
+        close = getattr(self.stream, "close", None)
+        if close is not None:
+            close()
+        self._done(None)
+
+    def _done(self, error):
+        if self.report is not None:
+            report, self.report = self.report, None
+            report(error)
+
+    def __del__(self):
+        self._done(None)
+
+class ResilientLLM:
+    """Drop-in for the `client.chat.completions.create(...)` surface chat_agent uses."""
+
+    HEDGE_THREADS = 8
+
+    def __init__(self, client, retries=LLM_MAX_RETRIES, deadline=LLM_DEADLINE,
+                 backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX,
+                 hedge_after=LLM_HEDGE_AFTER, breaker=None):
+        self.client = client
+        self.retries = retries
+        self.deadline = deadline
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self.counters = Counter()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=self.HEDGE_THREADS, thread_name_prefix="llm-hedge") if hedge_after else None
+        self._in_flight = 0   # requests on the hedge pool, including abandoned losers
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        if not self.breaker.allow():
+            self.counters["short_circuited"] += 1
+            raise CircuitOpen("LLM upstream unavailable (circuit open)")
+
+        deadline = time.monotonic() + kwargs.pop("deadline", self.deadline)
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise DeadlineExceeded("LLM deadline exceeded")
+                self.counters["attempts"] += 1
+                result = self._attempt(kwargs, remaining)
+                if kwargs.get("stream"):
+                    # Healthy only once read: a drop mid-stream must still reach the breaker
+                    return _WatchedStream(result, self._stream_done)
+                self.breaker.record(True)
+                self.counters["ok"] += 1
+                return result
+            except Exception as e:
+                retryable = _retryable(e)
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.random()
+                delay = max(delay, _retry_after(e) or 0)
+                if (not retryable or attempt >= self.retries
+                        or time.monotonic() + delay >= deadline):
+                    # A 400/401/422 is the caller's fault: the upstream answered, so it counts as healthy
+                    self.breaker.record(not retryable)
+                    self.counters["failed"] += 1
+                    raise
+                self.counters["retries"] += 1
+                time.sleep(delay)
+                attempt += 1
+
+    def _stream_done(self, error):
+        ok = error is None or not _retryable(error)
+        self.breaker.record(ok)
+        if error is None:
+            self.counters["ok"] += 1
+        else:
+            self.counters["failed"] += 1
+            self.counters["stream_failed"] += 1
+
+    def _attempt(self, kwargs, remaining):
+        call = dict(kwargs, timeout=remaining)
+        with self._lock:
+            # Abandoned losers still hold hedge threads until their timeout; don't queue behind them
+            hedge = (self._hedge_pool is not None and not kwargs.get("stream") and remaining > self.hedge_after
+                     and self._in_flight + 2 <= self.HEDGE_THREADS)
+        if not hedge:
+            return self.client.chat.completions.create(**call)
+
+        # Hedge: if the first request is slow, race a second one and take the first success
+        futures = {self._submit(call)}
+        done, _ = wait(futures, timeout=self.hedge_after)
+        if not done:
+            self.counters["hedged"] += 1
+            futures.add(self._submit(dict(kwargs, timeout=remaining - self.hedge_after)))
+
+        error = None
+        try:
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for f in done:
+                    if f.exception() is None:
+                        return f.result()
+                    error = f.exception()
+            raise error
+        finally:
+            # The sync SDK cannot abort a request on the wire: a loser that has
+            # not started is cancelled, one that has runs out its own timeout
+            for f in futures:
+                if not f.cancel():
+                    self.counters["hedge_abandoned"] += 1
+
+    def _submit(self, call):
+        with self._lock:
+            self._in_flight += 1
+        future = self._hedge_pool.submit(self.client.chat.completions.create, **call)
+        future.add_done_callback(self._landed)
+        return future
+
+    def _landed(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self):
+        out = dict(self.counters)
+        out["breaker"] = self.breaker.state
+        return out
+
+def build_openai_client(api_key=OPENAI_API_KEY, base_url=None, **kwargs):
+    """OpenAI client on a pooled keep-alive transport, wrapped in ResilientLLM.
+
+    Returns None in offline mode or when the SDK / key is missing.
+    """
+    if OFFLINE_ONLY or not api_key:
+        return None
+    try:
+        import httpx
+        from openai import OpenAI
+    except Exception:
+        return None
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+        timeout=httpx.Timeout(LLM_DEADLINE, connect=LLM_CONNECT_TIMEOUT),
+    )
+    # Retries are ours, so the SDK's own retry loop is switched off
+    raw = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+    return ResilientLLM(raw, **kwargs)
+
+def wrap_client(client):
+    """Wraps a caller-supplied client once; stubs and already-wrapped clients pass through."""
+    if client is None or isinstance(client, ResilientLLM):
+        return client
+    if hasattr(client, "with_options"):
+        client = client.with_options(max_retries=0)
+    return ResilientLLM(client)
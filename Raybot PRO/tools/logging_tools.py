@@ -1,19 +1,39 @@
+import atexit
 import logging
-import json
+import logging.handlers
+import queue
 
 LOGFILE = "raybot_pro.log"
 
-logging.basicConfig(
-    filename=LOGFILE,
-    level=logging.DEBUG,
-    format="%(asctime)s %(levelname)s: %(message)s"
-)
+_listener = None
+
+def setup_logging(filename=LOGFILE, level=logging.DEBUG):
+    """Sends root logging to the log file. Called from tools.bootstrap.init(), not on import.
+
+    Request threads only put records on a queue; a background listener
+    does the formatting and file I/O.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s: %(message)s"))
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
 
 def trace(stage, payload):
-    """Log debug traces for agent execution."""
-    try:
-        payload_summary = json.dumps(payload)[:800]
-    except Exception:
-        payload_summary = str(payload)[:800]
+    """Log debug traces for agent execution (superseded by tools.tracing.span).
 
-    logging.debug(f"TRACE stage={stage} payload={payload_summary}")
\ No newline at end of file
+    Only builds the message when DEBUG is actually enabled.
+    """
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("TRACE stage=%s payload=%.800s", stage, payload)
@@ -1,9 +1,137 @@
-# memory.py — wrapper over db.py
+# memory.py — wrapper over db.py with a read-through cache
+#
+# Values are cached per (session_id, key), missing keys included, in a
+# bounded LRU with a TTL. Writes through db.remember / remember_many
+# invalidate their keys in this process. Writes from other processes are
+# caught with PRAGMA data_version (free when nothing changed) followed by
+# a look at the memory_version counter; if it moved, the cache is dropped.
+# A cached read therefore costs no query, a miss costs one per batch.
 
-from tools.db import remember, recall
+import threading
+import time
+from collections import OrderedDict
+
+from config import MEMORY_CACHE_ENABLED, MEMORY_CACHE_ENTRIES, MEMORY_CACHE_TTL
+from tools.db import add_memory_listener, get_conn, memory_version, recall_many, remember, remember_many
+
+_MISSING = object()
+
+class MemoryCache:
+    def __init__(self, max_entries=MEMORY_CACHE_ENTRIES, ttl=MEMORY_CACHE_TTL, enabled=MEMORY_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.entries = OrderedDict()   # (session_id, key) -> (value or _MISSING, stored)
+        self.lock = threading.Lock()
+        self.local = threading.local()  # per connection: last data_version and epoch seen
+        self.version = None             # memory_version the entries are valid for
+        self.epoch = 0                  # bumped when other threads must re-check the version
+        self.writes = 0                 # bumped by every invalidation; guards racing fills
+        self.counters = {"hits": 0, "misses": 0, "queries": 0, "invalidations": 0, "flushes": 0}
+
+    def get_many(self, session_id, keys):
+        """{key: value or None} for keys, reading SQLite once for whatever is not cached."""
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled:
+            found = recall_many(session_id, keys)
+            return {k: found.get(k) for k in keys}
+
+        conn = get_conn()
+        self._check_version(conn)
+        now = time.time()
+        out, missing = {}, []
+
+        with self.lock:
+            for k in keys:
+                entry = self.entries.get((session_id, k))
+                if entry is not None and now - entry[1] < self.ttl:
+                    self.entries.move_to_end((session_id, k))
+                    out[k] = None if entry[0] is _MISSING else entry[0]
+                else:
+                    missing.append(k)
+            self.counters["hits"] += len(keys) - len(missing)
+            self.counters["misses"] += len(missing)
+            writes = self.writes
+
+        if missing:
+            found = recall_many(session_id, missing, conn)
+            with self.lock:
+                self.counters["queries"] += 1
+                store = writes == self.writes   # a write landed meanwhile: don't cache what we read
+                for k in missing:
+                    value = found.get(k)
+                    out[k] = value
+                    if store:
+                        self._put((session_id, k), _MISSING if value is None else value, now)
+        return out
+
+    def invalidate(self, session_id, keys, version=None, changed=0):
+        """Drops keys; memory listener for db writes in this process."""
+        with self.lock:
+            for k in keys:
+                self.entries.pop((session_id, k), None)
+            self.writes += 1
+            self.counters["invalidations"] += 1
+            if self.version is not None and version == self.version + changed:
+                self.version = version      # only our write happened since the last check
+            else:
+                self.version = None         # something else did too: re-check before the next hit
+                self.epoch += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.version = None
+            self.epoch += 1
+            self.writes += 1
+
+    def stats(self):
+        with self.lock:
+            out = dict(self.counters)
+            out["entries"] = len(self.entries)
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+        return out
+
+    def _check_version(self, conn):
+        # data_version only changes when another connection commits, so an
+        # unchanged value (and epoch) means nothing could have been written
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        seen = getattr(self.local, "seen", None)
+        if seen == (conn, data_version, self.epoch):
+            return
+
+        with self.lock:
+            epoch = self.epoch
+        version = memory_version(conn)
+        with self.lock:
+            if version != self.version:
+                if self.entries:
+                    self.counters["flushes"] += 1
+                self.entries.clear()
+                self.writes += 1
+                self.version = version
+        self.local.seen = (conn, data_version, epoch)
+
+    def _put(self, key, value, stored):
+        self.entries[key] = (value, stored)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+memory_cache = MemoryCache()
+add_memory_listener(memory_cache.invalidate)
 
 def memory_write(session_id, key, value):
     remember(session_id, key, value)
 
 def memory_read(session_id, key):
-    return recall(session_id, key)
\ No newline at end of file
+    return memory_cache.get_many(session_id, [key])[key]
+
+def memory_write_many(session_id, items):
+    """Writes a dict (or (key, value) pairs) in a single transaction."""
+    remember_many(session_id, items)
+
+def memory_read_many(session_id, keys):
+    """{key: value or None}; one query at most, none when every key is cached."""
+    return memory_cache.get_many(session_id, keys)
@@ -0,0 +1,269 @@
+# migrations.py — versioned schema upgrades for the Raybot PRO SQLite DB
+#
+# The schema version lives in PRAGMA user_version. Each migration runs in
+# its own IMMEDIATE transaction, so existing raybot_v2.sqlite files are
+# upgraded in place and concurrent processes never apply a step twice.
+
+def _m001_base_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            created_at TEXT
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY,
+            session_id INTEGER,
+            role TEXT,
+            content TEXT,
+            ts TEXT
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS memory (
+            id INTEGER PRIMARY KEY,
+            session_id INTEGER,
+            key TEXT,
+            value TEXT,
+            ts TEXT
+        )
+    """)
+
+def _m002_event_index(conn):
+    # get_recent_events: WHERE session_id=? ORDER BY id DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_session_id ON events (session_id, id)")
+
+def _m003_memory_upsert(conn):
+    # Older values move to memory_history; memory keeps one row per key
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS memory_history (
+            id INTEGER PRIMARY KEY,
+            session_id INTEGER,
+            key TEXT,
+            value TEXT,
+            ts TEXT
+        )
+    """)
+
+    conn.execute("""
+        INSERT INTO memory_history (session_id, key, value, ts)
+        SELECT session_id, key, value, ts FROM memory
+        WHERE id NOT IN (SELECT MAX(id) FROM memory GROUP BY session_id, key)
+        ORDER BY id
+    """)
+
+    conn.execute("""
+        DELETE FROM memory
+        WHERE id NOT IN (SELECT MAX(id) FROM memory GROUP BY session_id, key)
+    """)
+
+    # recall: WHERE session_id=? AND key=? — also the upsert conflict target
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_memory_session_key ON memory (session_id, key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_history_session_key ON memory_history (session_id, key, id)")
+
+def fts5_available(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except Exception:
+        return False
+
+def _m004_full_text_search(conn):
+    # External-content FTS5 indexes kept in sync by triggers. session_id is an
+    # indexed column so a per-session query intersects two posting lists.
+    # Builds without FTS5 skip this step; search falls back to LIKE.
+    if not fts5_available(conn):
+        return
+
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+            session_id, content, content='events', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+            INSERT INTO events_fts (rowid, session_id, content) VALUES (new.id, new.session_id, new.content);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+            INSERT INTO events_fts (events_fts, rowid, session_id, content)
+            VALUES ('delete', old.id, old.session_id, old.content);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE ON events BEGIN
+            INSERT INTO events_fts (events_fts, rowid, session_id, content)
+            VALUES ('delete', old.id, old.session_id, old.content);
+            INSERT INTO events_fts (rowid, session_id, content) VALUES (new.id, new.session_id, new.content);
+        END
+    """)
+
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+            session_id, key, value, content='memory', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS memory_fts_ai AFTER INSERT ON memory BEGIN
+            INSERT INTO memory_fts (rowid, session_id, key, value) VALUES (new.id, new.session_id, new.key, new.value);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS memory_fts_ad AFTER DELETE ON memory BEGIN
+            INSERT INTO memory_fts (memory_fts, rowid, session_id, key, value)
+            VALUES ('delete', old.id, old.session_id, old.key, old.value);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS memory_fts_au AFTER UPDATE ON memory BEGIN
+            INSERT INTO memory_fts (memory_fts, rowid, session_id, key, value)
+            VALUES ('delete', old.id, old.session_id, old.key, old.value);
+            INSERT INTO memory_fts (rowid, session_id, key, value) VALUES (new.id, new.session_id, new.key, new.value);
+        END
+    """)
+
+    # Index rows that existed before this migration
+    conn.execute("INSERT INTO events_fts (events_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO memory_fts (memory_fts) VALUES ('rebuild')")
+
+def _m005_jobs(conn):
+    # Background jobs (tools/jobs.py). heartbeat is epoch seconds so stale
+    # running jobs can be found with a plain comparison.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            kind TEXT,
+            params TEXT,
+            state TEXT,
+            progress REAL DEFAULT 0,
+            message TEXT DEFAULT '',
+            checkpoint TEXT,
+            result TEXT,
+            error TEXT,
+            worker TEXT,
+            heartbeat REAL,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, id)")
+
+def _m006_llm_cache(conn):
+    # Persistent tier of tools/llm_cache.py; times are epoch seconds
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            response TEXT,
+            size INTEGER,
+            created REAL,
+            last_used REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)")
+
+def _m007_transcripts(conn):
+    # Finished transcripts keyed by audio content hash (tools/transcriber.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS transcripts (
+            hash TEXT,
+            model TEXT,
+            text TEXT,
+            seconds REAL,
+            created REAL,
+            PRIMARY KEY (hash, model)
+        )
+    """)
+
+def _m008_memory_version(conn):
+    # Counter bumped by every change to memory, so the read cache in
+    # tools/memory.py can tell whether another process wrote since it looked
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS memory_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO memory_version (id, version) VALUES (1, 0)")
+    for op in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS memory_version_{op.lower()} AFTER {op} ON memory BEGIN
+                UPDATE memory_version SET version = version + 1 WHERE id = 1;
+            END
+        """)
+
+def _m009_pipeline_cache(conn):
+    # Memoized pipeline stage results keyed by input hash (tools/pipeline_cache.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pipeline_cache (
+            key TEXT PRIMARY KEY,
+            stage TEXT,
+            result TEXT,
+            created REAL
+        )
+    """)
+
+def _m010_transcript_language(conn):
+    # A transcript forced to one language is not the auto-detected one: key on it too
+    # ('' = auto-detect; existing rows were made that way)
+    conn.execute("""
+        CREATE TABLE transcripts_new (
+            hash TEXT,
+            model TEXT,
+            language TEXT NOT NULL DEFAULT '',
+            text TEXT,
+            seconds REAL,
+            created REAL,
+            PRIMARY KEY (hash, model, language)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO transcripts_new (hash, model, language, text, seconds, created)
+        SELECT hash, model, '', text, seconds, created FROM transcripts
+    """)
+    conn.execute("DROP TABLE transcripts")
+    conn.execute("ALTER TABLE transcripts_new RENAME TO transcripts")
+
+MIGRATIONS = [
+    _m001_base_tables,
+    _m002_event_index,
+    _m003_memory_upsert,
+    _m004_full_text_search,
+    _m005_jobs,
+    _m006_llm_cache,
+    _m007_transcripts,
+    _m008_memory_version,
+    _m009_pipeline_cache,
+    _m010_transcript_language,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn):
+    """Applies every pending migration; returns the resulting version."""
+    for version, step in enumerate(MIGRATIONS, start=1):
+        if schema_version(conn) >= version:
+            continue
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            if schema_version(conn) < version:
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return schema_version(conn)
@@ -0,0 +1,354 @@
+# news_store.py — local news archive: streaming bulk ingestion + BM25 search (SQLite FTS5)
+#
+# Articles live in their own SQLite file (NEWS_DB), apart from the session
+# DB, so a multi-million-article archive can be built, copied or dropped
+# on its own. Ingestion streams JSONL (one article per line, optionally
+# .gz) and RSS/Atom XML dumps in batched transactions; an external-content
+# FTS5 index over title + body is kept in sync by triggers. Every source
+# file is recorded with its size, mtime and read offset, so re-ingesting a
+# directory only reads new files and the appended tail of JSONL files.
+# Duplicate articles (same id/guid/url) are ignored.
+#
+#     from tools.news_store import news_store
+#     news_store.ingest(["archive/2024/", "feeds/latest.xml"])
+#     news_store.search("rocket launch", limit=10, offset=0)
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+from config import NEWS_DB, NEWS_BATCH, NEWS_SEARCH_CANDIDATES
+from tools.migrations import fts5_available
+
+# bm25 column weights: a query word in the title counts 4x one in the body
+TITLE_WEIGHT = 4.0
+BODY_WEIGHT = 1.0
+
+JSONL_EXT = (".jsonl", ".ndjson", ".jsonl.gz", ".ndjson.gz")
+XML_EXT = (".xml", ".rss", ".atom", ".xml.gz", ".rss.gz")
+
+_TERM = re.compile(r"\w+")
+_TAGS = re.compile(r"<[^>]+>")
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY,
+        uid TEXT UNIQUE,
+        title TEXT,
+        body TEXT,
+        url TEXT,
+        source TEXT,
+        published TEXT
+    )""",
+    # path -> what has been read so far (offset is only meaningful for plain JSONL)
+    """CREATE TABLE IF NOT EXISTS news_sources (
+        path TEXT PRIMARY KEY,
+        size INTEGER,
+        mtime REAL,
+        offset INTEGER,
+        articles INTEGER,
+        ingested REAL
+    )""",
+)
+
+_FTS_SCHEMA = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, body, content='articles', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END""",
+)
+
+def _first(record, *keys):
+    for k in keys:
+        v = record.get(k)
+        if v:
+            return str(v)
+    return ""
+
+def normalize(record, source=""):
+    """Maps a loosely shaped article dict onto the stored columns; None if it has no text."""
+    title = _first(record, "title", "headline").strip()
+    body = _first(record, "body", "content", "text", "description", "summary").strip()
+    if not title and not body:
+        return None
+    url = _first(record, "url", "link")
+    published = _first(record, "published", "pubDate", "pubdate", "date", "updated")
+    uid = _first(record, "id", "guid", "uid") or url
+    if not uid:
+        uid = hashlib.sha1(f"{title}\0{published}\0{body[:200]}".encode("utf-8")).hexdigest()
+    return uid, title, body, url, _first(record, "source") or source, published
+
+def _open(path):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+def read_jsonl(path, offset=0):
+    """Yields (record, end_offset) from a JSONL file; bad lines are skipped."""
+    with _open(path) as f:
+        if offset:
+            f.seek(offset)
+        pos = offset
+        for line in f:
+            pos += len(line)
+            if not line.endswith(b"\n"):
+                return  # partial last line (file still being written): read it next time
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield record, pos
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1].split(":")[-1].lower()
+
+def read_feed(path):
+    """Yields article dicts from an RSS 2.0 or Atom file without loading it whole."""
+    source, depth = "", 0
+    with _open(path) as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            tag = _local(elem.tag)
+            if event == "start":
+                depth += tag in ("item", "entry")
+                continue
+            if tag == "title" and not depth and not source and elem.text:
+                source = elem.text.strip()  # channel / feed title
+            if tag not in ("item", "entry"):
+                continue
+            depth -= 1
+            record = {"source": source}
+            for child in elem:
+                name, text = _local(child.tag), (child.text or "").strip()
+                if name == "link" and not text:
+                    text = child.get("href", "")
+                if name in ("encoded", "content") and text:
+                    name = "body"
+                if text and name not in record:
+                    record[name] = _TAGS.sub(" ", text) if name in ("body", "description", "summary") else text
+            yield record
+            elem.clear()
+
+class NewsStore:
+    def __init__(self, path=NEWS_DB, batch_size=NEWS_BATCH, candidates=NEWS_SEARCH_CANDIDATES):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.candidates = candidates   # bm25 is computed over at most this many newest matches; 0 = all
+        self.local = threading.local()
+        self.init_lock = threading.Lock()
+        self.ingest_lock = threading.Lock()
+        self.ready = False
+        self.has_fts = False
+        self.has_any = False
+
+    # ---- connections ----
+    def conn(self):
+        """This thread's connection; the first call creates the schema."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=64)
+            for pragma in ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL", "PRAGMA cache_size=-32000",
+                           "PRAGMA mmap_size=268435456", "PRAGMA temp_store=MEMORY", "PRAGMA busy_timeout=5000"):
+                conn.execute(pragma)
+            self.local.conn = conn
+        if not self.ready:
+            with self.init_lock:
+                if not self.ready:
+                    with conn:
+                        for sql in _SCHEMA:
+                            conn.execute(sql)
+                        self.has_fts = fts5_available(conn)
+                        if self.has_fts:
+                            for sql in _FTS_SCHEMA:
+                                conn.execute(sql)
+                    self.ready = True
+        return conn
+
+    def close(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    # ---- ingestion ----
+    def add_articles(self, records, source=""):
+        """Inserts article dicts in batched transactions; returns how many were new."""
+        conn = self.conn()
+        added = 0
+        batch = []
+        for record in records:
+            row = normalize(record, source)
+            if row is not None:
+                batch.append(row)
+            if len(batch) >= self.batch_size:
+                added += self._insert(conn, batch)
+                batch = []
+        if batch:
+            added += self._insert(conn, batch)
+        return added
+
+    def _insert(self, conn, rows):
+        with conn:
+            c = conn.executemany(
+                "INSERT OR IGNORE INTO articles (uid, title, body, url, source, published) VALUES (?,?,?,?,?,?)",
+                rows
+            )
+        self.has_any = self.has_any or c.rowcount > 0
+        return c.rowcount  # duplicates are ignored and not counted
+
+    def ingest_file(self, path, force=False):
+        """Ingests one file, skipping what earlier runs already read; returns new articles."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        conn = self.conn()
+        row = conn.execute("SELECT size, mtime, offset FROM news_sources WHERE path=?", (path,)).fetchone()
+        if row and not force and row[0] == st.st_size and row[1] == st.st_mtime:
+            return 0
+
+        source = os.path.basename(path).split(".")[0]
+        offset = 0
+        appendable = path.endswith((".jsonl", ".ndjson"))
+        if row and not force and appendable and st.st_size >= row[2]:
+            offset = row[2]  # append-only log: continue after the last complete line
+
+        if path.endswith(JSONL_EXT):
+            end = [offset]
+
+            def records():
+                for record, pos in read_jsonl(path, offset):
+                    end[0] = pos
+                    yield record
+
+            added = self.add_articles(records(), source)
+            offset = end[0] if appendable else 0
+        else:
+            added = self.add_articles(read_feed(path), source)
+
+        with conn:
+            conn.execute(
+                "INSERT INTO news_sources (path, size, mtime, offset, articles, ingested) VALUES (?,?,?,?,?,?) "
+                "ON CONFLICT (path) DO UPDATE SET size=excluded.size, mtime=excluded.mtime, "
+                "offset=excluded.offset, articles=articles + excluded.articles, ingested=excluded.ingested",
+                (path, st.st_size, st.st_mtime, offset, added, time.time())
+            )
+        return added
+
+    def ingest(self, paths, force=False, progress=None):
+        """Ingests files and directories (recursively; JSONL and RSS/Atom by extension).
+
+        progress(done_files, total_files, added_so_far) is called after each file.
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        files = []
+        for p in paths:
+            if os.path.isdir(p):
+                for root, _, names in os.walk(p):
+                    files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith(JSONL_EXT + XML_EXT))
+            else:
+                files.append(p)
+
+        start = time.perf_counter()
+        added, errors = 0, []
+        with self.ingest_lock:
+            for i, path in enumerate(files):
+                try:
+                    added += self.ingest_file(path, force)
+                except (OSError, ET.ParseError) as e:
+                    errors.append(f"{path}: {e}")
+                if progress:
+                    progress(i + 1, len(files), added)
+        return {"files": len(files), "added": added, "errors": errors,
+                "seconds": round(time.perf_counter() - start, 3)}
+
+    # ---- queries ----
+    def count(self):
+        return self.conn().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def has_articles(self):
+        """True once the archive holds anything; never creates the DB file just to check."""
+        if not self.has_any:
+            self.has_any = os.path.exists(self.path) and \
+                self.conn().execute("SELECT 1 FROM articles LIMIT 1").fetchone() is not None
+        return self.has_any
+
+    def latest(self, limit=10, offset=0):
+        """Most recently ingested articles, paginated like search()."""
+        limit, offset = max(1, int(limit)), max(0, int(offset))
+        rows = self.conn().execute(
+            "SELECT title, body, url, source, published FROM articles ORDER BY id DESC LIMIT ? OFFSET ?",
+            (limit + 1, offset)
+        ).fetchall()
+        return {"query": "", "offset": offset, "limit": limit, "has_more": len(rows) > limit, "truncated": False,
+                "results": [{"title": t, "body": b, "url": u, "source": s, "published": p}
+                            for t, b, u, s, p in rows[:limit]]}
+
+    def search(self, query, limit=10, offset=0, any_term=False):
+        """BM25-ranked articles for query (title weighted over body), one page at a time.
+
+        Returns {"results": [...], "offset", "limit", "has_more", "truncated"}.
+        Results carry title, body, url, source, published and score (lower is
+        better). Only the newest `candidates` matches are ranked: when a query
+        matches more, older articles are left out and truncated is True.
+        """
+        limit, offset = max(1, int(limit)), max(0, int(offset))
+        page = {"query": query, "results": [], "offset": offset, "limit": limit, "has_more": False,
+                "truncated": False}
+        terms = _TERM.findall(query or "")
+        if not terms:
+            return page
+
+        conn = self.conn()
+        if self.has_fts:
+            expr = (" OR " if any_term else " AND ").join(f'"{t}"' for t in terms)
+            # Like db.search_events: bm25 is computed over the newest `candidates`
+            # matches only, so very common words stay cheap on huge archives
+            # (ranking all 300k matches of a common word takes ~0.6 s)
+            cap = f"ORDER BY rowid DESC LIMIT {int(self.candidates)}" if self.candidates else ""
+            if cap:
+                page["truncated"] = conn.execute(
+                    "SELECT 1 FROM articles_fts WHERE articles_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+                    (expr, int(self.candidates))
+                ).fetchone() is not None
+            rows = conn.execute(
+                "SELECT a.title, a.body, a.url, a.source, a.published, hits.score FROM ("
+                f"    SELECT rowid, bm25(articles_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score"
+                f"    FROM articles_fts WHERE articles_fts MATCH ? {cap}"
+                ") AS hits JOIN articles a ON a.id = hits.rowid "
+                "ORDER BY hits.score LIMIT ? OFFSET ?",
+                (expr, limit + 1, offset)
+            ).fetchall()
+        else:
+            joiner = " OR " if any_term else " AND "
+            where = joiner.join(["(title LIKE ? OR body LIKE ?)"] * len(terms))
+            params = [p for t in terms for p in (f"%{t}%", f"%{t}%")]
+            rows = conn.execute(
+                f"SELECT title, body, url, source, published, 0.0 FROM articles WHERE {where} "
+                "ORDER BY id DESC LIMIT ? OFFSET ?",
+                (*params, limit + 1, offset)
+            ).fetchall()
+
+        page["has_more"] = len(rows) > limit
+        page["results"] = [
+            {"title": t, "body": b, "url": u, "source": s, "published": p, "score": round(score, 4)}
+            for t, b, u, s, p, score in rows[:limit]
+        ]
+        return page
+
+    def stats(self):
+        conn = self.conn()
+        files, read = conn.execute("SELECT COUNT(*), COALESCE(SUM(articles), 0) FROM news_sources").fetchone()
+        return {"path": self.path, "articles": self.count(), "files": files, "ingested": read,
+                "fts": self.has_fts, "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0}
+
+news_store = NewsStore()
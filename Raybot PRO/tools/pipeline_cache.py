@@ -0,0 +1,89 @@
+# pipeline_cache.py — memoized results of agent pipeline stages
+#
+# agents/pipeline.py keys every stage on a hash of its agent, task and the
+# keys of the stages it depends on (file inputs are hashed by content), so
+# a stage's key is known before anything upstream runs. Results are stored
+# as JSON in the pipeline_cache table and expire after a TTL (expired rows
+# are deleted every EVICT_EVERY writes); results that do not serialize, and
+# error results, are not stored.
+
+import hashlib
+import json
+import threading
+import time
+
+from config import PIPELINE_CACHE_ENABLED, PIPELINE_CACHE_TTL
+from tools.db import get_conn
+
+# Expired rows are deleted every N writes
+EVICT_EVERY = 64
+
+def make_key(*parts):
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def file_fingerprint(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(block), b""):
+            h.update(data)
+    return "sha256:" + h.hexdigest()
+
+class PipelineCache:
+    def __init__(self, ttl=PIPELINE_CACHE_TTL, enabled=PIPELINE_CACHE_ENABLED):
+        self.ttl = ttl
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+        self._writes = 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        row = get_conn().execute(
+            "SELECT result FROM pipeline_cache WHERE key=? AND created > ?",
+            (key, time.time() - self.ttl)
+        ).fetchone()
+        with self.lock:
+            self.counters["hits" if row else "misses"] += 1
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, stage, result):
+        if not self.enabled or not isinstance(result, dict) or "error" in result:
+            return
+        try:
+            payload = json.dumps(result)
+        except (TypeError, ValueError):
+            return
+        conn = get_conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pipeline_cache (key, stage, result, created) VALUES (?,?,?,?)",
+                (key, stage, payload, time.time())
+            )
+        with self.lock:
+            self.counters["puts"] += 1
+            self._writes += 1
+            evict = self._writes % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drops expired rows; returns how many."""
+        conn = get_conn()
+        with conn:
+            removed = conn.execute("DELETE FROM pipeline_cache WHERE created <= ?", (time.time() - self.ttl,)).rowcount
+        with self.lock:
+            self.counters["evictions"] += removed
+        return removed
+
+    def clear(self):
+        conn = get_conn()
+        with conn:
+            conn.execute("DELETE FROM pipeline_cache")
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
+
+pipeline_cache = PipelineCache()
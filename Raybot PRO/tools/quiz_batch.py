@@ -0,0 +1,155 @@
+# quiz_batch.py — quiz generation over whole document corpora
+#
+# Documents come from a directory (walked recursively for .txt / .md), a
+# list of files, or a list of texts. Each is segmented once and only
+# sentences long enough to blank out are kept before drawing. Every
+# document gets its own RNG seeded from (seed, document id), so results
+# are the same on every run regardless of process count or chunking.
+# Chunks of documents are spread over a process pool and results come
+# back in input order, ready to stream to a JSONL file.
+#
+#     from tools.quiz_batch import quiz_corpus
+#     quiz_corpus("course/", "course_quiz.jsonl", n=5, seed=7, processes=4)
+
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+
+from tools.summarizer_engine import QUIZ_MIN_WORDS, quiz_from_sentences, quiz_sentences
+
+DOC_EXT = (".txt", ".md")
+CHUNK_DOCS = 128   # documents per worker task
+
+def _looks_like_path(item):
+    # A one-line .txt/.md name or absolute path in a list is a file, never document text
+    if isinstance(item, os.PathLike):
+        return True
+    return isinstance(item, str) and "\n" not in item and (item.lower().endswith(DOC_EXT) or os.path.isabs(item))
+
+def iter_documents(source):
+    """Iterator of (doc_id, text, path); exactly one of text / path is set.
+
+    source: a directory, a file path, or an iterable of texts, paths or (doc_id, text) pairs.
+    A source path that does not exist raises FileNotFoundError at once; a
+    missing file in a list becomes an error record in the results.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"No such file or directory: '{source}'")
+        source = [source]
+    return _iter_documents(source)
+
+def _iter_documents(source):
+    for i, item in enumerate(source):
+        if isinstance(item, tuple):
+            yield str(item[0]), item[1], None
+        elif isinstance(item, (str, os.PathLike)) and os.path.isdir(item):
+            for root, dirs, names in os.walk(item):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.endswith(DOC_EXT):
+                        path = os.path.join(root, name)
+                        yield os.path.relpath(path, item), None, path
+        elif (isinstance(item, (str, os.PathLike)) and os.path.isfile(item)) or _looks_like_path(item):
+            yield os.path.basename(item), None, str(item)
+        else:
+            yield str(i), item, None
+
+def _doc_rng(seed, doc_id):
+    # str seeds hash deterministically (unlike hash()), in every process
+    return random.Random(f"{seed}:{doc_id}")
+
+def _quiz_chunk(docs, n, seed):
+    """Worker task: [(doc_id, text, path)] -> [{"id", "quiz"}]."""
+    out = []
+    for doc_id, text, path in docs:
+        record = {"id": doc_id}
+        try:
+            if path is not None:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+            record["quiz"] = quiz_from_sentences(quiz_sentences(text), n, _doc_rng(seed, doc_id))
+        except OSError as e:
+            record["quiz"], record["error"] = [], str(e)
+        out.append(record)
+    return out
+
+def _chunks(docs, size):
+    chunk = []
+    for doc in docs:
+        chunk.append(doc)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def generate_quizzes(source, n=5, seed=0, processes=None, chunk_docs=CHUNK_DOCS):
+    """Iterator of {"id", "quiz"} per document, in input order.
+
+    processes > 1 spreads chunks of chunk_docs documents over a process
+    pool; at most 2 * processes chunks are in flight at a time. A missing
+    source path raises FileNotFoundError here, before anything runs.
+    """
+    chunks = _chunks(iter_documents(source), max(1, int(chunk_docs)))
+    return _generate(chunks, n, seed, processes)
+
+def _generate(chunks, n, seed, processes):
+    if processes and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(pool.submit(_quiz_chunk, chunk, n, seed))
+                while len(in_flight) >= 2 * processes:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+    else:
+        for chunk in chunks:
+            yield from _quiz_chunk(chunk, n, seed)
+
+def quiz_stream(chunks, n=5, seed=0):
+    """Quiz over text that arrives in pieces (e.g. a live transcript), in constant memory.
+
+    Eligible sentences are reservoir-sampled as they come, so questions are
+    drawn from the whole text without holding it.
+    """
+    from tools.stream_summarizer import iter_sentences
+
+    rng = _doc_rng(seed, "stream")
+    reservoir, seen = [], 0
+    for sentence in iter_sentences(chunks):
+        words = sentence.split()
+        if len(words) < QUIZ_MIN_WORDS:
+            continue
+        seen += 1
+        if len(reservoir) < n:
+            reservoir.append(words)
+        else:
+            j = rng.randrange(seen)
+            if j < n:
+                reservoir[j] = words
+    return quiz_from_sentences(reservoir, n, rng)
+
+def quiz_corpus(source, out_path, n=5, seed=0, processes=None, chunk_docs=CHUNK_DOCS):
+    """Streams generate_quizzes() to a JSONL file (one document per line); returns run stats."""
+    start = time.perf_counter()
+    docs = questions = errors = 0
+    records = generate_quizzes(source, n, seed, processes, chunk_docs)   # raises before out_path is truncated
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            docs += 1
+            questions += len(record["quiz"])
+            errors += "error" in record
+
+    seconds = time.perf_counter() - start
+    cores = processes if processes and processes > 1 else 1
+    rate = docs / seconds if seconds else 0.0
+    return {"out": out_path, "documents": docs, "questions": questions, "errors": errors,
+            "seconds": round(seconds, 3), "processes": cores,
+            "docs_per_sec": round(rate, 1), "docs_per_sec_per_core": round(rate / cores, 1)}
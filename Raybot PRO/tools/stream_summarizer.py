@@ -0,0 +1,197 @@
+# stream_summarizer.py — constant-memory extractive summaries of huge inputs
+#
+# Input arrives as a file path or any iterator of text chunks (e.g. a long
+# Whisper transcript); a string is always a path, never text. Sentences are cut across chunk boundaries, grouped
+# into blocks and "mapped" block by block: each block yields its term
+# counts and its best local sentences. The reducer keeps a bounded
+# frequency table plus a bounded candidate pool and rescores the pool
+# against the final frequencies, so memory does not grow with the input.
+# Run as a job, the reducer state is checkpointed between blocks and a
+# resumed job skips the blocks it already reduced.
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, deque
+
+from tools.summarizer_engine import _SENT_SPLIT, _WORD, stopwords, extractive_summary
+
+CHUNK_CHARS = 1 << 16         # bytes read per step from a file
+BLOCK_SENTENCES = 2000        # sentences per map task
+MAX_SENTENCE_CHARS = 10_000   # a run-on "sentence" is cut here
+MAX_TERMS = 50_000            # running frequency table bound
+CANDIDATES = 64               # sentences kept for final rescoring
+FAN_IN = 16                   # summaries merged per hierarchical reduce step
+
+def _read_chunks(source, chunk_chars=CHUNK_CHARS):
+    if isinstance(source, (str, os.PathLike)):
+        # A missing file raises FileNotFoundError instead of being summarized as text
+        with open(source, "r", encoding="utf-8", errors="replace") as f:
+            while True:
+                chunk = f.read(chunk_chars)
+                if not chunk:
+                    return
+                yield chunk
+    else:
+        yield from source
+
+def iter_sentences(source, chunk_chars=CHUNK_CHARS):
+    """Yields stripped sentences, joining pieces that straddle chunk boundaries."""
+    carry = ""
+    for chunk in _read_chunks(source, chunk_chars):
+        pieces = _SENT_SPLIT.split(carry + chunk)
+        carry = pieces.pop()
+        for s in pieces:
+            s = s.strip()
+            if s:
+                yield s
+        while len(carry) > MAX_SENTENCE_CHARS:
+            yield carry[:MAX_SENTENCE_CHARS].strip()
+            carry = carry[MAX_SENTENCE_CHARS:]
+
+    carry = carry.strip()
+    if carry:
+        yield carry
+
+def _iter_blocks(sentences, block_sentences):
+    block, start = [], 0
+    for s in sentences:
+        block.append(s)
+        if len(block) >= block_sentences:
+            yield start, block
+            start += len(block)
+            block = []
+    if block:
+        yield start, block
+
+def _terms(sentence):
+    return Counter(w for w in _WORD.findall(sentence.lower()) if w not in stopwords)
+
+def _map_block(start, sentences, candidates, max_sentences):
+    """Map step (runs in a worker process when a pool is used)."""
+    terms = [_terms(s) for s in sentences]
+    counts = Counter()
+    for t in terms:
+        counts.update(t)
+
+    scored = ((sum(counts[w] * c for w, c in t.items()), start + i) for i, t in enumerate(terms))
+    best = heapq.nsmallest(candidates, scored, key=lambda x: (-x[0], x[1]))
+    picked = [(idx, sentences[idx - start], dict(terms[idx - start])) for _, idx in best]
+
+    local = sorted(best, key=lambda x: (-x[0], x[1]))[:max_sentences]
+    summary = " ".join(sentences[idx - start] for idx in sorted(idx for _, idx in local))
+    return dict(counts), picked, summary, len(sentences)
+
+class _Reducer:
+    def __init__(self, max_sentences, candidates, max_terms, hierarchical, fan_in):
+        self.max_sentences = max_sentences
+        self.candidates = candidates
+        self.max_terms = max_terms
+        self.hierarchical = hierarchical
+        self.fan_in = fan_in
+        self.freq = Counter()
+        self.pool = []       # (index, sentence, terms)
+        self.levels = []     # hierarchical: pending summaries per level
+        self.total = 0
+
+    def add(self, result):
+        counts, picked, summary, n = result
+        self.total += n
+        self.freq.update(counts)
+        if len(self.freq) > 2 * self.max_terms:
+            self.freq = Counter(dict(self.freq.most_common(self.max_terms)))
+
+        self.pool = self._best(self.pool + picked, self.candidates)
+
+        if self.hierarchical:
+            self._push(0, summary)
+
+    def state(self):
+        """JSON-serializable reducer state (for job checkpoints)."""
+        return {"freq": dict(self.freq), "pool": [list(p) for p in self.pool],
+                "levels": self.levels, "total": self.total}
+
+    def restore(self, state):
+        self.freq = Counter(state["freq"])
+        self.pool = [tuple(p) for p in state["pool"]]
+        self.levels = state["levels"]
+        self.total = state["total"]
+
+    def _score(self, terms):
+        return sum(self.freq.get(w, 0) * c for w, c in terms.items())
+
+    def _best(self, pool, k):
+        return heapq.nsmallest(k, pool, key=lambda p: (-self._score(p[2]), p[0]))
+
+    def _push(self, level, summary):
+        if level == len(self.levels):
+            self.levels.append([])
+        self.levels[level].append(summary)
+        if len(self.levels[level]) >= self.fan_in:
+            merged = extractive_summary(" ".join(self.levels[level]), self.max_sentences)
+            self.levels[level] = []
+            self._push(level + 1, merged)
+
+    def result(self):
+        if self.hierarchical:
+            pending = [s for level in self.levels for s in level]
+            return extractive_summary(" ".join(pending), self.max_sentences)
+
+        best = self._best(self.pool, self.max_sentences)
+        return " ".join(s for _, s, _ in sorted(best))
+
+def _counted(chunks, read):
+    for chunk in chunks:
+        read[0] += len(chunk)
+        yield chunk
+
+def summarize_stream(source, max_sentences=3, processes=None, hierarchical=False,
+                     block_sentences=BLOCK_SENTENCES, candidates=CANDIDATES,
+                     max_terms=MAX_TERMS, fan_in=FAN_IN, chunk_chars=CHUNK_CHARS, job=None):
+    """Streaming extractive summary of a file path or an iterator of text chunks.
+
+    Peak memory is bounded by block_sentences, candidates and max_terms, not
+    by the input size. processes > 1 spreads the map step over a process pool.
+    hierarchical=True reduces per-block summaries in a tree (fan_in wide)
+    instead of rescoring a global candidate pool. job (a tools.jobs.JobContext)
+    gets a report after every block, which is where pause and cancel take
+    effect, and a resumed job continues from its checkpointed reducer state.
+    """
+    max_sentences = int(max_sentences)
+    candidates = max(candidates, max_sentences)
+    reducer = _Reducer(max_sentences, candidates, max_terms, hierarchical, fan_in)
+    if job is not None and job.checkpoint.get("reducer"):
+        reducer.restore(job.checkpoint["reducer"])
+    done = reducer.total
+
+    size = os.path.getsize(source) if isinstance(source, (str, os.PathLike)) else 0
+    read = [0]
+    chunks = _counted(_read_chunks(source, chunk_chars), read)
+    # Blocks are cut the same way on every run, so those already reduced are skipped unmapped
+    blocks = ((start, block) for start, block in _iter_blocks(iter_sentences(chunks, chunk_chars), block_sentences)
+              if start >= done)
+
+    def reduce(result):
+        reducer.add(result)
+        if job is not None:
+            progress = min(0.99, read[0] / size) if size else 0.0
+            checkpoint = {"reducer": reducer.state()} if job.due() else None
+            job.report(progress, f"{reducer.total} sentences", checkpoint)
+
+    if processes and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            in_flight = deque()
+            for start, block in blocks:
+                in_flight.append(pool.submit(_map_block, start, block, candidates, max_sentences))
+                # Bound queued blocks so memory stays flat while workers catch up
+                while len(in_flight) >= 2 * processes:
+                    reduce(in_flight.popleft().result())
+            while in_flight:
+                reduce(in_flight.popleft().result())
+    else:
+        for start, block in blocks:
+            reduce(_map_block(start, block, candidates, max_sentences))
+
+    if reducer.total == 0:
+        return ""
+    return reducer.result()
@@ -1,50 +1,37 @@
-import tempfile
 import logging
 
-# Whisper load
-try:
-    import whisper
-    WHISPER = whisper
-except Exception:
-    WHISPER = None
+from tools.jobs import JobCancelled
+from tools.whisper_models import registry
+from tools.transcriber import service
+from tools.tts_cache import tts_cache
+from tools.tracing import Timer, traced
 
-# gTTS load
-try:
-    from gtts import gTTS
-    GTTS = gTTS
-except Exception:
-    GTTS = None
+def transcribe_audio(path, model=None, job=None):
+    """Speech-to-text using Whisper (config.WHISPER_MODEL unless a model size is given)."""
+    return "".join(transcribe_stream(path, model, job))
 
-_whisper_model = None
+def transcribe_stream(path, model=None, job=None):
+    """Yields the transcript piece by piece while long audio is still being processed.
 
-if WHISPER is not None:
-    try:
-        _whisper_model = WHISPER.load_model("tiny")
-    except Exception as e:
-        logging.error(f"Whisper load failed: {e}")
-
-def transcribe_audio(path):
-    """Speech-to-text using Whisper."""
-    if _whisper_model is None:
-        return "(Whisper unavailable)"
+    job: the tools.jobs.JobContext of a background job, checkpointed per chunk.
+    """
+    if not registry.available():
+        yield "(Whisper unavailable)"
+        return
 
+    timer = Timer("stt.transcribe")
     try:
-        result = _whisper_model.transcribe(path)
-        return result.get("text", "")
+        yield from service.stream(path, model, job=job)
+        timer.stop()
+    except JobCancelled:
+        timer.stop()
+        raise
     except Exception as e:
+        timer.stop(error=True)
         logging.error(f"Transcription error: {e}")
-        return "(transcription failed)"
+        yield "(transcription failed)"
 
-def tts_save(text):
-    """Text-to-speech using gTTS."""
-    if GTTS is None:
-        return None
-
-    try:
-        t = GTTS(text)
-        temp_path = tempfile.mktemp(".mp3")
-        t.save(temp_path)
-        return temp_path
-    except Exception as e:
-        logging.error(f"TTS error: {e}")
-        return None
\ No newline at end of file
+@traced("tts.save")
+def tts_save(text, voice=None):
+    """Text-to-speech through the audio cache; returns a file path or None."""
+    return tts_cache.get(text, voice)
@@ -1,5 +1,24 @@
 import re
+import heapq
+import itertools
 import random
+from collections import defaultdict
+
+# NumPy (optional — pure-Python scoring is used without it). Imported on the
+# first batch big enough to need it, so importing this module stays cheap.
+np = None
+_np_checked = False
+
+def _numpy():
+    global np, _np_checked
+    if not _np_checked:
+        try:
+            import numpy
+            np = numpy
+        except Exception:
+            np = None
+        _np_checked = True
+    return np
 
 stopwords = set(["the","and","is","in","to","of","a","it","for","on","with","as","are","was","were","be","by","this","an"])
 
@@ -19,48 +38,130 @@ SAMPLE_NEWS = [
     }
 ]
 
-def extractive_summary(text, max_sentences=3):
-    """Simple keyword-based extractive summarizer."""
-    text = (text or "").strip()
-    if not text:
-        return ""
+_SENT_SPLIT = re.compile(r"(?<=[.!?]) +")
+_WORD = re.compile(r"\w+")
 
-    sentences = [s.strip() for s in re.split(r"(?<=[.!?]) +", text) if s.strip()]
-    if len(sentences) <= max_sentences:
-        return text
+# Stopwords take the first vocabulary ids, so "is a stopword" is just id < _N_STOP
+_STOPWORDS = sorted(stopwords)
+_N_STOP = len(_STOPWORDS)
 
-    words = re.findall(r"\w+", text.lower())
-    freq = {}
+# Below this many tokens NumPy's call overhead outweighs the vectorized scoring
+_NUMPY_MIN_TOKENS = 2000
 
-    for w in words:
-        if w not in stopwords:
-            freq[w] = freq.get(w, 0) + 1
+def _new_vocab():
+    vocab = defaultdict(itertools.count(_N_STOP).__next__)
+    vocab.update((w, i) for i, w in enumerate(_STOPWORDS))
+    return vocab
 
-    score_map = {}
+def _segment(text):
+    return [s.strip() for s in _SENT_SPLIT.split(text) if s.strip()]
+
+def _tokenize(sentences, vocab, cols, lengths):
+    """Single pass: appends term ids to cols and one token count per sentence to lengths."""
+    lookup = vocab.__getitem__
     for s in sentences:
-        score = sum(freq.get(w.lower(), 0) for w in re.findall(r"\w+", s))
-        score_map[s] = score
+        ids = list(map(lookup, _WORD.findall(s.lower())))
+        cols.extend(ids)
+        lengths.append(len(ids))
 
-    best = sorted(score_map, key=score_map.get, reverse=True)[:max_sentences]
-    return " ".join(best)
+def _score_python(cols, lengths):
+    freq = {}
+    for j in cols:
+        if j >= _N_STOP:
+            freq[j] = freq.get(j, 0) + 1
+
+    scores, pos = [], 0
+    for n in lengths:
+        scores.append(sum(freq.get(j, 0) for j in cols[pos:pos + n]))
+        pos += n
+    return scores
+
+def _top_in_order(scores, k):
+    """Indices of the k best sentences (ties -> earlier first), returned in document order."""
+    if np is not None and isinstance(scores, np.ndarray):
+        best = np.lexsort((np.arange(len(scores)), -scores))[:k]
+        return np.sort(best).tolist()
+
+    best = heapq.nsmallest(k, range(len(scores)), key=lambda i: (-scores[i], i))
+    return sorted(best)
+
+def _score_batch_numpy(docs, cols, lengths, vocab_size):
+    """Scores every sentence of every doc with one sparse (doc, term) count."""
+    cols = np.asarray(cols, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    sent_of_tok = np.repeat(np.arange(len(lengths)), lengths)
+
+    sents_per_doc = np.asarray([len(sentences) for sentences, _ in docs], dtype=np.int64)
+    doc_of_sent = np.repeat(np.arange(len(docs)), sents_per_doc)
+
+    keys = doc_of_sent[sent_of_tok] * vocab_size + cols
+    uniq, inv = np.unique(keys, return_inverse=True)
+    freq = np.bincount(inv).astype(np.float64)
+    freq[(uniq % vocab_size) < _N_STOP] = 0
+
+    scores = np.bincount(sent_of_tok, weights=freq[inv], minlength=len(lengths))
+    bounds = np.concatenate(([0], np.cumsum(sents_per_doc)))
+    return [scores[bounds[i]:bounds[i + 1]] for i in range(len(docs))]
+
+def summarize_many(texts, max_sentences=3):
+    """Summarizes a batch of texts with one shared vocabulary and one scoring pass."""
+    max_sentences = int(max_sentences)
+    results = []
+    docs = []            # (sentences, result slot) for texts that need scoring
+    vocab = _new_vocab()
+    cols, lengths = [], []
+    doc_spans = []
+
+    for text in texts:
+        text = (text or "").strip()
+        sentences = _segment(text) if text else []
+        if len(sentences) <= max_sentences:
+            results.append(text)
+            continue
 
-def heuristic_quiz(text, n=5):
-    """Generates simple quiz questions from text."""
-    sents = [s.strip() for s in re.split(r"(?<=[.!?]) +", text) if s.strip()]
-    if not sents:
-        return ["Cannot generate quiz — empty text"]
+        start = len(cols)
+        _tokenize(sentences, vocab, cols, lengths)
+        docs.append((sentences, len(results)))
+        doc_spans.append((start, len(cols)))
+        results.append(None)
 
-    questions = []
+    if not docs:
+        return results
 
-    for s in random.sample(sents, min(n, len(sents))):
-        words = s.split()
-        if len(words) < 4:
-            continue
+    if len(cols) >= _NUMPY_MIN_TOKENS and _numpy() is not None:
+        all_scores = _score_batch_numpy(docs, cols, lengths, len(vocab))
+    else:
+        all_scores, sent_pos = [], 0
+        for (sentences, _), (lo, hi) in zip(docs, doc_spans):
+            all_scores.append(_score_python(cols[lo:hi], lengths[sent_pos:sent_pos + len(sentences)]))
+            sent_pos += len(sentences)
+
+    for (sentences, slot), scores in zip(docs, all_scores):
+        best = _top_in_order(scores, max_sentences)
+        results[slot] = " ".join(sentences[i] for i in best)
+
+    return results
 
-        blank_index = random.randint(1, len(words) - 2)
+def extractive_summary(text, max_sentences=3):
+    """Simple keyword-based extractive summarizer."""
+    return summarize_many([text], max_sentences)[0]
+
+# A sentence needs this many words to blank one out of its middle
+QUIZ_MIN_WORDS = 4
+
+def quiz_sentences(text):
+    """Segments text once and keeps only the sentences a question can be made from (as word lists)."""
+    words = (s.split() for s in _segment(text or ""))
+    return [w for w in words if len(w) >= QUIZ_MIN_WORDS]
+
+def quiz_from_sentences(sentences, n, rng):
+    """Up to n fill-in-the-blank questions from pre-filtered word lists, drawn with rng."""
+    questions = []
+
+    for words in rng.sample(sentences, min(int(n), len(sentences))):
+        blank_index = rng.randint(1, len(words) - 2)
         answer = words[blank_index]
-        words[blank_index] = "_____"
-        q = " ".join(words)
+        q = " ".join(words[:blank_index] + ["_____"] + words[blank_index + 1:])
 
         questions.append({
             "question": q,
@@ -69,8 +170,15 @@ def heuristic_quiz(text, n=5):
 
     return questions
 
+def heuristic_quiz(text, n=5, seed=None):
+    """Generates simple quiz questions from text; a seed makes the draw reproducible."""
+    if not (text or "").strip():
+        return ["Cannot generate quiz — empty text"]
+
+    return quiz_from_sentences(quiz_sentences(text), n, random.Random(seed))
+
 def news_fetch(query):
-    """Offline + Optional online news."""
+    """Offline sample news; agents/news_agent.py uses the local archive when it has articles."""
     if not query:
         return SAMPLE_NEWS
 
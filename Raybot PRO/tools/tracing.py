@@ -0,0 +1,266 @@
+# tracing.py — spans, latency histograms and metrics export
+#
+#     with span("agent.chat", session=3):
+#         ...
+#
+# Every finished span adds its duration to a fixed-bucket histogram named
+# after it (a few microseconds, no I/O), so p50/p99 per agent and per stage
+# are always available from snapshot(). Sampled requests additionally log
+# their whole span tree to the "raybot.trace" logger. Pair that logger with
+# the queue handler from tools.logging_tools so file I/O never happens on
+# the request thread. Metrics can be written to a JSON file periodically or
+# served on a local HTTP port.
+
+import bisect
+import contextvars
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import TRACE_ENABLED, TRACE_SAMPLE, METRICS_FILE, METRICS_PORT, METRICS_INTERVAL
+
+log = logging.getLogger("raybot.trace")
+
+# Bucket upper bounds in seconds: 10 us .. ~170 s, 25% apart (~1.1% median error)
+BOUNDS = [1e-5 * 1.25 ** i for i in range(75)]
+
+enabled = TRACE_ENABLED
+sample_rate = TRACE_SAMPLE
+
+_current = contextvars.ContextVar("raybot_span", default=None)
+_ids = itertools.count(1)
+
+def configure(enable=None, sample=None):
+    """Turns tracing on/off and sets the share of requests whose spans are logged."""
+    global enabled, sample_rate
+    if enable is not None:
+        enabled = bool(enable)
+    if sample is not None:
+        sample_rate = max(0.0, min(1.0, float(sample)))
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds, error=False):
+        self.counts[bisect.bisect_left(BOUNDS, seconds)] += 1
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(BOUNDS[i] if i < len(BOUNDS) else self.max, self.max)
+        return self.max
+
+    def summary(self):
+        ms = lambda s: round(s * 1000, 3)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": ms(self.total / self.count) if self.count else 0.0,
+            "p50_ms": ms(self.percentile(0.50)),
+            "p90_ms": ms(self.percentile(0.90)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "max_ms": ms(self.max),
+        }
+
+class Metrics:
+    """Histograms by name plus free-form counters."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, name, seconds, error=False):
+        with self.lock:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = Histogram()
+            h.add(seconds, error)
+
+    def incr(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self, prefix=""):
+        with self.lock:
+            return {
+                "uptime_s": round(time.time() - self.started, 1),
+                "latency": {k: h.summary() for k, h in sorted(self.histograms.items()) if k.startswith(prefix)},
+                "counters": {k: v for k, v in sorted(self.counters.items()) if k.startswith(prefix)},
+            }
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+metrics = Metrics()
+
+def record(name, seconds, error=False):
+    """Adds an externally measured duration (e.g. queue wait) while tracing is on."""
+    if enabled:
+        metrics.record(name, seconds, error)
+
+class span:
+    """Context manager timing a stage; nests through contextvars (threads and asyncio safe)."""
+
+    __slots__ = ("name", "attrs", "start", "parent", "token", "sampled", "children", "id")
+
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        if not enabled:
+            self.token = None
+            return self
+        self.parent = _current.get()
+        self.sampled = self.parent.sampled if self.parent is not None else random.random() < sample_rate
+        self.children = [] if self.sampled else None
+        self.id = next(_ids) if self.sampled else 0
+        self.token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.token is None:
+            return False
+        elapsed = time.perf_counter() - self.start
+        _current.reset(self.token)
+        metrics.record(self.name, elapsed, exc_type is not None)
+        if self.sampled:
+            node = (self.name, elapsed, exc_type.__name__ if exc_type else None, self.attrs, self.children)
+            if self.parent is not None:
+                self.parent.children.append(node)
+            else:
+                _log_tree(self.id, node)
+        return False
+
+def traced(name):
+    """Decorator form of span(name)."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+class Timer:
+    """Span-less timing for work that outlives the caller's frame (generators, streams)."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+
+    def stop(self, error=False):
+        if enabled and self.start is not None:
+            metrics.record(self.name, time.perf_counter() - self.start, error)
+            self.start = None
+
+def _log_tree(trace_id, node):
+    if not log.isEnabledFor(logging.INFO):
+        return
+    lines = []
+
+    def walk(n, depth):
+        name, elapsed, error, attrs, children = n
+        extra = " ".join(f"{k}={v}" for k, v in attrs.items())
+        lines.append(f"{'  ' * depth}{name} {elapsed * 1000:.3f}ms{' ERROR=' + error if error else ''}"
+                     f"{' ' + extra if extra else ''}")
+        for c in children:
+            walk(c, depth + 1)
+
+    walk(node, 0)
+    log.info(f"trace {trace_id}\n" + "\n".join(lines))
+
+def snapshot(prefix=""):
+    """p50/p90/p99/max latency and error counts per span name."""
+    return metrics.snapshot(prefix)
+
+# ---- export ----
+def export_metrics(path=METRICS_FILE):
+    """Writes snapshot() as JSON (atomically) to path."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+def start_exporter(path=METRICS_FILE, interval=METRICS_INTERVAL):
+    """Background thread writing the metrics file every interval seconds."""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                export_metrics(path)
+            except Exception as e:
+                log.warning(f"metrics export failed: {e}")
+
+    t = threading.Thread(target=run, name="raybot-metrics", daemon=True)
+    t.start()
+    return t
+
+def _text_format(snap):
+    # Prometheus-style text for quick curl / scraping
+    out = []
+    for name, s in snap["latency"].items():
+        label = name.replace('"', "")
+        for q in ("p50", "p90", "p99"):
+            out.append(f'raybot_latency_ms{{span="{label}",quantile="{q}"}} {s[q + "_ms"]}')
+        out.append(f'raybot_calls_total{{span="{label}"}} {s["count"]}')
+        out.append(f'raybot_errors_total{{span="{label}"}} {s["errors"]}')
+    for name, v in snap["counters"].items():
+        out.append(f'raybot_counter{{name="{name}"}} {v}')
+    return "\n".join(out) + "\n"
+
+def serve_metrics(port=METRICS_PORT, host="127.0.0.1"):
+    """Serves GET /metrics (JSON) and /metrics.txt (text) locally; returns the server."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith("/metrics.txt"):
+                body, kind = _text_format(snapshot()).encode(), "text/plain; version=0.0.4"
+            elif self.path.startswith("/metrics"):
+                body, kind = json.dumps(snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", kind)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="raybot-metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,287 @@
+# transcriber.py — parallel, streaming transcription of long audio
+#
+# Audio is decoded once, cut into overlapping chunks and the chunks are
+# transcribed by a pool of worker processes, each holding its own Whisper
+# model (CPU-bound work does not scale on threads). Partial transcripts are
+# yielded in order as soon as the chunks before them are done. Files are
+# keyed by a SHA-256 of their content (plus model and language): a finished
+# transcript is reused from the `transcripts` table, and identical uploads
+# in flight share one run. A model's pool has at most as many processes as
+# copies of that model fit in the Whisper memory budget. Run inside a job,
+# chunks are submitted a few at a time, the job is checkpointed per chunk
+# (pause and cancel take effect there) and a resumed job skips the chunks
+# it already transcribed.
+
+import hashlib
+import itertools
+import logging
+import re
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from config import (
+    WHISPER_MODEL, WHISPER_MEMORY_MB, TRANSCRIBE_WORKERS, TRANSCRIBE_CHUNK_SECONDS, TRANSCRIBE_OVERLAP_SECONDS,
+)
+from tools.db import get_conn
+from tools.whisper_models import APPROX_MB
+
+SAMPLE_RATE = 16000
+
+# Words compared when removing text repeated in two overlapping chunks
+MAX_OVERLAP_WORDS = 12
+
+_WORD = re.compile(r"\w+")
+
+def file_hash(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(block), b""):
+            h.update(data)
+    return h.hexdigest()
+
+def load_audio(path):
+    """Mono float32 samples at 16 kHz (whisper/ffmpeg, or plain PCM WAV without ffmpeg)."""
+    try:
+        import whisper
+        return whisper.load_audio(path)
+    except Exception as e:
+        if not str(path).lower().endswith(".wav"):
+            raise
+        logging.info(f"ffmpeg decode failed ({e}); reading WAV directly")
+    return _load_wav(path)
+
+def _load_wav(path):
+    import numpy as np
+
+    with wave.open(path, "rb") as w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        frames = w.readframes(w.getnframes())
+    if width != 2:
+        raise ValueError("only 16-bit PCM WAV is supported without ffmpeg")
+    audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        n = int(len(audio) * SAMPLE_RATE / rate)
+        audio = np.interp(np.linspace(0, len(audio) - 1, n), np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+def split_chunks(audio, chunk_seconds=TRANSCRIBE_CHUNK_SECONDS, overlap_seconds=TRANSCRIBE_OVERLAP_SECONDS):
+    """Overlapping windows over the samples; short audio stays in one piece."""
+    size = int(chunk_seconds * SAMPLE_RATE)
+    step = max(1, size - int(overlap_seconds * SAMPLE_RATE))
+    if len(audio) <= size:
+        return [audio]
+    chunks = []
+    for start in range(0, len(audio), step):
+        chunks.append(audio[start:start + size])
+        if start + size >= len(audio):
+            break
+    return chunks
+
+def merge_overlap(previous, text):
+    """Drops the start of text that repeats the end of previous (the overlapped audio)."""
+    prev = [w.lower() for w in _WORD.findall(previous)[-MAX_OVERLAP_WORDS:]]
+    words = list(_WORD.finditer(text))
+    for n in range(min(len(prev), len(words)), 0, -1):
+        if [m.group().lower() for m in words[:n]] == prev[-n:]:
+            return text[words[n - 1].end():].lstrip(" ,.;:")
+    return text
+
+# ---- worker side ----
+def _init_worker(model_name):
+    # One intra-op thread per process: the pool provides the parallelism
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except Exception:
+        pass
+    from tools.whisper_models import registry
+    registry.get(model_name)
+
+def _transcribe_chunk(model_name, audio, language=None):
+    from tools.whisper_models import registry
+    model = registry.get(model_name)
+    if model is None:
+        raise RuntimeError("Whisper unavailable")
+    return model.transcribe(audio, fp16=False, language=language).get("text", "").strip()
+
+class _Run:
+    """Chunk futures of one file, shared by identical concurrent requests."""
+
+    def __init__(self):
+        self.futures = []
+        self.ready = threading.Event()
+
+class TranscriptionService:
+    def __init__(self, workers=TRANSCRIBE_WORKERS, model=WHISPER_MODEL,
+                 chunk_seconds=TRANSCRIBE_CHUNK_SECONDS, overlap_seconds=TRANSCRIBE_OVERLAP_SECONDS,
+                 memory_mb=WHISPER_MEMORY_MB):
+        self.workers = workers
+        self.model = model
+        self.memory_mb = memory_mb
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.pools = {}                 # model name -> ProcessPoolExecutor
+        self.inflight = {}              # (hash, model, language) -> _Run
+        self.lock = threading.Lock()
+        self.counters = {"files": 0, "chunks": 0, "cached": 0, "shared": 0}
+
+    def pool_size(self, model):
+        """Worker processes for a model: at most `workers`, and no more copies than fit in memory_mb."""
+        fit = self.memory_mb // APPROX_MB.get(model, APPROX_MB["large"])
+        return max(1, min(self.workers, fit))
+
+    def _submit(self, model, audio, language):
+        if self.workers <= 0:
+            f = Future()
+            try:
+                f.set_result(_transcribe_chunk(model, audio, language))
+            except Exception as e:
+                f.set_exception(e)
+            return f
+        with self.lock:
+            pool = self.pools.get(model)
+            if pool is None:
+                pool = self.pools[model] = ProcessPoolExecutor(
+                    max_workers=self.pool_size(model), initializer=_init_worker, initargs=(model,))
+        return pool.submit(_transcribe_chunk, model, audio, language)
+
+    def stream(self, path, model=None, language=None, job=None):
+        """Yields transcript pieces in order; joined they form the full transcript.
+
+        job (a tools.jobs.JobContext) makes the run resumable: see _stream_job.
+        """
+        model = model or self.model
+        digest = file_hash(path)
+        key = (digest, model, language or "")
+
+        row = get_conn().execute("SELECT text FROM transcripts WHERE hash=? AND model=? AND language=?", key).fetchone()
+        if row is not None:
+            with self.lock:
+                self.counters["cached"] += 1
+            yield row[0]
+            return
+        if job is not None:
+            yield from self._stream_job(job, path, key)
+            return
+
+        with self.lock:
+            run = self.inflight.get(key)
+            owner = run is None
+            if owner:
+                run = self.inflight[key] = _Run()
+            else:
+                self.counters["shared"] += 1
+
+        start = time.perf_counter()
+        try:
+            if owner:
+                try:
+                    audio = load_audio(path)
+                    chunks = split_chunks(audio, self.chunk_seconds, self.overlap_seconds)
+                    run.futures = [self._submit(model, c, language) for c in chunks]
+                finally:
+                    run.ready.set()
+                with self.lock:
+                    self.counters["files"] += 1
+                    self.counters["chunks"] += len(chunks)
+                seconds = len(audio) / SAMPLE_RATE
+            else:
+                run.ready.wait()
+                if not run.futures:
+                    raise RuntimeError("transcription failed")
+            futures = run.futures
+
+            parts, previous = [], ""
+            for i, f in enumerate(futures):
+                text = f.result()
+                piece = merge_overlap(previous, text) if i else text
+                previous = text
+                if piece:
+                    piece = (" " if parts else "") + piece
+                    parts.append(piece)
+                    yield piece
+
+            if owner:
+                self._save(key, "".join(parts), seconds)
+                logging.info(f"Transcribed {seconds:.0f}s of audio in {len(futures)} chunks "
+                             f"({time.perf_counter() - start:.1f}s)")
+        finally:
+            if owner:
+                with self.lock:
+                    self.inflight.pop(key, None)
+
+    def _stream_job(self, job, path, key):
+        """Checkpointed run: reports after every chunk and resumes after the last chunk checkpointed.
+
+        Only a few chunks are in the pool at a time, so a paused or cancelled
+        job stops using the workers once those are done.
+        """
+        digest, model, language = key
+        state = job.checkpoint if job.checkpoint.get("hash") == digest else {}
+        done, previous, text = state.get("chunks", 0), state.get("previous", ""), state.get("text", "")
+        if text:
+            yield text
+
+        start = time.perf_counter()
+        audio = load_audio(path)
+        chunks = split_chunks(audio, self.chunk_seconds, self.overlap_seconds)
+        with self.lock:
+            self.counters["files"] += 1
+            self.counters["chunks"] += len(chunks) - done
+
+        upcoming = iter(range(done, len(chunks)))
+        pending = deque(self._submit(model, chunks[i], language or None)
+                        for i in itertools.islice(upcoming, 2 * self.pool_size(model)))
+        try:
+            while pending:
+                raw = pending.popleft().result()
+                piece = merge_overlap(previous, raw) if done else raw
+                previous = raw
+                done += 1
+                if piece:
+                    piece = (" " if text else "") + piece
+                    text += piece
+                    yield piece
+                checkpoint = None
+                if job.due(last=done == len(chunks)):
+                    checkpoint = {"hash": digest, "chunks": done, "previous": previous, "text": text}
+                job.report(done / len(chunks), f"{done}/{len(chunks)} chunks", checkpoint)
+                i = next(upcoming, None)
+                if i is not None:
+                    pending.append(self._submit(model, chunks[i], language or None))
+        finally:
+            for f in pending:
+                f.cancel()
+
+        self._save(key, text, len(audio) / SAMPLE_RATE)
+        logging.info(f"Transcribed {len(audio) / SAMPLE_RATE:.0f}s of audio in {len(chunks)} chunks "
+                     f"({time.perf_counter() - start:.1f}s)")
+
+    def _save(self, key, text, seconds):
+        digest, model, language = key
+        with get_conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transcripts (hash, model, language, text, seconds, created) "
+                "VALUES (?,?,?,?,?,?)",
+                (digest, model, language, text, seconds, time.time())
+            )
+
+    def transcribe(self, path, model=None, language=None, job=None):
+        return "".join(self.stream(path, model, language, job))
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, inflight=len(self.inflight), workers=self.pool_size(self.model))
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            pools, self.pools = list(self.pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+service = TranscriptionService()
@@ -0,0 +1,326 @@
+# tts_cache.py — pluggable TTS engines behind a content-addressed audio cache
+#
+# Audio files live in TTS_CACHE_DIR under the SHA-256 of (text, voice,
+# engine), so a repeated phrase is a dict lookup instead of a synthesis
+# round-trip. Files are written to a temp name and renamed into place, and
+# the directory is kept under a size and age budget (least recently used
+# files go first). Several processes can share the directory: each one
+# re-reads it every EVICT_EVERY writes before evicting, so the budget holds
+# for the directory as a whole, give or take the writes in between. A hit
+# whose file another process already evicted is synthesized again.
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+
+from config import TTS_ENGINE, TTS_VOICE, TTS_CACHE_DIR, TTS_CACHE_BYTES, TTS_CACHE_MAX_AGE
+
+_SPACE = re.compile(r"\s+")
+
+# Hits refresh a file's mtime at most this often (mtime is the LRU clock across restarts)
+TOUCH_EVERY = 60.0
+
+# Writes between rescans of the directory followed by age and size eviction
+EVICT_EVERY = 64
+
+# ---- engines ----
+class TTSEngine:
+    """Engine interface: synthesize(text, voice) -> audio bytes in format `ext`."""
+    name = "base"
+    ext = ".wav"
+
+    def synthesize(self, text, voice):
+        raise NotImplementedError
+
+class GTTSEngine(TTSEngine):
+    """Google Translate TTS (network); voice is a language code such as "en"."""
+    name = "gtts"
+    ext = ".mp3"
+
+    def __init__(self):
+        from gtts import gTTS
+        self.gTTS = gTTS
+
+    def synthesize(self, text, voice):
+        buf = io.BytesIO()
+        self.gTTS(text, lang=voice or "en").write_to_fp(buf)
+        return buf.getvalue()
+
+class Pyttsx3Engine(TTSEngine):
+    """Offline system voices (espeak / SAPI / NSSpeechSynthesizer) via pyttsx3."""
+    name = "pyttsx3"
+    ext = ".wav"
+
+    def __init__(self):
+        import pyttsx3
+        self.pyttsx3 = pyttsx3
+        self.lock = threading.Lock()   # the driver is not thread-safe
+
+    def synthesize(self, text, voice):
+        fd, path = tempfile.mkstemp(suffix=self.ext)
+        os.close(fd)
+        try:
+            with self.lock:
+                engine = self.pyttsx3.init()
+                if voice:
+                    for v in engine.getProperty("voices"):
+                        if voice in (v.id, v.name) or voice in (getattr(v, "languages", None) or []):
+                            engine.setProperty("voice", v.id)
+                            break
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+class StubEngine(TTSEngine):
+    """Silent WAV sized to the text; for tests, benchmarks and machines without TTS."""
+    name = "stub"
+    ext = ".wav"
+
+    def __init__(self, latency=0.0, rate=8000):
+        self.latency = latency
+        self.rate = rate
+        self.calls = 0
+
+    def synthesize(self, text, voice):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        frames = int(self.rate * min(30.0, 0.06 * max(1, len(text))))
+        data = b"\x00\x00" * frames
+        header = b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE" + b"fmt " + struct.pack(
+            "<IHHIIHH", 16, 1, 1, self.rate, self.rate * 2, 2, 16) + b"data" + struct.pack("<I", len(data))
+        return header + data
+
+_engines = {}
+
+def register_engine(name, factory):
+    """Makes an engine available as RAYBOT_TTS_ENGINE=name; factory() builds it."""
+    _engines[name] = factory
+
+register_engine("gtts", GTTSEngine)
+register_engine("pyttsx3", Pyttsx3Engine)
+register_engine("stub", StubEngine)
+
+def load_engine(name=TTS_ENGINE):
+    """Builds the named engine; "auto" tries gTTS, then the offline pyttsx3. None if nothing works."""
+    for candidate in (("gtts", "pyttsx3") if name == "auto" else (name,)):
+        factory = _engines.get(candidate)
+        if factory is None:
+            logging.error(f"Unknown TTS engine '{candidate}'")
+            continue
+        try:
+            return factory()
+        except Exception as e:
+            logging.info(f"TTS engine '{candidate}' unavailable: {e}")
+    return None
+
+# ---- cache ----
+def make_key(text, voice, engine_name):
+    payload = json.dumps([_SPACE.sub(" ", text or "").strip(), voice or "", engine_name])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class TTSCache:
+    def __init__(self, engine=None, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_BYTES,
+                 max_age=TTS_CACHE_MAX_AGE, voice=TTS_VOICE):
+        self._engine = engine
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.voice = voice
+        self.index = None             # key -> [path, size, last_used, last_touch]; loaded on first use
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.pending = {}             # key -> Lock, one synthesis per key at a time
+        self._writes = 0
+        self.counters = {"hits": 0, "misses": 0, "errors": 0, "evictions": 0, "stale": 0, "synth_seconds": 0.0}
+
+    @property
+    def engine(self):
+        # Resolved once; a missing engine is remembered as False
+        if self._engine is None:
+            self._engine = load_engine() or False
+        return self._engine or None
+
+    def _ensure_index(self):
+        # Caller holds self.lock; the first use also drops whatever expired while we were down
+        if self.index is None:
+            self._load_index()
+            self._evict()
+
+    def _load_index(self):
+        # Caller holds self.lock
+        self.index, self.bytes = {}, 0
+        os.makedirs(self.directory, exist_ok=True)
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name.startswith("."):
+                continue
+            key = entry.name.split(".", 1)[0]
+            try:
+                st = entry.stat()
+            except OSError:
+                continue   # removed by another process meanwhile
+            self.index[key] = [entry.path, st.st_size, st.st_mtime, st.st_mtime]
+            self.bytes += st.st_size
+
+    def _lookup(self, key, now):
+        with self.lock:
+            self._ensure_index()
+            item = self.index.get(key)
+            if item is None:
+                return None
+            if now - item[2] > self.max_age:
+                self._drop(key)
+                return None
+            touch = now - item[3] > TOUCH_EVERY
+            if touch:
+                item[3] = now
+            item[2] = now
+            path = item[0]
+
+        # Another process sharing the directory may have evicted the file
+        missing = False
+        try:
+            if touch:
+                os.utime(path, (now, now))
+            else:
+                os.stat(path)
+        except FileNotFoundError:
+            missing = True
+        except OSError:
+            pass
+
+        with self.lock:
+            if missing:
+                if self.index.get(key) is item:
+                    self._drop(key)
+                self.counters["stale"] += 1
+                return None
+            self.counters["hits"] += 1
+        return path
+
+    def get(self, text, voice=None):
+        """Path of the cached audio for text, synthesizing it on a miss; None if TTS is unavailable."""
+        engine = self.engine
+        if engine is None or not text:
+            return None
+        voice = voice or self.voice
+        key = make_key(text, voice, engine.name)
+
+        path = self._lookup(key, time.time())
+        if path is not None:
+            return path
+
+        with self.lock:
+            key_lock = self.pending.setdefault(key, threading.Lock())
+        with key_lock:
+            # Someone else may have synthesized it while we waited
+            path = self._lookup(key, time.time())
+            if path is not None:
+                return path
+            try:
+                return self._create(engine, key, text, voice)
+            finally:
+                with self.lock:
+                    self.pending.pop(key, None)
+
+    def _create(self, engine, key, text, voice):
+        start = time.perf_counter()
+        try:
+            audio = engine.synthesize(text, voice)
+        except Exception as e:
+            logging.error(f"TTS error: {e}")
+            with self.lock:
+                self.counters["errors"] += 1
+            return None
+
+        # Temp file in the same directory, then an atomic rename
+        path = os.path.join(self.directory, key + engine.ext)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=engine.ext)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.error(f"TTS cache write failed: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return None
+
+        with self.lock:
+            self.counters["misses"] += 1
+            self.counters["synth_seconds"] += time.perf_counter() - start
+            old = self.index.get(key)
+            if old is not None:
+                self.bytes -= old[1]
+            now = time.time()
+            self.index[key] = [path, len(audio), now, now]
+            self.bytes += len(audio)
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                # Pick up files other processes wrote (or removed) before judging the budget
+                self._load_index()
+                self._evict(keep=key)
+            elif self.bytes > self.max_bytes:
+                self._evict(keep=key)
+        return path
+
+    def evict(self):
+        """Drops files unused for max_age, then the least recently used over max_bytes."""
+        with self.lock:
+            self._ensure_index()
+            return self._evict()
+
+    def _evict(self, keep=None):
+        now = time.time()
+        removed = 0
+        for key, item in list(self.index.items()):
+            if now - item[2] > self.max_age and key != keep:
+                removed += self._drop(key)
+        if self.bytes > self.max_bytes:
+            for key, _ in sorted(self.index.items(), key=lambda kv: kv[1][2]):
+                if self.bytes <= self.max_bytes:
+                    break
+                if key != keep:
+                    removed += self._drop(key)
+        self.counters["evictions"] += removed
+        return removed
+
+    def _drop(self, key):
+        path, size = self.index.pop(key)[:2]
+        self.bytes -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return 1
+
+    def clear(self):
+        with self.lock:
+            self._ensure_index()
+            for key in list(self.index):
+                self._drop(key)
+
+    def stats(self):
+        with self.lock:
+            out = dict(self.counters)
+            out["entries"] = len(self.index or {})
+            out["bytes"] = self.bytes
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+        out["synth_seconds"] = round(out["synth_seconds"], 3)
+        out["engine"] = self._engine.name if self._engine else None
+        return out
+
+tts_cache = TTSCache()
@@ -0,0 +1,190 @@
+# whisper_models.py — lazy Whisper model registry
+#
+# Nothing is imported or loaded until the first transcription (or an
+# explicit warm_up()), so processes that only need the UI or the DB never
+# pay for torch and the model weights. Several model sizes can stay resident
+# within a memory budget; the least recently used one is dropped first.
+
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from config import WHISPER_MODEL, WHISPER_DEVICE, WHISPER_MEMORY_MB
+
+# Approximate fp32 weight size per model, used to make room before a load
+APPROX_MB = {
+    "tiny": 150, "tiny.en": 150, "base": 290, "base.en": 290,
+    "small": 970, "small.en": 970, "medium": 3060, "medium.en": 3060,
+    "large": 6200, "large-v1": 6200, "large-v2": 6200, "large-v3": 6200, "turbo": 3240,
+}
+
+def _whisper():
+    try:
+        import whisper
+        return whisper
+    except Exception:
+        return None
+
+def rss_bytes():
+    """Resident memory of this process (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except Exception:
+            return 0
+
+def _model_bytes(model):
+    try:
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    except Exception:
+        return 0
+
+class _Entry:
+    def __init__(self, model, load_seconds, size, rss_delta):
+        self.model = model
+        self.load_seconds = load_seconds
+        self.size = size
+        self.rss_delta = rss_delta
+        self.uses = 0
+        self.last_used = time.time()
+
+class ModelRegistry:
+    def __init__(self, default=WHISPER_MODEL, memory_mb=WHISPER_MEMORY_MB, device=WHISPER_DEVICE):
+        self.default = default
+        self.budget = memory_mb * 1024 * 1024
+        self.device = device or None
+        self.models = OrderedDict()     # name -> _Entry, least recently used first
+        self.lock = threading.Lock()
+        self.loading = {}               # name -> Lock, so each model loads once
+        self.errors = {}
+
+    def available(self):
+        return _whisper() is not None
+
+    def get(self, name=None):
+        """Returns the loaded model (loading it on first use), or None if Whisper is unavailable."""
+        name = name or self.default
+        with self.lock:
+            entry = self.models.get(name)
+            if entry is not None:
+                self.models.move_to_end(name)
+                entry.uses += 1
+                entry.last_used = time.time()
+                return entry.model
+            load_lock = self.loading.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self.lock:
+                entry = self.models.get(name)
+            if entry is None:
+                entry = self._load(name)
+                if entry is None:
+                    return None
+            with self.lock:
+                entry.uses += 1
+                entry.last_used = time.time()
+                return entry.model
+
+    def _load(self, name):
+        whisper = _whisper()
+        if whisper is None:
+            return None
+
+        with self.lock:
+            self._evict(APPROX_MB.get(name, 0) * 1024 * 1024)
+
+        before = rss_bytes()
+        start = time.perf_counter()
+        try:
+            model = whisper.load_model(name, device=self.device)
+        except Exception as e:
+            logging.error(f"Whisper load failed ({name}): {e}")
+            self.errors[name] = str(e)
+            return None
+        entry = _Entry(model, time.perf_counter() - start, _model_bytes(model), rss_bytes() - before)
+        logging.info(f"Whisper '{name}' loaded in {entry.load_seconds:.2f}s, "
+                     f"{entry.size / 2**20:.0f} MB weights, RSS +{entry.rss_delta / 2**20:.0f} MB")
+
+        with self.lock:
+            self.models[name] = entry
+            self._evict(0, keep=name)
+            self.errors.pop(name, None)
+        return entry
+
+    def _evict(self, incoming, keep=None):
+        # Caller holds self.lock; the model being loaded (keep) always stays
+        while self.models and self._resident() + incoming > self.budget:
+            victim = next((n for n in self.models if n != keep), None)
+            if victim is None:
+                break
+            del self.models[victim]
+            logging.info(f"Whisper '{victim}' evicted (memory budget)")
+        gc.collect()
+
+    def _resident(self):
+        return sum(e.size or APPROX_MB.get(n, 0) * 1024 * 1024 for n, e in self.models.items())
+
+    def unload(self, name=None):
+        """Drops one model (or all of them when name is None)."""
+        with self.lock:
+            if name is None:
+                removed = bool(self.models)
+                self.models.clear()
+            else:
+                removed = self.models.pop(name, None) is not None
+        gc.collect()
+        return removed
+
+    def warm_up(self, names=None, transcribe=True):
+        """Loads models ahead of the first request; optionally runs one silent clip through each."""
+        report = {}
+        for name in names or [self.default]:
+            model = self.get(name)
+            if model is None:
+                report[name] = {"error": self.errors.get(name, "Whisper unavailable")}
+                continue
+            start = time.perf_counter()
+            if transcribe:
+                try:
+                    import numpy as np
+                    model.transcribe(np.zeros(16000, dtype=np.float32), fp16=False)
+                except Exception as e:
+                    logging.error(f"Whisper warm-up failed ({name}): {e}")
+            report[name] = dict(self.stats()["models"][name], warmup_seconds=round(time.perf_counter() - start, 3))
+        return report
+
+    def warm_up_async(self, names=None):
+        t = threading.Thread(target=self.warm_up, args=(names,), name="whisper-warmup", daemon=True)
+        t.start()
+        return t
+
+    def stats(self):
+        with self.lock:
+            models = {
+                name: {
+                    "load_seconds": round(e.load_seconds, 3),
+                    "weights_mb": round(e.size / 2**20, 1),
+                    "rss_delta_mb": round(e.rss_delta / 2**20, 1),
+                    "uses": e.uses,
+                    "last_used": e.last_used,
+                }
+                for name, e in self.models.items()
+            }
+            resident = self._resident()
+        return {
+            "default": self.default,
+            "models": models,
+            "resident_mb": round(resident / 2**20, 1),
+            "budget_mb": round(self.budget / 2**20, 1),
+            "rss_mb": round(rss_bytes() / 2**20, 1),
+            "errors": dict(self.errors),
+        }
+
+registry = ModelRegistry()
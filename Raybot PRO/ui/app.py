@@ -9,6 +9,7 @@ Usage:
         create_session=create_session,
         append_event=append_event,
         get_recent_events=get_recent_events,
+        search_events=search_events,
         remember=remember,
         transcribe_audio=transcribe_audio,
         tts_save=tts_save,
@@ -21,7 +22,6 @@ but to enable features pass your real functions.
 """
 from typing import Callable, Optional
 import json
-import gradio as gr
 from ui.css import CSS
 
 # ---- default no-op helpers (so the UI imports even if some backend pieces are not passed) ----
@@ -34,6 +34,9 @@ def _noop_append_event(session_id, role, content):
 def _noop_get_recent_events(session_id, limit=50):
     return []
 
+def _noop_search_events(session_id, query, limit=10):
+    return []
+
 def _noop_remember(session_id, key, value):
     return None
 
@@ -49,6 +52,7 @@ def make_app(
     create_session: Callable[[str], int] = _noop_create_session,
     append_event: Callable[[int, str, str], None] = _noop_append_event,
     get_recent_events: Callable[[int, int], list] = _noop_get_recent_events,
+    search_events: Callable[[int, str, int], list] = _noop_search_events,
     remember: Callable[[int, str, str], None] = _noop_remember,
     transcribe_audio: Callable[[str], str] = _noop_transcribe_audio,
     tts_save: Callable[[str], Optional[str]] = _noop_tts_save,
@@ -59,10 +63,12 @@ def make_app(
     """
     Builds the Gradio Blocks UI.
     - agent_manager: object with send_to(name, task) method
-    - create_session, append_event, get_recent_events, remember: DB helpers
+    - create_session, append_event, get_recent_events, search_events, remember: DB helpers
     - transcribe_audio, tts_save: stt/tts helpers
     - openai_client: optional OpenAI SDK client (not required)
     """
+    import gradio as gr  # deferred: importing Gradio costs seconds and is only needed here
+
     css = CSS
 
     with gr.Blocks(css=css) as demo:
@@ -93,16 +99,28 @@ def make_app(
 
                 def _send_msg(message, sid):
                     if not sid:
-                        return gr.update(value=None), "Create a session first."
+                        yield gr.update(value=None), "Create a session first."
+                        return
                     try:
                         sid_i = int(sid)
                     except:
-                        return gr.update(value=None), "Invalid session id."
+                        yield gr.update(value=None), "Invalid session id."
+                        return
 
                     append_event(sid_i, "user", message)
-                    res = agent_manager.send_to("chat", {"message": message, "session_id": sid_i})
-                    reply = res.get("reply", str(res))
-                    return [(message, reply)], reply
+                    res = agent_manager.send_to("chat", {"message": message, "session_id": sid_i, "stream": True})
+
+                    # Agents that do not stream (or errors) come back as a dict
+                    if isinstance(res, dict):
+                        reply = res.get("reply", str(res))
+                        yield [(message, reply)], reply
+                        return
+
+                    reply = ""
+                    for delta in res:
+                        reply += delta
+                        yield [(message, reply)], gr.update()
+                    yield [(message, reply)], reply
 
                 msg.submit(_send_msg, [msg, sid_box], [chatbot, msg])
 
@@ -156,14 +174,23 @@ def make_app(
 
                 def _transcribe(audio_file, sid):
                     if not audio_file:
-                        return "Upload audio first."
+                        yield "Upload audio first."
+                        return
                     sid_i = int(sid) if sid else None
-                    out = agent_manager.send_to("voice", {"action":"transcribe", "path": audio_file})
-                    txt = out.get("transcript","")
+                    out = agent_manager.send_to("voice", {"action":"transcribe", "path": audio_file, "stream": True})
+
+                    # Long audio arrives chunk by chunk; errors come back as a dict
+                    if isinstance(out, dict):
+                        txt = out.get("transcript", out.get("error", ""))
+                        yield txt
+                    else:
+                        txt = ""
+                        for piece in out:
+                            txt += piece
+                            yield txt
                     if sid_i:
                         append_event(sid_i, "user", "[VOICE] " + txt[:300])
                         append_event(sid_i, "tool", json.dumps({"tool":"voice_transcribe","output": txt[:200]}))
-                    return txt
 
                 trans_btn.click(_transcribe, [audio_in, sid_box], trans_out)
 
@@ -197,14 +224,34 @@ def make_app(
                     return "Resume not available."
 
                 def _cancel():
-                    if hasattr(agent_manager, "send_to"): return agent_manager.send_to("cancel_long_task", {}) 
-                    return {"error":"not implemented"}
+                    if hasattr(agent_manager, "send_to"): return json.dumps(agent_manager.send_to("cancel_long_task", {}))
+                    return json.dumps({"error":"not implemented"})
 
                 start_btn.click(_start_task, None, long_status)
                 pause_btn.click(_pause, None, long_status)
                 resume_btn.click(_resume, None, long_status)
                 cancel_btn.click(_cancel, None, long_status)
 
+                job_pause_btn = gr.Button("Pause long task")
+                job_resume_btn = gr.Button("Resume long task")
+                job_refresh_btn = gr.Button("Refresh job status")
+
+                def _job_action(name):
+                    def handler():
+                        if hasattr(agent_manager, "send_to"): return json.dumps(agent_manager.send_to(name, {}))
+                        return json.dumps({"error":"not implemented"})
+                    return handler
+
+                def _job_status():
+                    if hasattr(agent_manager, "send_to"):
+                        r = agent_manager.send_to("job_status", {"limit": 5})
+                        return json.dumps(r, indent=2)
+                    return "(jobs not available)"
+
+                job_pause_btn.click(_job_action("pause_long_task"), None, long_status)
+                job_resume_btn.click(_job_action("resume_long_task"), None, long_status)
+                job_refresh_btn.click(_job_status, None, long_status)
+
                 eval_btn = gr.Button("Run agent evaluation")
                 eval_out = gr.Textbox(label="Evaluation results")
 
@@ -230,6 +277,21 @@ def make_app(
 
                 show_btn.click(_show_events, sid_box, ev_out)
 
+                search_q = gr.Textbox(label="Search this session's history")
+                search_btn = gr.Button("Search events")
+                search_out = gr.Textbox(label="Matching Events")
+
+                def _search_events(q, sid):
+                    if not sid: return "Create a session first."
+                    evs = search_events(int(sid), q, limit=50)
+                    lines=[]
+                    for role, c, ts in evs:
+                        lines.append(f"{ts} | {role.upper()} | {c[:150]}")
+                    return "\n".join(lines) if lines else "(no matches)"
+
+                search_btn.click(_search_events, [search_q, sid_box], search_out)
+                search_q.submit(_search_events, [search_q, sid_box], search_out)
+
                 mem_k = gr.Textbox(label="Memory key")
                 mem_v = gr.Textbox(label="Memory value")
                 mem_save = gr.Button("Save Memory")